@@ -28,14 +28,17 @@ class KinopoiskAPI:
             self._client = None
 
     async def _get(self, endpoint: str, params: Optional[dict] = None) -> Optional[dict]:
-        """Make an async GET request to the API."""
-        try:
-            client = await self._get_client()
-            response = await client.get(f"{self.BASE_URL}{endpoint}", params=params)
-            response.raise_for_status()
-            return response.json()
-        except Exception:
+        """Make an async GET request to the API.
+
+        Returns None if nothing is found (404); network and HTTP errors are
+        raised (httpx.HTTPError), so callers can tell them from a missing film.
+        """
+        client = await self._get_client()
+        response = await client.get(f"{self.BASE_URL}{endpoint}", params=params)
+        if response.status_code == 404:
             return None
+        response.raise_for_status()
+        return response.json()
 
     async def search_by_keyword(self, keyword: str, page: int = 1) -> list[dict]:
         """Search films by keyword."""
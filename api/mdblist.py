@@ -25,58 +25,44 @@ class MDBListAPI:
             self._client = None
 
     async def get_ratings_by_tmdb_id(self, tmdb_id: int, is_tv: bool = False) -> dict:
-        """Get ratings from MDBList by TMDB ID."""
-        if not tmdb_id or self._disabled:
+        """Get ratings from MDBList by TMDB ID (see _get_ratings)."""
+        if not tmdb_id:
             return {}
-
         media_type = "show" if is_tv else "movie"
-
-        try:
-            client = await self._get_client()
-            response = await client.get(
-                f"{self.BASE_URL}/tmdb/{media_type}/{tmdb_id}",
-                params={"apikey": self.api_key},
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if not data or "ratings" not in data:
-                return {}
-
-            return self._parse_ratings(data["ratings"])
-
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code in (401, 403, 429):
-                self._disabled = True
-            return {}
-        except Exception:
-            return {}
+        return await self._get_ratings(f"/tmdb/{media_type}/{tmdb_id}")
 
     async def get_ratings_by_imdb_id(self, imdb_id: str) -> dict:
-        """Get ratings from MDBList by IMDB ID."""
-        if not imdb_id or self._disabled:
+        """Get ratings from MDBList by IMDB ID (see _get_ratings)."""
+        if not imdb_id:
             return {}
+        return await self._get_ratings(f"/imdb/{imdb_id}")
 
-        try:
-            client = await self._get_client()
-            response = await client.get(
-                f"{self.BASE_URL}/imdb/{imdb_id}",
-                params={"apikey": self.api_key},
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if not data or "ratings" not in data:
-                return {}
+    async def _get_ratings(self, endpoint: str) -> dict:
+        """Get parsed ratings of a title.
 
-            return self._parse_ratings(data["ratings"])
+        Returns {} if MDBList has no such title. Network and HTTP errors are
+        raised (httpx.HTTPError), as is a lookup while the key is disabled,
+        so callers can tell a failed lookup from a missing rating.
+        """
+        if self._disabled:
+            raise RuntimeError("MDBList API disabled (invalid key or rate limit reached)")
 
+        client = await self._get_client()
+        try:
+            response = await client.get(f"{self.BASE_URL}{endpoint}", params={"apikey": self.api_key})
+            if response.status_code == 404:
+                return {}
+            response.raise_for_status()
         except httpx.HTTPStatusError as e:
             if e.response.status_code in (401, 403, 429):
                 self._disabled = True
+            raise
+        data = response.json()
+
+        if not data or "ratings" not in data:
             return {}
-        except Exception:
-            return {}
+
+        return self._parse_ratings(data["ratings"])
 
     def _parse_ratings(self, ratings: list) -> dict:
         """Parse ratings array from MDBList response."""
@@ -25,32 +25,38 @@ class OMDBAPI:
             self._client = None
 
     async def get_ratings_by_imdb_id(self, imdb_id: str) -> dict:
-        """Get ratings from OMDB by IMDB ID."""
-        if not imdb_id or self._disabled:
+        """Get ratings from OMDB by IMDB ID.
+
+        Returns {} if OMDB has no such title. Network and HTTP errors are
+        raised (httpx.HTTPError), as is a lookup while the key is disabled,
+        so callers can tell a failed lookup from a missing rating.
+        """
+        if not imdb_id:
             return {}
+        if self._disabled:
+            raise RuntimeError("OMDB API disabled (invalid key or request limit reached)")
 
+        client = await self._get_client()
         try:
-            client = await self._get_client()
             response = await client.get(
                 self.BASE_URL,
                 params={"i": imdb_id, "apikey": self.api_key},
             )
             response.raise_for_status()
-            data = response.json()
-
-            if data.get("Response") == "False":
-                error = data.get("Error", "Unknown error")
-                if "limit" in error.lower():
-                    self._disabled = True
-                return {}
-
-            return self._parse_ratings(data)
         except httpx.HTTPStatusError as e:
             if e.response.status_code in (401, 403):
                 self._disabled = True
+            raise
+        data = response.json()
+
+        if data.get("Response") == "False":
+            error = data.get("Error", "Unknown error")
+            if "limit" in error.lower():
+                self._disabled = True
+                raise RuntimeError(f"OMDB API: {error}")
             return {}
-        except Exception:
-            return {}
+
+        return self._parse_ratings(data)
 
     def _parse_ratings(self, data: dict) -> dict:
         """Parse ratings from OMDB response."""
@@ -304,8 +304,12 @@ class TMDBAPI:
             return []
         return [self._parse_tv_basic(tv) for tv in data["results"]]
 
-    async def search_by_keyword(self, keyword: str, page: int = 1) -> list[dict]:
-        """Search movies AND TV shows by title, person name, genre."""
+    async def search_by_keyword(self, keyword: str, page: int = 1, include_people: bool = True) -> list[dict]:
+        """Search movies AND TV shows by title, person name, genre.
+
+        With include_people=False the person search and filmographies are
+        skipped (for callers resolving people themselves).
+        """
         seen_movie_ids = set()
         seen_tv_ids = set()
         results = []
@@ -329,14 +333,15 @@ class TMDBAPI:
         tasks.append(("search_tv", self.search_tv(keyword, page)))
 
         # Person search
-        tasks.append(("search_person", self.search_person(keyword)))
+        if include_people:
+            tasks.append(("search_person", self.search_person(keyword)))
 
         # Execute all tasks concurrently
         task_results = await asyncio.gather(*[t[1] for t in tasks], return_exceptions=True)
 
         person_ids = []
         for (task_type, _), result in zip(tasks, task_results):
-            if isinstance(result, Exception):
+            if isinstance(result, BaseException):
                 continue
 
             if task_type == "search_person":
@@ -360,7 +365,7 @@ class TMDBAPI:
             person_results = await asyncio.gather(*[t[1] for t in person_tasks], return_exceptions=True)
 
             for (task_type, _), result in zip(person_tasks, person_results):
-                if isinstance(result, Exception):
+                if isinstance(result, BaseException):
                     continue
                 items = result[:10]
                 is_tv = task_type == "tv"
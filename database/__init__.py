@@ -1,13 +1,26 @@
-from .models import Movie, UserRating, Genre, Director, Actor, Tag, Wishlist, RecommendationCache
+from .models import Movie, MovieText, PersonalScore, UserRating, Genre, Director, Actor, Tag, Wishlist, RecommendationCache, PersonFilmography, Job
 from .db import (
     init_db, close_db, get_session, get_movie_by_kp_id, get_movies_by_kp_ids_batch, save_movie,
-    get_user_rating, save_user_rating, delete_user_rating, update_entity_ratings_for_movie,
+    add_movie_saved_listener, get_movie_description, set_movie_description, get_movie_views,
+    PROFILE_FULL, PROFILE_SCORING, movie_load_options,
+    get_user_rating, save_user_rating, delete_user_rating, update_entity_ratings_for_movie, get_ratings_version,
+    update_entity_ratings_for_movies, apply_user_edits, EDIT_RATING, EDIT_WISHLIST, EDIT_TAGS,
+    add_ratings_changed_listener, get_scoring_rows, get_movie_ids_sharing_entities,
+    get_movie_ids_by_kp_ids, save_personal_scores, get_top_scored_movie_ids, get_personal_scores,
     get_all_user_ratings, get_all_user_ratings_filtered, get_user_ratings_batch,
-    get_rated_movies, search_local_movies, search_local_movies_multi,
+    get_rated_movies, search_local_movies, search_local_movies_multi, count_movies_by_token_prefix, movie_has_genres,
     get_genre_by_id, get_director_by_id, get_actor_by_id,
-    get_or_create_director, get_or_create_actor,
+    get_or_create_director, get_or_create_actor, get_people_names, get_person_ids_by_name, get_movie_titles,
     get_cached_recommendations, get_cached_recommendations_batch, save_cached_recommendations,
+    save_cached_recommendations_batch, get_expiring_recommendation_keys, recommendation_job_key,
+    get_person_filmographies_batch, save_person_filmographies_batch,
+    enqueue_jobs, get_queued_job_keys, claim_jobs, complete_jobs, fail_jobs, reset_running_jobs, count_pending_jobs,
+    touch_movies, get_prunable_movie_ids, delete_movies, delete_orphaned_people, delete_stale_cache_rows,
+    compact_database, clear_cache_database, get_cache_path,
     is_in_wishlist, add_to_wishlist, remove_from_wishlist, get_wishlist, get_wishlist_movie_ids,
     get_all_tags, create_tag, rename_tag, delete_tag, set_movie_tags, get_movie_tags,
 )
-from .genre_utils import normalize_genres_async
+from .genre_utils import (
+    normalize_genres_async, genre_mask_from_names, genre_mask_from_ids, genre_mask_from_tmdb_ids, has_genres,
+)
+from .views import MovieView, RatingView, ScoringRow
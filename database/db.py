@@ -1,26 +1,53 @@
 import os
 import json
 from contextlib import asynccontextmanager
-from typing import Optional, AsyncGenerator
+from typing import Callable, Optional, AsyncGenerator
 from datetime import timedelta, timezone
 
-from sqlalchemy import func, or_, select, delete, union
+from sqlalchemy import event, func, or_, select, delete, update, union, text, case, literal
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import load_only, raiseload, selectinload
 
 from .models import (
-    Base, Movie, UserRating, Genre, Director, Actor, Tag,
+    Base, Movie, MovieText, PersonalScore, UserRating, Genre, Director, Actor, Tag,
     MovieGenre, MovieDirector, MovieActor, MovieTag,
-    Wishlist, RecommendationCache, utc_now
+    Wishlist, RecommendationCache, PersonFilmography, Job, CACHE_SCHEMA, DESCRIPTION_PREVIEW_LENGTH, utc_now
 )
-from .genre_utils import GENRE_SEED_DATA, init_genre_cache_async, clear_cache
+from .genre_utils import (
+    GENRE_SEED_DATA, GENRE_BITS, init_genre_cache_async, clear_cache, get_genre_names,
+    genre_mask_from_ids, genre_mask_from_names,
+)
+from .search_tokens import build_search_tokens
+from .views import MovieView, ScoringRow, intern_names
 
 _engine = None
 _SessionLocal = None
-
-
-async def init_db(db_path: str = "movie_picker.db"):
-    """Initialize the database and create tables."""
+# Bumped on every user rating change; caches of rating-dependent results compare it
+_ratings_version = 0
+# Called with (movie, person names) after save_movie/save_movie_m2m (in-memory indexes)
+_movie_saved_listeners: list[Callable[[Movie, list[str]], None]] = []
+# Called with the IDs of movies whose user rating changed, once entity ratings are updated
+_ratings_changed_listeners: list[Callable[[list[int]], None]] = []
+
+# Kinds of queued user edits (see apply_user_edits)
+EDIT_RATING = "rating"
+EDIT_WISHLIST = "wishlist"
+EDIT_TAGS = "tags"
+
+# Bump when models or indexes change: init_db only runs schema checks
+# (create_all, missing columns, indexes, seeding) when PRAGMA user_version differs.
+SCHEMA_VERSION = 14
+
+
+async def init_db(db_path: str = "movie_picker.db", cache_path: Optional[str] = None):
+    """Initialize the database and create tables.
+
+    Disposable data (recommendation/filmography caches) lives in a
+    separate cache database attached as CACHE_SCHEMA, by default next to
+    db_path ("movie_picker.cache.db"). It may be deleted at any time: it is
+    recreated empty on the next start.
+    """
     global _engine, _SessionLocal
 
     db_dir = os.path.dirname(db_path)
@@ -28,26 +55,188 @@ async def init_db(db_path: str = "movie_picker.db"):
         os.makedirs(db_dir)
 
     _engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", echo=False)
+    _attach_cache_database(_engine, cache_path or get_cache_path(db_path))
+    _SessionLocal = async_sessionmaker(bind=_engine, expire_on_commit=False)
 
     async with _engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-        # Add performance indexes (safe to run multiple times)
-        await _create_indexes(conn)
-
-    _SessionLocal = async_sessionmaker(bind=_engine, expire_on_commit=False)
+        result = await conn.execute(text("PRAGMA user_version"))
+        cache_result = await conn.execute(text(f"PRAGMA {CACHE_SCHEMA}.user_version"))
+        schema_up_to_date = result.scalar() == SCHEMA_VERSION and cache_result.scalar() == SCHEMA_VERSION
+
+        if not schema_up_to_date:
+            # Takes effect for new databases (existing ones are converted by compact_database)
+            await conn.execute(text("PRAGMA auto_vacuum = INCREMENTAL"))
+            await conn.run_sync(Base.metadata.create_all)
+            await _move_tables(conn)
+            await conn.run_sync(_add_missing_columns)
+            await _backfill_hydration(conn)
+            await _backfill_search_tokens(conn)
+            await _backfill_genre_masks(conn)
+            await _split_descriptions(conn)
+            # Add performance indexes (safe to run multiple times)
+            await _create_indexes(conn)
 
-    # Seed genres if empty and initialize cache
     async with _SessionLocal() as session:
-        result = await session.execute(select(func.count(Genre.id)))
-        count = result.scalar()
-        if count == 0:
-            await _seed_genres(session)
+        if not schema_up_to_date:
+            # Seed genres if empty
+            result = await session.execute(select(func.count(Genre.id)))
+            if result.scalar() == 0:
+                await _seed_genres(session)
+
+            await session.execute(text(f"PRAGMA user_version = {SCHEMA_VERSION}"))
+            await session.execute(text(f"PRAGMA {CACHE_SCHEMA}.user_version = {SCHEMA_VERSION}"))
+            await session.commit()
+
         await init_genre_cache_async(session)
 
 
+def get_cache_path(db_path: str) -> str:
+    """Default cache database path for a main database ("x.db" -> "x.cache.db")."""
+    root, ext = os.path.splitext(db_path)
+    return f"{root}.cache{ext or '.db'}"
+
+
+def _attach_cache_database(engine, cache_path: str):
+    """Attach the cache database to every new connection, with its own pragmas."""
+    @event.listens_for(engine.sync_engine, "connect")
+    def attach(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"ATTACH DATABASE ? AS {CACHE_SCHEMA}", (cache_path,))
+        # auto_vacuum only takes effect for a new file; WAL with NORMAL sync keeps
+        # cache writes cheap and off the main file's lock (rating saves)
+        cursor.execute(f"PRAGMA {CACHE_SCHEMA}.auto_vacuum = INCREMENTAL")
+        cursor.execute(f"PRAGMA {CACHE_SCHEMA}.journal_mode = WAL")
+        cursor.execute(f"PRAGMA {CACHE_SCHEMA}.synchronous = NORMAL")
+        cursor.close()
+
+
+async def _move_tables(conn):
+    """Move tables left in the other database file by an older layout into their own.
+
+    Cache tables of the single-file layout go to the cache database; the job
+    queue, briefly kept in the cache database, goes back to the main one.
+    """
+    for table in Base.metadata.sorted_tables:
+        target = table.schema or "main"
+        source = "main" if target == CACHE_SCHEMA else CACHE_SCHEMA
+        result = await conn.execute(
+            text(f"SELECT 1 FROM {source}.sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": table.name},
+        )
+        if result.scalar() is None:
+            continue
+        old_columns = {row[1] for row in await conn.execute(text(f"PRAGMA {source}.table_info({table.name})"))}
+        # Columns the old table lacks get their default (NOT NULL ones have no SQL default)
+        columns = [
+            (c.name, c.name if c.name in old_columns else _sql_default(c)) for c in table.columns
+            if c.name in old_columns or _sql_default(c) is not None
+        ]
+        await conn.execute(text(
+            f"INSERT OR IGNORE INTO {target}.{table.name} ({', '.join(name for name, _ in columns)}) "
+            f"SELECT {', '.join(value for _, value in columns)} FROM {source}.{table.name}"
+        ))
+        await conn.execute(text(f"DROP TABLE {source}.{table.name}"))
+
+
+def _add_missing_columns(sync_conn):
+    """Add columns defined in models but missing from existing tables.
+
+    create_all only creates missing tables, so columns added to a model
+    later have to be added with ALTER TABLE.
+    """
+    for table in Base.metadata.sorted_tables:
+        prefix = f"{table.schema}." if table.schema else ""
+        existing = {row[1] for row in sync_conn.execute(text(f"PRAGMA {prefix}table_info({table.name})"))}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=sync_conn.dialect)
+            ddl = f"ALTER TABLE {prefix}{table.name} ADD COLUMN {column.name} {column_type}"
+            default = _sql_default(column)
+            if default is not None:
+                ddl += f" DEFAULT {default}"
+            sync_conn.execute(text(ddl))
+
+
+def _sql_default(column) -> Optional[str]:
+    """SQL literal of a column's scalar Python-side default (None if it has none)."""
+    default = column.default
+    if default is None or not default.is_scalar:
+        return None
+    value = default.arg
+    if isinstance(value, bool):
+        value = int(value)
+    return repr(value) if isinstance(value, str) else str(value)
+
+
+async def _backfill_hydration(conn):
+    """Derive hydration timestamps for movies saved before they were tracked.
+
+    Stored movies always came from full TMDB details; credits count as loaded
+    only if any directors/actors were saved, so the rest are re-fetched once.
+    """
+    await conn.execute(text(
+        "UPDATE movies SET details_loaded_at = COALESCE(created_at, CURRENT_TIMESTAMP) "
+        "WHERE details_loaded_at IS NULL"
+    ))
+    await conn.execute(text(
+        "UPDATE movies SET credits_loaded_at = details_loaded_at "
+        "WHERE credits_loaded_at IS NULL AND ("
+        "EXISTS (SELECT 1 FROM movie_directors WHERE movie_directors.movie_id = movies.id) "
+        "OR EXISTS (SELECT 1 FROM movie_actors WHERE movie_actors.movie_id = movies.id))"
+    ))
+    await conn.execute(text(
+        "UPDATE movies SET ratings_loaded_at = COALESCE(external_checked_at, kp_checked_at) "
+        "WHERE ratings_loaded_at IS NULL"
+    ))
+
+
+async def _backfill_search_tokens(conn):
+    """Build search tokens for movies saved before they were persisted."""
+    result = await conn.execute(text(
+        "SELECT m.id, m.title, m.title_original, COALESCE(t.description, m.description), "
+        "(SELECT group_concat(g.name, ' ') FROM movie_genres mg JOIN genres g ON g.id = mg.genre_id "
+        "WHERE mg.movie_id = m.id), "
+        "(SELECT group_concat(d.name, ' ') FROM movie_directors md JOIN directors d ON d.id = md.director_id "
+        "WHERE md.movie_id = m.id), "
+        "(SELECT group_concat(a.name, ' ') FROM movie_actors ma JOIN actors a ON a.id = ma.actor_id "
+        "WHERE ma.movie_id = m.id) "
+        "FROM movies m LEFT JOIN movie_texts t ON t.movie_id = m.id WHERE m.search_tokens IS NULL"
+    ))
+    rows = [
+        {"id": row[0], "tokens": build_search_tokens(*row[1:])}
+        for row in result.all()
+    ]
+    if rows:
+        await conn.execute(text("UPDATE movies SET search_tokens = :tokens WHERE id = :id"), rows)
+
+
+async def _backfill_genre_masks(conn):
+    """Recompute movies.genre_mask from movie_genres (idempotent)."""
+    bits = " ".join(f"WHEN '{name}' THEN {bit}" for name, bit in GENRE_BITS.items())
+    await conn.execute(text(
+        "UPDATE movies SET genre_mask = ("
+        f"SELECT COALESCE(SUM(DISTINCT CASE g.name {bits} ELSE 0 END), 0) "
+        "FROM movie_genres mg JOIN genres g ON g.id = mg.genre_id WHERE mg.movie_id = movies.id)"
+    ))
+
+
+async def _split_descriptions(conn):
+    """Move long descriptions into movie_texts, keeping a preview in movies (idempotent)."""
+    await conn.execute(text(
+        "INSERT OR REPLACE INTO movie_texts (movie_id, description) "
+        "SELECT id, description FROM movies WHERE length(description) > :limit"
+    ), {"limit": DESCRIPTION_PREVIEW_LENGTH})
+    await conn.execute(text(
+        "UPDATE movies SET description = substr(description, 1, :limit) WHERE length(description) > :limit"
+    ), {"limit": DESCRIPTION_PREVIEW_LENGTH})
+    await conn.execute(text(
+        "UPDATE movies SET description_truncated = (id IN (SELECT movie_id FROM movie_texts))"
+    ))
+
+
 async def _create_indexes(conn):
     """Create performance indexes if they don't exist."""
-    from sqlalchemy import text
     indexes = [
         # Movie search indexes
         "CREATE INDEX IF NOT EXISTS idx_movie_title ON movies(title)",
@@ -67,6 +256,10 @@ async def _create_indexes(conn):
         "CREATE INDEX IF NOT EXISTS idx_movie_tags_tag_id ON movie_tags(tag_id)",
         # Wishlist index
         "CREATE INDEX IF NOT EXISTS idx_wishlist_movie_id ON wishlist(movie_id)",
+        # Ranked browsing (ORDER BY score)
+        "CREATE INDEX IF NOT EXISTS idx_personal_score ON personal_scores(score)",
+        # Job queue polling
+        "CREATE INDEX IF NOT EXISTS idx_job_status_next_run ON jobs(status, next_run_at)",
     ]
     for idx_sql in indexes:
         await conn.execute(text(idx_sql))
@@ -94,7 +287,6 @@ async def close_db():
         
         # For SQLite: checkpoint WAL to close cleanly
         try:
-            from sqlalchemy import text
             async with _engine.begin() as conn:
                 await conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
         except Exception:
@@ -118,6 +310,45 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+# =============================================================================
+# Query profiles
+# =============================================================================
+
+# Loader options for movie list queries:
+# full - everything a card shows (description preview, poster, people, genres);
+# scoring - only what ranking and recommendation sources use. Other columns and
+# relationships are left unloaded and raise on access instead of lazy loading.
+PROFILE_FULL = "full"
+PROFILE_SCORING = "scoring"
+
+SCORING_COLUMNS = (
+    Movie.id, Movie.kinopoisk_id, Movie.is_tv, Movie.title, Movie.year, Movie.genre_mask,
+    Movie.tmdb_rating, Movie.imdb_rating, Movie.rotten_tomatoes, Movie.metacritic,
+)
+
+
+# Row layout of MovieView before the name tuples (see get_movie_views)
+MOVIE_VIEW_COLUMNS = (
+    Movie.id, Movie.kinopoisk_id, Movie.is_tv, Movie.imdb_id,
+    Movie.title, Movie.title_original, Movie.year, Movie.description, Movie.description_truncated, Movie.poster_url,
+    Movie.tmdb_rating, Movie.kp_rating, Movie.imdb_rating, Movie.rotten_tomatoes, Movie.metacritic,
+)
+
+
+def movie_load_options(profile: str = PROFILE_FULL) -> list:
+    """Loader options for Movie rows of a list query (see PROFILE_*)."""
+    if profile == PROFILE_SCORING:
+        return [
+            load_only(*SCORING_COLUMNS, raiseload=True),
+            raiseload(Movie.genre_list),
+            raiseload(Movie.director_list),
+            raiseload(Movie.actor_list),
+            raiseload(Movie.tag_list),
+            raiseload(Movie.user_rating),
+        ]
+    return [selectinload(Movie.genre_list), selectinload(Movie.director_list), selectinload(Movie.actor_list)]
+
+
 # =============================================================================
 # Movie CRUD
 # =============================================================================
@@ -126,7 +357,7 @@ async def get_movie_by_kp_id(session: AsyncSession, kinopoisk_id: int, is_tv: bo
     """Get a movie/TV show by its TMDB ID and type."""
     result = await session.execute(
         select(Movie)
-        .options(selectinload(Movie.genre_list), selectinload(Movie.director_list), selectinload(Movie.actor_list))
+        .options(*movie_load_options())
         .filter(Movie.kinopoisk_id == kinopoisk_id, Movie.is_tv == is_tv)
     )
     return result.scalar_one_or_none()
@@ -152,7 +383,7 @@ async def get_movies_by_kp_ids_batch(session: AsyncSession, kp_ids_with_type: li
 
     result = await session.execute(
         select(Movie)
-        .options(selectinload(Movie.genre_list), selectinload(Movie.director_list), selectinload(Movie.actor_list))
+        .options(*movie_load_options())
         .filter(or_(*conditions))
     )
 
@@ -164,6 +395,7 @@ async def save_movie(session: AsyncSession, movie_data: dict, auto_commit: bool
     """Save or update a movie/TV show in the database.
 
     Handles M2M relationships for genres, directors, and actors.
+    movie_data is expected to hold full TMDB details (marks details as loaded).
     Expected keys in movie_data:
         - genres: comma-separated string "драма, комедия"
         - directors: list of dicts [{"tmdb_id": 123, "name": "Name"}, ...]
@@ -182,6 +414,22 @@ async def save_movie(session: AsyncSession, movie_data: dict, auto_commit: bool
     directors_list = movie_data.pop("directors", None)
     actors_list = movie_data.pop("actors", None)
 
+    # Keep a preview on the row, the full text goes to movie_texts
+    full_description = movie_data.get("description")
+    if full_description:
+        movie_data["description"] = full_description[:DESCRIPTION_PREVIEW_LENGTH]
+    if "description" in movie_data:
+        # Same condition as set_movie_description storing the full text
+        movie_data["description_truncated"] = len(full_description or "") > DESCRIPTION_PREVIEW_LENGTH
+
+    now = utc_now().replace(tzinfo=None)
+    movie_data["details_loaded_at"] = now
+    # Credits are loaded now, or there are none to save in background
+    if (not skip_m2m and (directors_list is not None or actors_list is not None)) or \
+            (skip_m2m and not directors_list and not actors_list):
+        movie_data["credits_loaded_at"] = now
+
+    is_new = movie is None
     try:
         if movie is None:
             movie = Movie(**movie_data)
@@ -192,9 +440,13 @@ async def save_movie(session: AsyncSession, movie_data: dict, auto_commit: bool
                 if hasattr(movie, key) and key != "id":
                     setattr(movie, key, value)
 
+        if "description" in movie_data:
+            await set_movie_description(session, movie.id, full_description)
+
         # Set M2M relationships (genres are fast, directors/actors are slow)
+        genre_ids = None
         if genres_string is not None:
-            await set_movie_genres(session, movie, genres_string)
+            genre_ids = await set_movie_genres(session, movie, genres_string)
 
         if not skip_m2m:
             if directors_list is not None:
@@ -202,6 +454,16 @@ async def save_movie(session: AsyncSession, movie_data: dict, auto_commit: bool
             if actors_list is not None:
                 await set_movie_actors(session, movie, actors_list)
 
+        # Credits saved in background are indexed right away
+        _update_search_tokens(
+            movie,
+            get_genre_names(genre_ids) if genre_ids is not None else None,
+            directors_list,
+            actors_list,
+            description=full_description,
+            is_new=is_new,
+        )
+
         if auto_commit:
             await session.commit()
             await session.refresh(movie, ["genre_list", "director_list", "actor_list"])
@@ -216,11 +478,22 @@ async def save_movie(session: AsyncSession, movie_data: dict, auto_commit: bool
         movie._pending_directors = directors_list
         movie._pending_actors = actors_list
 
+    _notify_movie_saved(movie, None if skip_m2m else directors_list, None if skip_m2m else actors_list)
     return movie
 
 
-async def save_movie_m2m(session: AsyncSession, movie_id: int, directors: list[dict] = None, actors: list[dict] = None):
-    """Save only M2M relationships for a movie (for background processing)."""
+async def save_movie_m2m(
+    session: AsyncSession,
+    movie_id: int,
+    directors: list[dict] = None,
+    actors: list[dict] = None,
+    auto_commit: bool = True
+):
+    """Save only M2M relationships for a movie (for background processing).
+
+    Args:
+        auto_commit: If False, caller is responsible for commit (for batch operations)
+    """
     movie = await session.get(Movie, movie_id)
     if not movie:
         return
@@ -229,20 +502,119 @@ async def save_movie_m2m(session: AsyncSession, movie_id: int, directors: list[d
         await set_movie_directors(session, movie, directors)
     if actors is not None:
         await set_movie_actors(session, movie, actors)
+    if directors is not None or actors is not None:
+        movie.credits_loaded_at = utc_now().replace(tzinfo=None)
+        # Merge into existing tokens (relationships may not be loaded here)
+        names = [p.get("name") for p in (directors or []) + (actors or [])]
+        movie.search_tokens = build_search_tokens(movie.search_tokens, *names)
+        _notify_movie_saved(movie, directors, actors)
+
+    if auto_commit:
+        await session.commit()
+
+
+def add_movie_saved_listener(callback: Callable[[Movie, list[str]], None]):
+    """Register a callback run with (movie, director/actor names) whenever a movie is saved."""
+    _movie_saved_listeners.append(callback)
+
+
+def _notify_movie_saved(movie: Movie, directors: Optional[list[dict]], actors: Optional[list[dict]]):
+    names = [p.get("name") for p in (directors or []) + (actors or []) if p.get("name")]
+    for callback in _movie_saved_listeners:
+        try:
+            callback(movie, names)
+        except Exception:
+            pass
 
-    await session.commit()
+
+def _update_search_tokens(
+    movie: Movie,
+    genre_names: Optional[list[str]],
+    directors: Optional[list[dict]],
+    actors: Optional[list[dict]],
+    description: Optional[str] = None,
+    is_new: bool = False
+):
+    """Rebuild movie.search_tokens; None arguments fall back to the movie's loaded data."""
+    if genre_names is None:
+        genre_names = [] if is_new else [g.name for g in movie.genre_list]
+    director_names = [d.get("name") for d in directors] if directors is not None else \
+        ([] if is_new else [d.name for d in movie.director_list])
+    actor_names = [a.get("name") for a in actors] if actors is not None else \
+        ([] if is_new else [a.name for a in movie.actor_list])
+
+    movie.search_tokens = build_search_tokens(
+        movie.title, movie.title_original, description or movie.description,
+        *genre_names, *director_names, *actor_names,
+    )
+
+
+async def set_movie_description(session: AsyncSession, movie_id: int, description: Optional[str]):
+    """Store the full description if it doesn't fit the preview on the movie row."""
+    if description and len(description) > DESCRIPTION_PREVIEW_LENGTH:
+        await session.execute(
+            sqlite_insert(MovieText)
+            .values(movie_id=movie_id, description=description)
+            .on_conflict_do_update(index_elements=["movie_id"], set_={"description": description})
+        )
+    else:
+        await session.execute(delete(MovieText).filter(MovieText.movie_id == movie_id))
+
+
+async def get_movie_description(session: AsyncSession, movie_id: int) -> Optional[str]:
+    """Full description of a movie (for an expanded card)."""
+    result = await session.execute(
+        select(func.coalesce(MovieText.description, Movie.description))
+        .select_from(Movie)
+        .outerjoin(MovieText, MovieText.movie_id == Movie.id)
+        .filter(Movie.id == movie_id)
+    )
+    return result.scalar()
+
+
+async def get_movie_views(session: AsyncSession, movie_ids: list[int]) -> list[MovieView]:
+    """Build UI views of movies from plain row selects (no ORM instances), in movie_ids order."""
+    if not movie_ids:
+        return []
+    ids = list(dict.fromkeys(movie_ids))
+
+    names = {movie_id: ([], [], []) for movie_id in ids}  # genres, directors, actors
+    name_queries = (
+        select(MovieGenre.movie_id, Genre.name)
+        .join(Genre, Genre.id == MovieGenre.genre_id)
+        .filter(MovieGenre.movie_id.in_(ids)),
+        select(MovieDirector.movie_id, Director.name)
+        .join(Director, Director.id == MovieDirector.director_id)
+        .filter(MovieDirector.movie_id.in_(ids)),
+        select(MovieActor.movie_id, Actor.name)
+        .join(Actor, Actor.id == MovieActor.actor_id)
+        .filter(MovieActor.movie_id.in_(ids))
+        .order_by(MovieActor.movie_id, MovieActor.order),
+    )
+    for slot, query in enumerate(name_queries):
+        for movie_id, name in await session.execute(query):
+            names[movie_id][slot].append(name)
+
+    result = await session.execute(select(*MOVIE_VIEW_COLUMNS).filter(Movie.id.in_(ids)))
+    rows = {row[0]: row for row in result}
+    return [
+        MovieView(*rows[movie_id], *(intern_names(group) for group in names[movie_id]))
+        for movie_id in ids
+        if movie_id in rows
+    ]
 
 
 # =============================================================================
 # M2M Setters
 # =============================================================================
 
-async def set_movie_genres(session: AsyncSession, movie: Movie, genres_string: str):
-    """Set movie genres from a comma-separated string."""
+async def set_movie_genres(session: AsyncSession, movie: Movie, genres_string: str) -> list[int]:
+    """Set movie genres from a comma-separated string. Returns the saved genre IDs."""
     await session.execute(delete(MovieGenre).filter(MovieGenre.movie_id == movie.id))
+    movie.genre_mask = 0
 
     if not genres_string:
-        return
+        return []
 
     from .genre_utils import normalize_genres_async
     genre_ids = await normalize_genres_async(genres_string, session)
@@ -251,6 +623,13 @@ async def set_movie_genres(session: AsyncSession, movie: Movie, genres_string: s
         if genre_id not in seen_genre_ids:
             seen_genre_ids.add(genre_id)
             session.add(MovieGenre(movie_id=movie.id, genre_id=genre_id))
+    movie.genre_mask = genre_mask_from_ids(list(seen_genre_ids))
+    return list(seen_genre_ids)
+
+
+def movie_has_genres(genre_mask: int):
+    """SQL condition: the movie has all genres of genre_mask (genre_mask & ? = ?)."""
+    return Movie.genre_mask.op("&")(genre_mask) == genre_mask
 
 
 async def set_movie_directors(session: AsyncSession, movie: Movie, directors: list[dict]):
@@ -328,6 +707,30 @@ async def get_or_create_actor(session: AsyncSession, tmdb_id: int, name: str) ->
     return actor
 
 
+async def get_people_names(session: AsyncSession) -> list[tuple[int, str]]:
+    """Get (tmdb_id, name) of all stored directors and actors."""
+    result = await session.execute(union(
+        select(Director.tmdb_id, Director.name).filter(Director.tmdb_id.is_not(None)),
+        select(Actor.tmdb_id, Actor.name).filter(Actor.tmdb_id.is_not(None)),
+    ))
+    return [(row[0], row[1]) for row in result.all()]
+
+
+async def get_movie_titles(session: AsyncSession) -> list[tuple[str, Optional[str], Optional[int], bool]]:
+    """Get (title, title_original, year, is_tv) of all stored movies and TV shows."""
+    result = await session.execute(select(Movie.title, Movie.title_original, Movie.year, Movie.is_tv))
+    return [(row[0], row[1], row[2], row[3]) for row in result.all()]
+
+
+async def get_person_ids_by_name(session: AsyncSession, name: str) -> list[int]:
+    """Get TMDB IDs of stored directors/actors with exactly this name."""
+    result = await session.execute(union(
+        select(Director.tmdb_id).filter(Director.name == name, Director.tmdb_id.is_not(None)),
+        select(Actor.tmdb_id).filter(Actor.name == name, Actor.tmdb_id.is_not(None)),
+    ))
+    return [row[0] for row in result.all()]
+
+
 async def get_genre_by_id(session: AsyncSession, genre_id: int) -> Optional[Genre]:
     """Get genre by ID."""
     result = await session.execute(select(Genre).filter(Genre.id == genre_id))
@@ -350,6 +753,16 @@ async def get_actor_by_id(session: AsyncSession, actor_id: int) -> Optional[Acto
 # User Ratings
 # =============================================================================
 
+def get_ratings_version() -> int:
+    """Counter that changes whenever user ratings (or entity ratings derived from them) change."""
+    return _ratings_version
+
+
+def _bump_ratings_version():
+    global _ratings_version
+    _ratings_version += 1
+
+
 async def get_user_rating(session: AsyncSession, movie_id: int) -> Optional[UserRating]:
     """Get user rating for a movie."""
     result = await session.execute(
@@ -360,8 +773,19 @@ async def get_user_rating(session: AsyncSession, movie_id: int) -> Optional[User
     return result.scalar_one_or_none()
 
 
-async def save_user_rating(session: AsyncSession, movie_id: int, rating: int, review: Optional[str] = None) -> UserRating:
-    """Save or update user rating for a movie (fast, no entity recalc)."""
+async def save_user_rating(
+    session: AsyncSession,
+    movie_id: int,
+    rating: int,
+    review: Optional[str] = None,
+    auto_commit: bool = True
+) -> UserRating:
+    """Save or update user rating for a movie (fast, no entity recalc).
+
+    Args:
+        review: New review text; None keeps the existing one
+        auto_commit: If False, caller is responsible for commit (for batch operations)
+    """
     user_rating = await get_user_rating(session, movie_id)
 
     if user_rating is None:
@@ -378,48 +802,107 @@ async def save_user_rating(session: AsyncSession, movie_id: int, rating: int, re
     if wishlist_item:
         await session.delete(wishlist_item)
 
-    await session.commit()
-    await session.refresh(user_rating)
+    if auto_commit:
+        await session.commit()
+        _bump_ratings_version()
+        await session.refresh(user_rating)
+    else:
+        await session.flush()
     return user_rating
 
 
-async def delete_user_rating(session: AsyncSession, movie_id: int) -> bool:
+async def delete_user_rating(session: AsyncSession, movie_id: int, auto_commit: bool = True) -> bool:
     """Delete user rating for a movie (fast, no entity recalc)."""
     user_rating = await get_user_rating(session, movie_id)
     if user_rating is None:
         return False
 
     await session.delete(user_rating)
-    await session.commit()
+    if auto_commit:
+        await session.commit()
+        _bump_ratings_version()
+    else:
+        await session.flush()
     return True
 
 
 async def update_entity_ratings_for_movie(session: AsyncSession, movie_id: int):
     """Update entity ratings for a movie (can be called in background)."""
-    movie = await session.get(Movie, movie_id, options=[
-        selectinload(Movie.genre_list),
-        selectinload(Movie.director_list),
-        selectinload(Movie.actor_list),
-    ])
-    if movie:
-        await update_entity_ratings(session, movie)
+    await update_entity_ratings_for_movies(session, [movie_id])
+
+
+async def update_entity_ratings_for_movies(session: AsyncSession, movie_ids: list[int]):
+    """Update entity ratings once for all genres/directors/actors of the movies, then commit."""
+    if not movie_ids:
+        return
+    result = await session.execute(
+        select(Movie).options(*movie_load_options()).filter(Movie.id.in_(set(movie_ids)))
+    )
+    movies = result.scalars().all()
+    await _update_entity_stats(session, [g for m in movies for g in m.genre_list], MovieGenre.genre_id)
+    await _update_entity_stats(session, [d for m in movies for d in m.director_list], MovieDirector.director_id)
+    await _update_entity_stats(session, [a for m in movies for a in m.actor_list], MovieActor.actor_id)
+    await session.commit()
+    _bump_ratings_version()
+    _notify_ratings_changed(list(set(movie_ids)))
+
+
+def add_ratings_changed_listener(callback: Callable[[list[int]], None]):
+    """Register a callback run with movie IDs whose rating changed (after entity ratings are updated)."""
+    _ratings_changed_listeners.append(callback)
+
+
+def _notify_ratings_changed(movie_ids: list[int]):
+    for callback in _ratings_changed_listeners:
+        try:
+            callback(movie_ids)
+        except Exception:
+            pass
+
+
+async def apply_user_edits(session: AsyncSession, edits: list[tuple[str, int, object]]):
+    """Apply queued user edits in a single transaction (see services.WriteQueue).
+
+    edits are (kind, movie_id, value) tuples in the order they were made:
+        - EDIT_RATING: (rating, review) to save, None to delete the rating
+        - EDIT_WISHLIST: True to add, False to remove
+        - EDIT_TAGS: list of tag IDs (replaces existing)
+    Entity ratings are recomputed once for all movies whose rating changed.
+    """
+    rated_movie_ids = []
+    for kind, movie_id, value in edits:
+        if kind == EDIT_RATING:
+            if value is None:
+                await delete_user_rating(session, movie_id, auto_commit=False)
+            else:
+                rating, review = value
+                await save_user_rating(session, movie_id, rating, review, auto_commit=False)
+            rated_movie_ids.append(movie_id)
+        elif kind == EDIT_WISHLIST:
+            if value:
+                await add_to_wishlist(session, movie_id, auto_commit=False)
+            else:
+                await remove_from_wishlist(session, movie_id, auto_commit=False)
+        elif kind == EDIT_TAGS:
+            await set_movie_tags(session, movie_id, value, auto_commit=False)
+
+    if rated_movie_ids:
+        await update_entity_ratings_for_movies(session, rated_movie_ids)
+    else:
         await session.commit()
 
 
-async def get_all_user_ratings(session: AsyncSession) -> list[UserRating]:
-    """Get all user ratings with their associated movies."""
+async def get_all_user_ratings(session: AsyncSession, profile: str = PROFILE_FULL) -> list[UserRating]:
+    """Get all user ratings with their associated movies (loaded per profile, see PROFILE_*)."""
     result = await session.execute(
         select(UserRating)
-        .options(
-            selectinload(UserRating.movie)
-            .selectinload(Movie.genre_list)
-        )
+        .options(selectinload(UserRating.movie).options(*movie_load_options(profile)))
     )
     return list(result.unique().scalars().all())
 
 
 async def get_user_ratings_batch(session: AsyncSession, movie_ids: list[int]) -> dict[int, UserRating]:
-    """Get user ratings for multiple movies in a single query.
+    """Get user ratings for multiple movies in a single query (movies are not loaded).
 
     Returns dict mapping movie_id -> UserRating.
     """
@@ -428,7 +911,7 @@ async def get_user_ratings_batch(session: AsyncSession, movie_ids: list[int]) ->
 
     result = await session.execute(
         select(UserRating)
-        .options(selectinload(UserRating.movie).selectinload(Movie.genre_list))
+        .options(raiseload(UserRating.movie))
         .filter(UserRating.movie_id.in_(movie_ids))
     )
     ratings = result.unique().scalars().all()
@@ -437,18 +920,15 @@ async def get_user_ratings_batch(session: AsyncSession, movie_ids: list[int]) ->
 
 
 
-async def get_rated_movies(session: AsyncSession, min_rating: Optional[int] = None) -> list[Movie]:
-    """Get all movies that have user ratings."""
-    query = (
-        select(Movie)
-        .join(UserRating)
-        .options(
-            selectinload(Movie.genre_list),
-            selectinload(Movie.director_list),
-            selectinload(Movie.actor_list),
-            selectinload(Movie.user_rating),
-        )
-    )
+async def get_rated_movies(
+    session: AsyncSession,
+    min_rating: Optional[int] = None,
+    profile: str = PROFILE_FULL
+) -> list[Movie]:
+    """Get all movies that have user ratings (loaded per profile, see PROFILE_*)."""
+    query = select(Movie).join(UserRating).options(*movie_load_options(profile))
+    if profile == PROFILE_FULL:
+        query = query.options(selectinload(Movie.user_rating))
     if min_rating is not None:
         query = query.filter(UserRating.rating >= min_rating)
     result = await session.execute(query)
@@ -461,68 +941,177 @@ async def get_rated_movies(session: AsyncSession, min_rating: Optional[int] = No
 
 async def update_entity_ratings(session: AsyncSession, movie: Movie):
     """Update ratings for all entities related to a movie using batch queries."""
-    # Batch update genres (single query for all genre IDs)
-    genre_ids = [g.id for g in movie.genre_list]
-    if genre_ids:
-        result = await session.execute(
-            select(
-                MovieGenre.genre_id,
-                func.avg(UserRating.rating).label('avg_rating'),
-                func.count(UserRating.id).label('rating_count')
-            )
-            .join(Movie, MovieGenre.movie_id == Movie.id)
-            .join(UserRating, UserRating.movie_id == Movie.id)
-            .filter(MovieGenre.genre_id.in_(genre_ids))
-            .group_by(MovieGenre.genre_id)
+    await _update_entity_stats(session, movie.genre_list, MovieGenre.genre_id)
+    await _update_entity_stats(session, movie.director_list, MovieDirector.director_id)
+    await _update_entity_stats(session, movie.actor_list, MovieActor.actor_id)
+
+
+async def _update_entity_stats(session: AsyncSession, entities: list, link_column):
+    """Recompute avg_rating/rating_count of genres, directors or actors (single query).
+
+    link_column is the entity column of the M2M table (e.g. MovieGenre.genre_id).
+    """
+    entities = list({entity.id: entity for entity in entities}.values())
+    if not entities:
+        return
+    link = link_column.class_
+    result = await session.execute(
+        select(
+            link_column,
+            func.avg(UserRating.rating).label('avg_rating'),
+            func.count(UserRating.id).label('rating_count')
         )
-        genre_stats = {row.genre_id: (row.avg_rating, row.rating_count) for row in result.all()}
-        for genre in movie.genre_list:
-            if genre.id in genre_stats:
-                genre.avg_rating, genre.rating_count = genre_stats[genre.id]
-            else:
-                genre.avg_rating, genre.rating_count = None, 0
-
-    # Batch update directors
-    director_ids = [d.id for d in movie.director_list]
-    if director_ids:
-        result = await session.execute(
-            select(
-                MovieDirector.director_id,
-                func.avg(UserRating.rating).label('avg_rating'),
-                func.count(UserRating.id).label('rating_count')
-            )
-            .join(Movie, MovieDirector.movie_id == Movie.id)
-            .join(UserRating, UserRating.movie_id == Movie.id)
-            .filter(MovieDirector.director_id.in_(director_ids))
-            .group_by(MovieDirector.director_id)
+        .join(Movie, link.movie_id == Movie.id)
+        .join(UserRating, UserRating.movie_id == Movie.id)
+        .filter(link_column.in_([entity.id for entity in entities]))
+        .group_by(link_column)
+    )
+    stats = {row[0]: (row.avg_rating, row.rating_count) for row in result.all()}
+    for entity in entities:
+        entity.avg_rating, entity.rating_count = stats.get(entity.id, (None, 0))
+
+
+# =============================================================================
+# Personal Scores
+# =============================================================================
+
+async def get_scoring_rows(session: AsyncSession, movie_ids: Optional[list[int]] = None) -> list[ScoringRow]:
+    """Load personal scoring inputs of movies (all stored movies if movie_ids is None) as plain rows."""
+    rating_queries = (
+        select(MovieGenre.movie_id, Genre.avg_rating)
+        .join(Genre, Genre.id == MovieGenre.genre_id)
+        .filter(Genre.avg_rating.is_not(None)),
+        select(MovieDirector.movie_id, Director.avg_rating)
+        .join(Director, Director.id == MovieDirector.director_id)
+        .filter(Director.avg_rating.is_not(None)),
+        # Unrated actors are kept: only the first billed ones count
+        select(MovieActor.movie_id, Actor.avg_rating)
+        .join(Actor, Actor.id == MovieActor.actor_id)
+        .order_by(MovieActor.movie_id, MovieActor.order),
+    )
+    movie_query = select(
+        Movie.id, Movie.kinopoisk_id, Movie.is_tv,
+        Movie.tmdb_rating, Movie.imdb_rating, Movie.rotten_tomatoes, Movie.metacritic,
+    )
+    if movie_ids is not None:
+        if not movie_ids:
+            return []
+        rating_queries = tuple(
+            query.filter(link.movie_id.in_(movie_ids))
+            for query, link in zip(rating_queries, (MovieGenre, MovieDirector, MovieActor))
         )
-        director_stats = {row.director_id: (row.avg_rating, row.rating_count) for row in result.all()}
-        for director in movie.director_list:
-            if director.id in director_stats:
-                director.avg_rating, director.rating_count = director_stats[director.id]
-            else:
-                director.avg_rating, director.rating_count = None, 0
-
-    # Batch update actors
-    actor_ids = [a.id for a in movie.actor_list]
-    if actor_ids:
-        result = await session.execute(
-            select(
-                MovieActor.actor_id,
-                func.avg(UserRating.rating).label('avg_rating'),
-                func.count(UserRating.id).label('rating_count')
-            )
-            .join(Movie, MovieActor.movie_id == Movie.id)
-            .join(UserRating, UserRating.movie_id == Movie.id)
-            .filter(MovieActor.actor_id.in_(actor_ids))
-            .group_by(MovieActor.actor_id)
+        movie_query = movie_query.filter(Movie.id.in_(movie_ids))
+
+    ratings = {}  # movie_id -> (genre, director, actor ratings)
+    for slot, query in enumerate(rating_queries):
+        for movie_id, avg_rating in await session.execute(query):
+            ratings.setdefault(movie_id, ([], [], []))[slot].append(avg_rating)
+
+    result = await session.execute(movie_query)
+    empty = ((), (), ())
+    return [
+        ScoringRow(*row, *(tuple(group) for group in ratings.get(row[0], empty)))
+        for row in result
+    ]
+
+
+async def get_movie_ids_sharing_entities(session: AsyncSession, movie_ids: list[int]) -> set[int]:
+    """IDs of movies with a genre, director or actor of the given movies (including themselves)."""
+    if not movie_ids:
+        return set()
+    queries = [
+        select(link.movie_id).filter(
+            link_column.in_(select(link_column).filter(link.movie_id.in_(movie_ids)))
         )
-        actor_stats = {row.actor_id: (row.avg_rating, row.rating_count) for row in result.all()}
-        for actor in movie.actor_list:
-            if actor.id in actor_stats:
-                actor.avg_rating, actor.rating_count = actor_stats[actor.id]
-            else:
-                actor.avg_rating, actor.rating_count = None, 0
+        for link, link_column in (
+            (MovieGenre, MovieGenre.genre_id),
+            (MovieDirector, MovieDirector.director_id),
+            (MovieActor, MovieActor.actor_id),
+        )
+    ]
+    result = await session.execute(union(*queries))
+    return {row[0] for row in result.all()} | set(movie_ids)
+
+
+async def get_movie_ids_by_kp_ids(session: AsyncSession, kp_ids_with_type: list[tuple[int, bool]]) -> set[int]:
+    """IDs of stored movies/TV shows with these (kinopoisk_id, is_tv) keys.
+
+    Movie and TV IDs are separate TMDB namespaces, so the same number may be
+    an unrelated title of the other type.
+    """
+    ids_by_type: dict[bool, set[int]] = {}
+    for kp_id, is_tv in kp_ids_with_type:
+        ids_by_type.setdefault(bool(is_tv), set()).add(kp_id)
+    if not ids_by_type:
+        return set()
+    result = await session.execute(
+        select(Movie.id).filter(or_(*(
+            (Movie.is_tv == is_tv) & Movie.kinopoisk_id.in_(kp_ids)
+            for is_tv, kp_ids in ids_by_type.items()
+        )))
+    )
+    return {row[0] for row in result.all()}
+
+
+async def save_personal_scores(session: AsyncSession, scores: dict[int, float], replace_all: bool = False):
+    """Upsert personal scores (movie_id -> score) and commit.
+
+    Args:
+        replace_all: Delete all other scores first (full rebuild)
+    """
+    if replace_all:
+        await session.execute(delete(PersonalScore))
+    now = utc_now().replace(tzinfo=None)
+    items = list(scores.items())
+    # Stay well below SQLite's bound parameter limit
+    for start in range(0, len(items), 500):
+        stmt = sqlite_insert(PersonalScore).values([
+            {"movie_id": movie_id, "score": score, "computed_at": now}
+            for movie_id, score in items[start:start + 500]
+        ])
+        await session.execute(stmt.on_conflict_do_update(
+            index_elements=[PersonalScore.movie_id],
+            set_={"score": stmt.excluded.score, "computed_at": stmt.excluded.computed_at},
+        ))
+    await session.commit()
+
+
+async def get_top_scored_movie_ids(
+    session: AsyncSession,
+    limit: int,
+    offset: int = 0,
+    genre_mask: int = 0,
+    exclude_rated: bool = True,
+    exclude_wishlist: bool = True,
+) -> list[int]:
+    """IDs of movies with the best personal score (walks idx_personal_score, no sorting).
+
+    Args:
+        genre_mask: Only movies with all these genres (see genre_utils.GENRE_BITS)
+        exclude_rated: Skip movies the user has rated
+        exclude_wishlist: Skip movies in the wishlist
+    """
+    query = select(PersonalScore.movie_id)
+    if genre_mask:
+        query = query.join(Movie, Movie.id == PersonalScore.movie_id).filter(movie_has_genres(genre_mask))
+    if exclude_rated:
+        query = query.filter(PersonalScore.movie_id.not_in(select(UserRating.movie_id)))
+    if exclude_wishlist:
+        query = query.filter(PersonalScore.movie_id.not_in(select(Wishlist.movie_id)))
+    result = await session.execute(
+        query.order_by(PersonalScore.score.desc()).limit(limit).offset(offset)
+    )
+    return [row[0] for row in result.all()]
+
+
+async def get_personal_scores(session: AsyncSession, movie_ids: list[int]) -> dict[int, float]:
+    """Stored personal scores of movies (movie_id -> score, unscored movies are missing)."""
+    if not movie_ids:
+        return {}
+    result = await session.execute(
+        select(PersonalScore.movie_id, PersonalScore.score).filter(PersonalScore.movie_id.in_(movie_ids))
+    )
+    return {movie_id: score for movie_id, score in result.all()}
 
 
 # =============================================================================
@@ -544,22 +1133,19 @@ async def search_local_movies_multi(session: AsyncSession, queries: list[str]) -
     for query in queries:
         search_term = f"%{query.lower()}%"
 
-        # Subquery for movies matching by fields
-        fields_subq = (
-            select(Movie.id)
-            .filter(or_(
-                func.lower(Movie.title).like(search_term),
-                func.lower(Movie.title_original).like(search_term),
-                func.lower(Movie.description).like(search_term),
-            ))
-        )
+        # Movies matching by fields, or having any genre whose name contains the word
+        conditions = [
+            func.lower(Movie.title).like(search_term),
+            func.lower(Movie.title_original).like(search_term),
+            func.lower(Movie.description).like(search_term),
+        ]
+        genre_mask = genre_mask_from_names([name for name in GENRE_BITS if query.lower() in name])
+        if genre_mask:
+            conditions.append(Movie.genre_mask.op("&")(genre_mask) != 0)
+        fields_subq = select(Movie.id).filter(or_(*conditions))
 
-        # Subquery for movies matching by genre
-        genre_subq = (
-            select(Movie.id)
-            .join(MovieGenre).join(Genre)
-            .filter(func.lower(Genre.name).like(search_term))
-        )
+        # Full descriptions that don't fit the preview
+        text_subq = select(MovieText.movie_id).filter(func.lower(MovieText.description).like(search_term))
 
         # Subquery for movies matching by director
         director_subq = (
@@ -575,26 +1161,54 @@ async def search_local_movies_multi(session: AsyncSession, queries: list[str]) -
             .filter(func.lower(Actor.name).like(search_term))
         )
 
-        all_subqueries.extend([fields_subq, genre_subq, director_subq, actor_subq])
+        all_subqueries.extend([fields_subq, text_subq, director_subq, actor_subq])
 
     # Combine all matching IDs with UNION and fetch movies with relationships
     combined_ids = union(*all_subqueries).subquery()
 
     result = await session.execute(
         select(Movie)
-        .options(selectinload(Movie.genre_list), selectinload(Movie.director_list), selectinload(Movie.actor_list))
+        .options(*movie_load_options())
         .filter(Movie.id.in_(select(combined_ids.c.id)))
     )
 
     return list(result.unique().scalars().all())
 
 
+async def count_movies_by_token_prefix(session: AsyncSession, prefixes: list[str]) -> dict[str, int]:
+    """Count local movies having a search token that starts with each prefix (single query).
+
+    Prefixes must be normalized tokens (see search_tokens.tokenize).
+    """
+    if not prefixes:
+        return {}
+
+    padded_tokens = literal(" ") + Movie.search_tokens
+    columns = []
+    for prefix in prefixes:
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        columns.append(func.sum(case((padded_tokens.like(f"% {escaped}%", escape="\\"), 1), else_=0)))
+
+    row = (await session.execute(select(*columns))).one()
+    return {prefix: count or 0 for prefix, count in zip(prefixes, row)}
+
+
 # =============================================================================
 # Recommendations Cache
 # =============================================================================
 
-async def get_cached_recommendations(session: AsyncSession, tmdb_id: int, is_tv: bool, max_age_days: int = 7) -> Optional[list[int]]:
-    """Get cached TMDB recommendations."""
+async def get_cached_recommendations(
+    session: AsyncSession,
+    tmdb_id: int,
+    is_tv: bool,
+    max_age_days: int = 7,
+    stale_keys: Optional[set[tuple[int, bool]]] = None
+) -> Optional[list[int]]:
+    """Get cached TMDB recommendations.
+
+    If stale_keys is given, expired entries are returned as well
+    (stale-while-revalidate) and their key is added to stale_keys.
+    """
     result = await session.execute(
         select(RecommendationCache)
         .filter(RecommendationCache.source_tmdb_id == tmdb_id, RecommendationCache.source_is_tv == is_tv)
@@ -606,7 +1220,9 @@ async def get_cached_recommendations(session: AsyncSession, tmdb_id: int, is_tv:
 
     cache_updated = cache.updated_at.replace(tzinfo=timezone.utc) if cache.updated_at.tzinfo is None else cache.updated_at
     if utc_now() - cache_updated > timedelta(days=max_age_days):
-        return None
+        if stale_keys is None:
+            return None
+        stale_keys.add((tmdb_id, is_tv))
 
     if cache.recommended_ids:
         return json.loads(cache.recommended_ids)
@@ -616,16 +1232,19 @@ async def get_cached_recommendations(session: AsyncSession, tmdb_id: int, is_tv:
 async def get_cached_recommendations_batch(
     session: AsyncSession,
     keys: list[tuple[int, bool]],
-    max_age_days: int = 7
+    max_age_days: int = 7,
+    stale_keys: Optional[set[tuple[int, bool]]] = None
 ) -> dict[tuple[int, bool], list[int]]:
     """Get cached TMDB recommendations for multiple movies in a single query.
 
     Args:
         keys: List of (tmdb_id, is_tv) tuples
+        stale_keys: If given, expired entries are returned as well
+            (stale-while-revalidate) and their keys are added to this set.
 
     Returns:
         Dict mapping (tmdb_id, is_tv) -> list of recommended IDs.
-        Missing or expired entries are not included.
+        Missing entries are not included, expired ones only with stale_keys.
     """
     if not keys:
         return {}
@@ -646,10 +1265,12 @@ async def get_cached_recommendations_batch(
     output = {}
 
     for cache in caches:
+        key = (cache.source_tmdb_id, cache.source_is_tv)
         cache_updated = cache.updated_at.replace(tzinfo=timezone.utc) if cache.updated_at.tzinfo is None else cache.updated_at
         if now - cache_updated > max_age:
-            continue
-        key = (cache.source_tmdb_id, cache.source_is_tv)
+            if stale_keys is None:
+                continue
+            stale_keys.add(key)
         if cache.recommended_ids:
             output[key] = json.loads(cache.recommended_ids)
         else:
@@ -658,27 +1279,432 @@ async def get_cached_recommendations_batch(
     return output
 
 
-async def save_cached_recommendations(session: AsyncSession, tmdb_id: int, is_tv: bool, recommended_ids: list[int]):
-    """Save TMDB recommendations to cache."""
+def recommendation_job_key(tmdb_id: int, is_tv: bool) -> str:
+    """Job key of a recommendation cache refresh ("tmdb_id:is_tv")."""
+    return f"{tmdb_id}:{int(is_tv)}"
+
+
+async def get_expiring_recommendation_keys(
+    session: AsyncSession,
+    max_age: timedelta,
+    limit: int = 10,
+    skip_job_kind: Optional[str] = None
+) -> list[tuple[int, bool]]:
+    """Get keys of cache entries older than max_age, oldest first.
+
+    Used by the background refresher to renew entries before they expire.
+
+    Args:
+        skip_job_kind: Leave out entries that already have a job of this kind
+            (queued, running or given up), keyed by recommendation_job_key
+    """
+    cutoff = (utc_now() - max_age).replace(tzinfo=None)
+    query = (
+        select(RecommendationCache.source_tmdb_id, RecommendationCache.source_is_tv)
+        .filter(RecommendationCache.updated_at < cutoff)
+    )
+    if skip_job_kind is not None:
+        job_key = func.printf("%d:%d", RecommendationCache.source_tmdb_id, RecommendationCache.source_is_tv)
+        query = query.filter(
+            ~select(Job.id).filter(Job.kind == skip_job_kind, Job.key == job_key).exists()
+        )
     result = await session.execute(
-        select(RecommendationCache)
-        .filter(RecommendationCache.source_tmdb_id == tmdb_id, RecommendationCache.source_is_tv == is_tv)
+        query.order_by(RecommendationCache.updated_at.asc()).limit(limit)
     )
-    cache = result.scalar_one_or_none()
+    return [(row.source_tmdb_id, row.source_is_tv) for row in result.all()]
 
-    if cache is None:
-        cache = RecommendationCache(
-            source_tmdb_id=tmdb_id,
-            source_is_tv=is_tv,
-            recommended_ids=json.dumps(recommended_ids),
-            updated_at=utc_now()
+
+async def save_cached_recommendations(
+    session: AsyncSession,
+    tmdb_id: int,
+    is_tv: bool,
+    recommended_ids: list[int],
+    auto_commit: bool = True
+):
+    """Save TMDB recommendations to cache.
+
+    Args:
+        auto_commit: If False, caller is responsible for commit (for batch operations)
+    """
+    await save_cached_recommendations_batch(session, {(tmdb_id, is_tv): recommended_ids}, auto_commit=auto_commit)
+
+
+async def save_cached_recommendations_batch(
+    session: AsyncSession,
+    recommendations: dict[tuple[int, bool], list[int]],
+    auto_commit: bool = True
+):
+    """Save TMDB recommendations for many movies with a single upsert statement.
+
+    Args:
+        recommendations: Dict mapping (tmdb_id, is_tv) -> list of recommended IDs
+        auto_commit: If False, caller is responsible for commit (for batch operations)
+    """
+    if not recommendations:
+        return
+
+    now = utc_now()
+    rows = [
+        {
+            "source_tmdb_id": tmdb_id,
+            "source_is_tv": is_tv,
+            "recommended_ids": json.dumps(rec_ids),
+            "updated_at": now,
+        }
+        for (tmdb_id, is_tv), rec_ids in recommendations.items()
+    ]
+
+    stmt = sqlite_insert(RecommendationCache).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[RecommendationCache.source_tmdb_id, RecommendationCache.source_is_tv],
+        set_={
+            "recommended_ids": stmt.excluded.recommended_ids,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    await session.execute(stmt)
+
+    if auto_commit:
+        await session.commit()
+
+
+# =============================================================================
+# Person Filmographies Cache
+# =============================================================================
+
+async def get_person_filmographies_batch(
+    session: AsyncSession,
+    person_ids: list[int],
+    max_age: timedelta
+) -> dict[int, tuple[list[dict], list[dict]]]:
+    """Get cached filmographies not older than max_age.
+
+    Returns:
+        Dict mapping TMDB person ID -> (movies, tv_shows) lists of basic dicts.
+    """
+    if not person_ids:
+        return {}
+
+    cutoff = (utc_now() - max_age).replace(tzinfo=None)
+    result = await session.execute(
+        select(PersonFilmography)
+        .filter(PersonFilmography.person_tmdb_id.in_(person_ids), PersonFilmography.updated_at >= cutoff)
+    )
+    return {
+        row.person_tmdb_id: (json.loads(row.movies or "[]"), json.loads(row.tv_shows or "[]"))
+        for row in result.scalars().all()
+    }
+
+
+async def save_person_filmographies_batch(
+    session: AsyncSession,
+    filmographies: dict[int, tuple[list[dict], list[dict]]],
+    auto_commit: bool = True
+):
+    """Save filmographies for many people with a single upsert statement.
+
+    Args:
+        filmographies: Dict mapping TMDB person ID -> (movies, tv_shows)
+        auto_commit: If False, caller is responsible for commit (for batch operations)
+    """
+    if not filmographies:
+        return
+
+    now = utc_now()
+    rows = [
+        {
+            "person_tmdb_id": person_id,
+            "movies": json.dumps(movies),
+            "tv_shows": json.dumps(tv_shows),
+            "updated_at": now,
+        }
+        for person_id, (movies, tv_shows) in filmographies.items()
+    ]
+
+    stmt = sqlite_insert(PersonFilmography).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PersonFilmography.person_tmdb_id],
+        set_={
+            "movies": stmt.excluded.movies,
+            "tv_shows": stmt.excluded.tv_shows,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    await session.execute(stmt)
+
+    if auto_commit:
+        await session.commit()
+
+
+# =============================================================================
+# Job Queue
+# =============================================================================
+
+async def enqueue_jobs(
+    session: AsyncSession,
+    kind: str,
+    jobs: list[tuple[str, dict]],
+    delay: Optional[timedelta] = None,
+    auto_commit: bool = True
+):
+    """Add jobs to the persistent queue with a single upsert statement.
+
+    Jobs are idempotent per (kind, key): enqueueing an existing key never
+    adds a duplicate. A queued or given up job gets the new payload and is
+    pending again, keeping its attempt count and any later next_run_at, so
+    retry backoff and JobQueue.MAX_ATTEMPTS still apply. A running job keeps
+    running with the payload it was claimed with; a different new payload is
+    stored and marked for a rerun, which complete_jobs/fail_jobs queue once
+    the current run ends.
+
+    Args:
+        jobs: List of (key, payload) tuples, payload must be JSON-serializable
+        delay: Don't run the jobs before now + delay
+        auto_commit: If False, caller is responsible for commit (for batch operations)
+    """
+    if not jobs:
+        return
+
+    now = utc_now().replace(tzinfo=None)
+    run_at = now + delay if delay else now
+    rows = {
+        key: {
+            "kind": kind,
+            "key": key,
+            "payload": json.dumps(payload),
+            "status": "pending",
+            "rerun": False,
+            "attempts": 0,
+            "next_run_at": run_at,
+            "last_error": None,
+            "created_at": now,
+        }
+        for key, payload in jobs
+    }
+
+    running = Job.status == "running"
+    stmt = sqlite_insert(Job).values(list(rows.values()))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Job.kind, Job.key],
+        set_={
+            "payload": stmt.excluded.payload,
+            "status": case((running, Job.status), else_=stmt.excluded.status),
+            # Only a changed payload needs another run
+            "rerun": case((running, or_(Job.rerun, Job.payload != stmt.excluded.payload)), else_=False),
+            "next_run_at": func.max(Job.next_run_at, stmt.excluded.next_run_at),
+        },
+    )
+    await session.execute(stmt)
+
+    if auto_commit:
+        await session.commit()
+
+
+async def get_queued_job_keys(session: AsyncSession, kind: str, keys: list[str]) -> set[str]:
+    """Keys among keys that already have a job of this kind (queued, running or given up)."""
+    if not keys:
+        return set()
+    result = await session.execute(select(Job.key).filter(Job.kind == kind, Job.key.in_(set(keys))))
+    return {row[0] for row in result.all()}
+
+
+async def claim_jobs(session: AsyncSession, limit: int = 20) -> list[Job]:
+    """Mark a batch of due jobs as running and return them.
+
+    The oldest due job decides the kind, so a batch always holds jobs
+    of a single kind that can be processed together.
+    """
+    now = utc_now().replace(tzinfo=None)
+    due = (Job.status == "pending", Job.next_run_at <= now)
+
+    result = await session.execute(select(Job.kind).filter(*due).order_by(Job.id).limit(1))
+    kind = result.scalar()
+    if kind is None:
+        return []
+
+    result = await session.execute(
+        select(Job).filter(Job.kind == kind, *due).order_by(Job.id).limit(limit)
+    )
+    jobs = list(result.scalars().all())
+    for job in jobs:
+        job.status = "running"
+        job.attempts += 1
+    await session.commit()
+    return jobs
+
+
+async def complete_jobs(session: AsyncSession, job_ids: list[int]):
+    """Remove finished jobs from the queue (only running ones: a job may have been reset meanwhile).
+
+    Jobs re-enqueued during the run are queued again with their new payload instead.
+    """
+    if not job_ids:
+        return
+    running = (Job.id.in_(job_ids), Job.status == "running")
+    await session.execute(
+        update(Job).filter(*running, Job.rerun).values(status="pending", rerun=False, attempts=0, last_error=None)
+    )
+    await session.execute(delete(Job).filter(*running))
+    await session.commit()
+
+
+async def fail_jobs(
+    session: AsyncSession,
+    job_ids: list[int],
+    error: str,
+    retry_delay: Optional[timedelta],
+):
+    """Record a failed attempt: reschedule after retry_delay, or give up if it is None.
+
+    A job re-enqueued during the run is never given up: its new payload is still to run.
+    """
+    if not job_ids:
+        return
+    result = await session.execute(select(Job).filter(Job.id.in_(job_ids), Job.status == "running"))
+    now = utc_now().replace(tzinfo=None)
+    for job in result.scalars().all():
+        job.last_error = error[:1000]
+        if retry_delay is None and not job.rerun:
+            job.status = "failed"
+        else:
+            job.status = "pending"
+            job.next_run_at = max(job.next_run_at, now + (retry_delay or timedelta()))
+        job.rerun = False
+    await session.commit()
+
+
+async def reset_running_jobs(session: AsyncSession) -> int:
+    """Return jobs left running by an interrupted session to the queue."""
+    result = await session.execute(
+        update(Job).filter(Job.status == "running").values(status="pending", rerun=False)
+    )
+    await session.commit()
+    return result.rowcount or 0
+
+
+async def count_pending_jobs(session: AsyncSession) -> dict[str, int]:
+    """Get the number of queued (pending or running) jobs per kind."""
+    result = await session.execute(
+        select(Job.kind, func.count(Job.id))
+        .filter(Job.status.in_(("pending", "running")))
+        .group_by(Job.kind)
+    )
+    return {kind: count for kind, count in result.all()}
+
+
+# =============================================================================
+# Maintenance
+# =============================================================================
+
+async def touch_movies(session: AsyncSession, movie_ids: list[int], min_interval: timedelta):
+    """Mark movies as accessed now (skipping ones already marked within min_interval)."""
+    if not movie_ids:
+        return
+    now = utc_now().replace(tzinfo=None)
+    await session.execute(
+        update(Movie)
+        .filter(
+            Movie.id.in_(movie_ids),
+            or_(Movie.last_accessed_at.is_(None), Movie.last_accessed_at < now - min_interval),
         )
-        session.add(cache)
-    else:
-        cache.recommended_ids = json.dumps(recommended_ids)
-        cache.updated_at = utc_now()
+        .values(last_accessed_at=now)
+    )
+    await session.commit()
 
+
+async def get_prunable_movie_ids(session: AsyncSession, older_than: timedelta, limit: int) -> list[int]:
+    """Get IDs of movies not accessed for older_than that hold no user data.
+
+    Rated, wishlisted and tagged movies are always kept.
+    """
+    cutoff = utc_now().replace(tzinfo=None) - older_than
+    kept_ids = union(select(UserRating.movie_id), select(Wishlist.movie_id), select(MovieTag.movie_id))
+    result = await session.execute(
+        select(Movie.id)
+        .filter(
+            func.coalesce(Movie.last_accessed_at, Movie.created_at) < cutoff,
+            Movie.id.not_in(kept_ids),
+        )
+        .limit(limit)
+    )
+    return [row[0] for row in result.all()]
+
+
+async def delete_movies(session: AsyncSession, movie_ids: list[int]) -> int:
+    """Delete movies with their genre/director/actor/tag links, texts and scores. Returns the number deleted."""
+    if not movie_ids:
+        return 0
+    for link in (MovieGenre, MovieDirector, MovieActor, MovieTag, MovieText, PersonalScore):
+        await session.execute(delete(link).filter(link.movie_id.in_(movie_ids)))
+    result = await session.execute(delete(Movie).filter(Movie.id.in_(movie_ids)))
+    await session.commit()
+    return result.rowcount or 0
+
+
+async def delete_orphaned_people(session: AsyncSession) -> int:
+    """Delete directors and actors no longer linked to any movie. Returns the number deleted."""
+    directors = await session.execute(
+        delete(Director).filter(~select(MovieDirector.movie_id).filter(MovieDirector.director_id == Director.id).exists())
+    )
+    actors = await session.execute(
+        delete(Actor).filter(~select(MovieActor.movie_id).filter(MovieActor.actor_id == Actor.id).exists())
+    )
+    await session.commit()
+    return (directors.rowcount or 0) + (actors.rowcount or 0)
+
+
+async def delete_stale_cache_rows(session: AsyncSession, older_than: timedelta) -> int:
+    """Delete recommendation/filmography cache rows and failed jobs older than older_than."""
+    cutoff = utc_now().replace(tzinfo=None) - older_than
+    deleted = 0
+    for statement in (
+        delete(RecommendationCache).filter(RecommendationCache.updated_at < cutoff),
+        delete(PersonFilmography).filter(PersonFilmography.updated_at < cutoff),
+        delete(Job).filter(Job.status == "failed", Job.created_at < cutoff),
+    ):
+        result = await session.execute(statement)
+        deleted += result.rowcount or 0
+    await session.commit()
+    return deleted
+
+
+async def compact_database(max_pages: int = 0) -> int:
+    """Reclaim free pages with incremental VACUUM and refresh planner statistics (ANALYZE).
+
+    Covers the main and the cache database. Databases created before auto_vacuum
+    was enabled are converted by a one-time full VACUUM. max_pages limits the
+    pages freed per database and call (0 = all). Returns the number of bytes reclaimed.
+    """
+    reclaimed = 0
+    async with _engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for schema in ("main", CACHE_SCHEMA):
+            page_size = (await conn.execute(text(f"PRAGMA {schema}.page_size"))).scalar()
+            free_before = (await conn.execute(text(f"PRAGMA {schema}.freelist_count"))).scalar()
+
+            if (await conn.execute(text(f"PRAGMA {schema}.auto_vacuum"))).scalar() != 2:  # 2 = INCREMENTAL
+                await conn.execute(text(f"PRAGMA {schema}.auto_vacuum = INCREMENTAL"))
+                await conn.execute(text(f"VACUUM {schema}"))
+            else:
+                # executescript steps the pragma to completion (execute frees a single page)
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.executescript(f"PRAGMA {schema}.incremental_vacuum({int(max_pages)});")
+
+            free_after = (await conn.execute(text(f"PRAGMA {schema}.freelist_count"))).scalar()
+            reclaimed += max(free_before - free_after, 0) * page_size
+        await conn.execute(text("ANALYZE"))
+    return reclaimed
+
+
+async def clear_cache_database(session: AsyncSession) -> int:
+    """Delete everything in the cache database (it refills on demand). Returns the number of rows."""
+    deleted = 0
+    for table in Base.metadata.sorted_tables:
+        if table.schema == CACHE_SCHEMA:
+            result = await session.execute(table.delete())
+            deleted += result.rowcount or 0
     await session.commit()
+    return deleted
 
 
 # =============================================================================
@@ -691,7 +1717,7 @@ async def is_in_wishlist(session: AsyncSession, movie_id: int) -> bool:
     return result.scalar_one_or_none() is not None
 
 
-async def add_to_wishlist(session: AsyncSession, movie_id: int) -> Wishlist:
+async def add_to_wishlist(session: AsyncSession, movie_id: int, auto_commit: bool = True) -> Wishlist:
     """Add movie to wishlist."""
     result = await session.execute(select(Wishlist).filter(Wishlist.movie_id == movie_id))
     existing = result.scalar_one_or_none()
@@ -700,30 +1726,36 @@ async def add_to_wishlist(session: AsyncSession, movie_id: int) -> Wishlist:
 
     wishlist_item = Wishlist(movie_id=movie_id)
     session.add(wishlist_item)
-    await session.commit()
-    await session.refresh(wishlist_item)
+    if auto_commit:
+        await session.commit()
+        await session.refresh(wishlist_item)
+    else:
+        await session.flush()
     return wishlist_item
 
 
-async def remove_from_wishlist(session: AsyncSession, movie_id: int) -> bool:
+async def remove_from_wishlist(session: AsyncSession, movie_id: int, auto_commit: bool = True) -> bool:
     """Remove movie from wishlist."""
     result = await session.execute(select(Wishlist).filter(Wishlist.movie_id == movie_id))
     item = result.scalar_one_or_none()
     if item:
         await session.delete(item)
-        await session.commit()
+        if auto_commit:
+            await session.commit()
+        else:
+            await session.flush()
         return True
     return False
 
 
 async def get_wishlist(session: AsyncSession) -> list[Wishlist]:
-    """Get all wishlist items ordered by added date (newest first)."""
+    """Get all wishlist items ordered by added date (newest first).
+
+    Movies are not loaded: build their views with get_movie_views.
+    """
     result = await session.execute(
         select(Wishlist)
-        .options(
-            selectinload(Wishlist.movie)
-            .selectinload(Movie.genre_list)
-        )
+        .options(raiseload(Wishlist.movie))
         .order_by(Wishlist.added_at.desc())
     )
     return list(result.unique().scalars().all())
@@ -777,12 +1809,15 @@ async def delete_tag(session: AsyncSession, tag_id: int) -> bool:
     return True
 
 
-async def set_movie_tags(session: AsyncSession, movie_id: int, tag_ids: list[int]):
+async def set_movie_tags(session: AsyncSession, movie_id: int, tag_ids: list[int], auto_commit: bool = True):
     """Set tags for a movie (replaces existing)."""
     await session.execute(delete(MovieTag).filter(MovieTag.movie_id == movie_id))
     for tag_id in tag_ids:
         session.add(MovieTag(movie_id=movie_id, tag_id=tag_id))
-    await session.commit()
+    if auto_commit:
+        await session.commit()
+    else:
+        await session.flush()
 
 
 async def get_movie_tags(session: AsyncSession, movie_id: int) -> list[Tag]:
@@ -803,15 +1838,22 @@ async def get_all_user_ratings_filtered(
     exclude_tags: Optional[list[str]] = None,
     rating_values: Optional[set[int]] = None,
 ) -> list[UserRating]:
-    """Get user ratings with sorting and filtering (optimized with SQL sorting)."""
+    """Get user ratings with sorting and filtering (optimized with SQL sorting).
+
+    Movies carry only their id and tags (for the tag filters): build views
+    for display with get_movie_views.
+    """
     query = (
         select(UserRating)
         .join(Movie)
         .options(
-            selectinload(UserRating.movie)
-            .selectinload(Movie.genre_list),
-            selectinload(UserRating.movie)
-            .selectinload(Movie.tag_list),
+            selectinload(UserRating.movie).options(
+                load_only(Movie.id, raiseload=True),
+                selectinload(Movie.tag_list),
+                raiseload(Movie.genre_list),
+                raiseload(Movie.director_list),
+                raiseload(Movie.actor_list),
+            ),
         )
     )
 
@@ -823,6 +1865,10 @@ async def get_all_user_ratings_filtered(
     if rating_values:
         query = query.filter(UserRating.rating.in_(rating_values))
 
+    # Genre filter (SQL, genre bitmask)
+    if genres:
+        query = query.filter(movie_has_genres(genre_mask_from_names(genres)))
+
     # Sorting (SQL)
     sort_map = {
         "rating_desc": UserRating.rating.desc(),
@@ -840,14 +1886,6 @@ async def get_all_user_ratings_filtered(
     result = await session.execute(query)
     user_ratings = list(result.unique().scalars().all())
 
-    # Genre filter (Python - more reliable for case-insensitive matching)
-    if genres:
-        genres_lower = [g.lower() for g in genres]
-        user_ratings = [
-            ur for ur in user_ratings
-            if all(g in [x.name.lower() for x in ur.movie.genre_list] for g in genres_lower)
-        ]
-
     # Tag include filter (Python)
     if tags:
         tags_lower = [t.lower() for t in tags]
@@ -44,6 +44,24 @@ COMBINED_GENRES = {
     "war & politics": ["военный"],
 }
 
+# Bit of each canonical genre in Movie.genre_mask: GENRE_SEED_DATA order, only append new genres
+GENRE_BITS = {name: 1 << i for i, (name, _, _, _) in enumerate(GENRE_SEED_DATA)}
+
+# Filter bit of a genre that can't be resolved: no movie has it, so such a filter matches nothing
+UNKNOWN_GENRE_BIT = 1 << 62
+
+# Combined TMDB TV genres filter by one canonical genre (as search always did)
+SHARED_TV_GENRE_NAMES = {10759: "боевик", 10765: "фантастика", 10768: "военный"}
+
+# TMDB genre ID -> canonical name (movie IDs first, then TV IDs)
+TMDB_GENRE_NAMES: dict[int, str] = {}
+for _name, _, _movie_id, _ in GENRE_SEED_DATA:
+    if _movie_id is not None:
+        TMDB_GENRE_NAMES.setdefault(_movie_id, _name)
+for _name, _, _, _tv_id in GENRE_SEED_DATA:
+    if _tv_id is not None:
+        TMDB_GENRE_NAMES.setdefault(_tv_id, SHARED_TV_GENRE_NAMES.get(_tv_id, _name))
+
 # Caches for genre lookups (name/alias -> Genre.id)
 _genre_cache: dict[str, int] = {}
 _alias_cache: dict[str, int] = {}
@@ -162,6 +180,43 @@ def get_genre_name_by_id(genre_id: int, session: Session) -> Optional[str]:
     return genre.name if genre else None
 
 
+def get_genre_names(genre_ids: list[int]) -> list[str]:
+    """Get canonical (lowercase) genre names for IDs from the cache (unknown IDs are skipped)."""
+    names_by_id = {genre_id: name for name, genre_id in _genre_cache.items()}
+    return [names_by_id[genre_id] for genre_id in genre_ids if genre_id in names_by_id]
+
+
+def genre_mask_from_names(names: list[str]) -> int:
+    """Genre filter bitmask for canonical genre names (case-insensitive).
+
+    An unknown name adds UNKNOWN_GENRE_BIT, so the filter matches no movie
+    instead of being dropped (an empty mask matches every movie).
+    """
+    mask = 0
+    for name in names:
+        mask |= GENRE_BITS.get(name.lower(), UNKNOWN_GENRE_BIT)
+    return mask
+
+
+def genre_mask_from_ids(genre_ids: list[int]) -> int:
+    """Genre bitmask for Genre IDs (from the cache, unknown IDs are skipped)."""
+    return genre_mask_from_names(get_genre_names(genre_ids))
+
+
+def genre_mask_from_tmdb_ids(tmdb_ids: list[int]) -> int:
+    """Genre filter bitmask for TMDB genre IDs (as selected in the search bar, see genre_mask_from_names)."""
+    mask = 0
+    for tmdb_id in tmdb_ids:
+        name = TMDB_GENRE_NAMES.get(tmdb_id)
+        mask |= GENRE_BITS[name] if name else UNKNOWN_GENRE_BIT
+    return mask
+
+
+def has_genres(genre_mask: Optional[int], required_mask: int) -> bool:
+    """Whether a movie's genre bitmask contains all required genres."""
+    return (genre_mask or 0) & required_mask == required_mask
+
+
 def clear_cache():
     """Clear the genre cache. Useful for testing."""
     global _genre_cache, _alias_cache, _cache_initialized
@@ -1,9 +1,15 @@
 from datetime import datetime, timezone
 from sqlalchemy import Column, Integer, String, Float, Text, LargeBinary, DateTime, ForeignKey, Boolean, UniqueConstraint
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.orm import declarative_base, deferred, relationship
 
 Base = declarative_base()
 
+# Schema name of the attached cache database (disposable data, see db.init_db)
+CACHE_SCHEMA = "cache"
+
+# Movie.description keeps this many characters; longer texts live in MovieText
+DESCRIPTION_PREVIEW_LENGTH = 300
+
 
 def utc_now():
     """Return timezone-aware UTC datetime."""
@@ -135,7 +141,8 @@ class Movie(Base):
     title = Column(String(500), nullable=False)
     title_original = Column(String(500), nullable=True)
     year = Column(Integer, nullable=True)
-    description = Column(Text, nullable=True)
+    description = Column(Text, nullable=True)  # Preview, full text in MovieText (see description_truncated)
+    description_truncated = Column(Boolean, default=False, nullable=False)  # A longer text is stored in MovieText
     poster_url = Column(String(1000), nullable=True)
     # Ratings from different sources
     tmdb_rating = Column(Float, nullable=True)
@@ -143,16 +150,52 @@ class Movie(Base):
     imdb_rating = Column(Float, nullable=True)
     rotten_tomatoes = Column(Integer, nullable=True)  # percentage 0-100
     metacritic = Column(Integer, nullable=True)  # score 0-100
-    embedding = Column(LargeBinary, nullable=True)
+    # Ratings enrichment freshness per source ("external" = MDBList/OMDB, "kp" = Kinopoisk)
+    # status: "ok" (rating found), "missing" (source has no rating), "error" (request failed)
+    external_checked_at = Column(DateTime, nullable=True)
+    external_status = Column(String(16), nullable=True)
+    external_attempts = Column(Integer, default=0, nullable=False)
+    external_next_retry_at = Column(DateTime, nullable=True)
+    kp_checked_at = Column(DateTime, nullable=True)
+    kp_status = Column(String(16), nullable=True)
+    kp_attempts = Column(Integer, default=0, nullable=False)
+    kp_next_retry_at = Column(DateTime, nullable=True)
+    # Hydration state: when each part of the record was last loaded (None = never).
+    # Credits are marked loaded even when TMDB has no directors/actors for the title.
+    details_loaded_at = Column(DateTime, nullable=True)  # Full TMDB details and genres
+    credits_loaded_at = Column(DateTime, nullable=True)  # Directors and actors
+    ratings_loaded_at = Column(DateTime, nullable=True)  # External/Kinopoisk ratings lookup
+    # Normalized search tokens of titles, genres, people and description (see search_tokens.py)
+    search_tokens = Column(Text, nullable=True)
+    # Canonical genres as bits (see genre_utils.GENRE_BITS), kept in sync by set_movie_genres
+    genre_mask = Column(Integer, default=0, nullable=False)
+    embedding = deferred(Column(LargeBinary, nullable=True))  # Unused, never loaded with the row
     created_at = Column(DateTime, default=utc_now)
+    last_accessed_at = Column(DateTime, nullable=True)  # Last shown in results (retention, see prune)
 
     # Relationships
     user_rating = relationship("UserRating", back_populates="movie", uselist=False)
     genre_list = relationship("Genre", secondary="movie_genres", back_populates="movies", lazy="selectin")
     director_list = relationship("Director", secondary="movie_directors", back_populates="movies", lazy="selectin")
-    actor_list = relationship("Actor", secondary="movie_actors", back_populates="movies", lazy="selectin")
+    actor_list = relationship(
+        "Actor", secondary="movie_actors", back_populates="movies", lazy="selectin", order_by="MovieActor.order"
+    )
     tag_list = relationship("Tag", secondary="movie_tags", back_populates="movies", lazy="selectin")
 
+    @property
+    def hydration_state(self) -> str:
+        """Most complete loaded stage: "basic" < "details" < "credits" < "ratings"."""
+        state = "basic"
+        for stage, loaded_at in (
+            ("details", self.details_loaded_at),
+            ("credits", self.credits_loaded_at),
+            ("ratings", self.ratings_loaded_at),
+        ):
+            if loaded_at is None:
+                break
+            state = stage
+        return state
+
     @property
     def genres_display(self) -> str:
         """Get comma-separated genre names."""
@@ -172,6 +215,23 @@ class Movie(Base):
         return f"<Movie(id={self.id}, title='{self.title}', year={self.year})>"
 
 
+class MovieText(Base):
+    """Full description of a movie, loaded only when a card's description is expanded."""
+    __tablename__ = "movie_texts"
+
+    movie_id = Column(Integer, ForeignKey("movies.id", ondelete="CASCADE"), primary_key=True)
+    description = Column(Text, nullable=False)
+
+
+class PersonalScore(Base):
+    """Precomputed personal score of a movie (kept up to date by services.scores.PersonalScores)."""
+    __tablename__ = "personal_scores"
+
+    movie_id = Column(Integer, ForeignKey("movies.id", ondelete="CASCADE"), primary_key=True)
+    score = Column(Float, nullable=False)
+    computed_at = Column(DateTime, default=utc_now)
+
+
 class UserRating(Base):
     __tablename__ = "user_ratings"
 
@@ -202,6 +262,34 @@ class Wishlist(Base):
         return f"<Wishlist(movie_id={self.movie_id})>"
 
 
+class Job(Base):
+    """Persistent background job, processed by services.jobs.JobQueue.
+
+    Kept in the main database: pending jobs (M2M saves, ratings enrichment)
+    are work owed to stored movies, not disposable cache.
+    """
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String(32), nullable=False)
+    key = Column(String(100), nullable=False)  # Idempotency key: re-enqueueing replaces the job
+    payload = Column(Text, nullable=False)  # JSON
+    status = Column(String(16), default="pending", nullable=False)  # pending / running / failed
+    rerun = Column(Boolean, default=False, nullable=False)  # Re-enqueued while running: run the new payload next
+    attempts = Column(Integer, default=0, nullable=False)
+    next_run_at = Column(DateTime, default=utc_now, nullable=False)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=utc_now)
+
+    __table_args__ = (
+        UniqueConstraint('kind', 'key', name='uq_job_kind_key'),
+    )
+
+
+# =============================================================================
+# Cache database tables (can be wiped without losing user data)
+# =============================================================================
+
 class RecommendationCache(Base):
     """Caches TMDB recommendations for rated movies."""
     __tablename__ = "recommendation_cache"
@@ -214,4 +302,17 @@ class RecommendationCache(Base):
 
     __table_args__ = (
         UniqueConstraint('source_tmdb_id', 'source_is_tv', name='uq_source_tmdb'),
+        {"schema": CACHE_SCHEMA},
     )
+
+
+class PersonFilmography(Base):
+    """Caches TMDB filmographies (movie and TV credits) of people."""
+    __tablename__ = "person_filmographies"
+
+    person_tmdb_id = Column(Integer, primary_key=True)  # TMDB person ID
+    movies = Column(Text, nullable=True)  # JSON list of basic movie dicts
+    tv_shows = Column(Text, nullable=True)  # JSON list of basic TV show dicts
+    updated_at = Column(DateTime, default=utc_now)
+
+    __table_args__ = {"schema": CACHE_SCHEMA}
@@ -0,0 +1,92 @@
+import re
+import unicodedata
+from bisect import bisect_left
+from typing import Optional
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Match modes for TokenIndex.matches
+MATCH_EXACT = "exact"  # Whole tokens only
+MATCH_PREFIX = "prefix"  # Query token may be the beginning of a movie token
+MATCH_FUZZY = "fuzzy"  # Prefix, or a token within one typo (insertion/deletion/substitution)
+
+FUZZY_MIN_LENGTH = 4  # Shorter query tokens only match exactly or by prefix
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for searching: NFKC, Unicode casefolding and ё -> е."""
+    return unicodedata.normalize("NFKC", text).casefold().replace("ё", "е")
+
+
+def tokenize(text: Optional[str]) -> list[str]:
+    """Split text into normalized word tokens."""
+    if not text:
+        return []
+    return _TOKEN_RE.findall(normalize_text(text))
+
+
+def build_search_tokens(*texts: Optional[str]) -> str:
+    """Build the persisted token string: sorted unique tokens separated by spaces."""
+    tokens = set()
+    for text in texts:
+        tokens.update(tokenize(text))
+    return " ".join(sorted(tokens))
+
+
+class TokenIndex:
+    """Parsed search tokens of a single movie (set for exact, sorted list for prefix lookups)."""
+
+    __slots__ = ("source", "tokens", "sorted_tokens")
+
+    def __init__(self, source: str):
+        self.source = source
+        self.sorted_tokens = source.split()  # Persisted already sorted
+        self.tokens = frozenset(self.sorted_tokens)
+
+    def matches(self, query_tokens: list[str], mode: str = MATCH_PREFIX) -> bool:
+        """Check that every query token is found in the index."""
+        for token in query_tokens:
+            if token in self.tokens:
+                continue
+            if mode == MATCH_EXACT:
+                return False
+            if self._has_prefix(token):
+                continue
+            if mode == MATCH_FUZZY and self._has_close(token):
+                continue
+            return False
+        return True
+
+    def _has_prefix(self, prefix: str) -> bool:
+        i = bisect_left(self.sorted_tokens, prefix)
+        return i < len(self.sorted_tokens) and self.sorted_tokens[i].startswith(prefix)
+
+    def _has_close(self, token: str) -> bool:
+        if len(token) < FUZZY_MIN_LENGTH:
+            return False
+        return any(
+            abs(len(candidate) - len(token)) <= 1 and _within_one_edit(token, candidate)
+            for candidate in self.sorted_tokens
+        )
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """Whether a and b differ by at most one inserted, deleted or substituted character."""
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:]
+    return a[i:] == b[i + 1:]
+
+
+def get_token_index(movie) -> TokenIndex:
+    """Parsed token index of a movie, cached on the instance until search_tokens changes."""
+    source = movie.search_tokens or ""
+    index = movie.__dict__.get("_token_index")
+    if index is None or index.source != source:
+        index = TokenIndex(source)
+        movie._token_index = index
+    return index
@@ -0,0 +1,93 @@
+from sys import intern
+from typing import Iterable, NamedTuple, Optional
+
+
+def intern_names(names: Iterable[Optional[str]]) -> tuple[str, ...]:
+    """Tuple of interned names: genres and people repeat across thousands of cards."""
+    return tuple(intern(name) for name in names if name)
+
+
+class MovieView(NamedTuple):
+    """Immutable movie data for the UI (lists and cards).
+
+    Holds no session, instance state or relationship collections, so long
+    result lists stay small. Built from loaded ORM movies (from_movie) or
+    straight from rows (db.get_movie_views). Field names match Movie, so the
+    UI and services reading ids/ratings accept either.
+    """
+    id: int
+    kinopoisk_id: int
+    is_tv: bool
+    imdb_id: Optional[str]
+    title: str
+    title_original: Optional[str]
+    year: Optional[int]
+    description: Optional[str]  # Preview (see Movie.description)
+    description_truncated: bool
+    poster_url: Optional[str]
+    tmdb_rating: Optional[float]
+    kp_rating: Optional[float]
+    imdb_rating: Optional[float]
+    rotten_tomatoes: Optional[int]
+    metacritic: Optional[int]
+    genres: tuple[str, ...] = ()
+    directors: tuple[str, ...] = ()
+    actors: tuple[str, ...] = ()  # Billing order
+
+    @classmethod
+    def from_movie(cls, movie) -> "MovieView":
+        """View of a Movie with genre/director/actor lists loaded (a MovieView is returned as is)."""
+        if isinstance(movie, cls):
+            return movie
+        return cls(
+            movie.id, movie.kinopoisk_id, movie.is_tv, movie.imdb_id,
+            movie.title, movie.title_original, movie.year, movie.description, bool(movie.description_truncated),
+            movie.poster_url,
+            movie.tmdb_rating, movie.kp_rating, movie.imdb_rating, movie.rotten_tomatoes, movie.metacritic,
+            intern_names(g.name for g in movie.genre_list),
+            intern_names(d.name for d in movie.director_list),
+            intern_names(a.name for a in movie.actor_list),
+        )
+
+    @property
+    def genres_display(self) -> str:
+        return ", ".join(self.genres)
+
+    @property
+    def directors_display(self) -> str:
+        return ", ".join(self.directors)
+
+    @property
+    def actors_display(self) -> str:
+        return ", ".join(self.actors)
+
+
+class RatingView(NamedTuple):
+    """User rating as shown on a card (detached from the ORM and the movie)."""
+    movie_id: int
+    rating: int
+    review: Optional[str] = None
+
+    @classmethod
+    def from_rating(cls, user_rating) -> "RatingView":
+        if isinstance(user_rating, cls):
+            return user_rating
+        return cls(user_rating.movie_id, user_rating.rating, user_rating.review)
+
+
+class ScoringRow(NamedTuple):
+    """What personal scoring reads for a movie, as plain values (see db.get_scoring_rows).
+
+    Entity ratings are avg_rating values (None for entities without rated
+    movies), actors in billing order.
+    """
+    id: int
+    kinopoisk_id: int
+    is_tv: bool
+    tmdb_rating: Optional[float]
+    imdb_rating: Optional[float]
+    rotten_tomatoes: Optional[int]
+    metacritic: Optional[int]
+    genre_ratings: tuple[Optional[float], ...] = ()
+    director_ratings: tuple[Optional[float], ...] = ()
+    actor_ratings: tuple[Optional[float], ...] = ()
@@ -1,2 +1,8 @@
 from .search import SearchService
 from .recommender import RecommenderService
+from .jobs import JobQueue
+from .people import PersonIndex
+from .suggestions import SuggestionIndex, Suggestion
+from .maintenance import MaintenanceService, MaintenanceReport
+from .writes import WriteQueue, WriteStats
+from .scores import PersonalScores
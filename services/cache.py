@@ -0,0 +1,116 @@
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss/eviction counters for a cache tier."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hit_rate, 3),
+        }
+
+
+def estimate_size(value) -> int:
+    """Approximate memory footprint of a value in bytes (containers included)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item) for item in value)
+    return size
+
+
+class MemoryCache:
+    """LRU cache bounded by approximate memory size, with optional TTL.
+
+    Entries are evicted least-recently-used first once the total estimated
+    size exceeds max_bytes. Expired entries are dropped lazily on access.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl_seconds: Optional[float] = None,
+        sizeof: Callable[[object], int] = estimate_size,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._sizeof = sizeof
+        # key -> (value, size, expires_at)
+        self._cache: OrderedDict = OrderedDict()
+        self._size_bytes = 0
+        self.stats = CacheStats()
+
+    def get(self, key):
+        entry = self._cache.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+
+        value, _, expires_at = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            self._remove(key)
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+
+        self._cache.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def set(self, key, value):
+        if key in self._cache:
+            self._remove(key)
+
+        size = self._sizeof(key) + self._sizeof(value)
+        if size > self.max_bytes:
+            return  # Never cache a single entry bigger than the whole cache
+
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else None
+        self._cache[key] = (value, size, expires_at)
+        self._size_bytes += size
+
+        while self._size_bytes > self.max_bytes:
+            oldest_key = next(iter(self._cache))
+            self._remove(oldest_key)
+            self.stats.evictions += 1
+
+    def discard(self, key):
+        if key in self._cache:
+            self._remove(key)
+
+    def _remove(self, key):
+        _, size, _ = self._cache.pop(key)
+        self._size_bytes -= size
+
+    def __contains__(self, key):
+        return key in self._cache
+
+    def __len__(self):
+        return len(self._cache)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size_bytes
+
+    def clear(self):
+        self._cache.clear()
+        self._size_bytes = 0
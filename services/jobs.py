@@ -0,0 +1,208 @@
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import (
+    get_session, enqueue_jobs, claim_jobs, complete_jobs, fail_jobs,
+    reset_running_jobs, count_pending_jobs,
+)
+
+# Processes a batch of payloads of one kind; raising fails (and retries) the whole batch
+JobHandler = Callable[[AsyncSession, list[dict]], Awaitable[None]]
+
+
+@dataclass
+class JobStats:
+    """Job queue counters for the current session."""
+    enqueued: int = 0
+    completed: int = 0
+    retried: int = 0
+    failed: int = 0
+    batches: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def throughput(self) -> float:
+        """Completed jobs per minute since start."""
+        elapsed = time.monotonic() - self.started_at
+        return self.completed * 60 / elapsed if elapsed > 0 else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "enqueued": self.enqueued,
+            "completed": self.completed,
+            "retried": self.retried,
+            "failed": self.failed,
+            "batches": self.batches,
+            "throughput_per_min": round(self.throughput, 2),
+        }
+
+
+class JobQueue:
+    """Persistent background job queue processed by a pool of async workers.
+
+    Jobs live in the jobs table, so work scheduled before the app was closed
+    is picked up on the next start. Handlers must be idempotent: a job may
+    run again after a failure or an interrupted session.
+    """
+
+    WORKERS = 2
+    BATCH_SIZE = 20  # Jobs of one kind processed in a single handler call
+    POLL_INTERVAL = 5.0  # Seconds between polls when idle (enqueue wakes workers earlier)
+    MAX_ATTEMPTS = 5
+    RETRY_BASE = timedelta(seconds=30)  # Doubled after every failed attempt
+    DRAIN_TIMEOUT = 3.0  # Seconds to wait for in-flight batches on shutdown
+
+    def __init__(self):
+        self._handlers: dict[str, JobHandler] = {}
+        self._wakeup = asyncio.Event()
+        self._claim_lock = asyncio.Lock()
+        self._stopped = asyncio.Event()
+        self._running = False
+        self.stats = JobStats()
+
+    def register(self, kind: str, handler: JobHandler):
+        """Register the handler for a job kind."""
+        self._handlers[kind] = handler
+
+    async def enqueue(
+        self,
+        kind: str,
+        jobs: list[tuple[str, dict]],
+        delay: Optional[timedelta] = None,
+        session: Optional[AsyncSession] = None
+    ):
+        """Add (key, payload) jobs to the queue.
+
+        With a session the jobs are only added to it and the caller commits,
+        so they are saved atomically with the caller's changes (call notify()
+        after the commit). Without one they are committed right away.
+        """
+        if not jobs:
+            return
+        if session is not None:
+            await enqueue_jobs(session, kind, jobs, delay=delay, auto_commit=False)
+        else:
+            async with get_session() as own_session:
+                await enqueue_jobs(own_session, kind, jobs, delay=delay)
+            self.notify()
+        self.stats.enqueued += len(jobs)
+
+    def notify(self):
+        """Wake idle workers to check for new jobs."""
+        self._wakeup.set()
+
+    async def run(self, shutdown_event: asyncio.Event):
+        """Process jobs until shutdown.
+
+        In-flight batches are finished on shutdown, queued jobs stay in the
+        database for the next start.
+        """
+        self._running = True
+        self._stopped.clear()
+        try:
+            async with get_session() as session:
+                await reset_running_jobs(session)
+        except Exception:
+            pass
+
+        shutdown_waiter = asyncio.create_task(self._wake_on_shutdown(shutdown_event))
+        try:
+            await asyncio.gather(*(self._worker(shutdown_event) for _ in range(self.WORKERS)))
+        finally:
+            shutdown_waiter.cancel()
+            self._running = False
+            self._stopped.set()
+
+    async def drain(self, timeout: float = None):
+        """Wait for workers to finish their in-flight batches after shutdown was signalled."""
+        if not self._running:
+            return
+        try:
+            await asyncio.wait_for(self._stopped.wait(), timeout or self.DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+
+    async def get_stats(self) -> dict:
+        """Queue depth per kind plus session counters."""
+        try:
+            async with get_session() as session:
+                depth = await count_pending_jobs(session)
+        except Exception:
+            depth = {}
+        return {"depth": depth, "pending": sum(depth.values()), **self.stats.as_dict()}
+
+    async def _wake_on_shutdown(self, shutdown_event: asyncio.Event):
+        await shutdown_event.wait()
+        self._wakeup.set()
+
+    async def _worker(self, shutdown_event: asyncio.Event):
+        while not shutdown_event.is_set():
+            batch = await self._claim_batch()
+            if batch:
+                await self._process_batch(batch)
+                continue
+
+            self._wakeup.clear()
+            if shutdown_event.is_set():
+                return
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim_batch(self) -> list[tuple[int, str, int, dict]]:
+        """Claim due jobs as (id, kind, attempts, payload) tuples."""
+        async with self._claim_lock:
+            try:
+                async with get_session() as session:
+                    jobs = await claim_jobs(session, self.BATCH_SIZE)
+                    return [(job.id, job.kind, job.attempts, json.loads(job.payload)) for job in jobs]
+            except Exception:
+                return []
+
+    async def _process_batch(self, batch: list[tuple[int, str, int, dict]]):
+        kind = batch[0][1]
+        job_ids = [job_id for job_id, _, _, _ in batch]
+        self.stats.batches += 1
+
+        try:
+            handler = self._handlers.get(kind)
+            if handler is None:
+                raise LookupError(f"No handler for job kind {kind!r}")
+            async with get_session() as session:
+                await handler(session, [payload for _, _, _, payload in batch])
+        except Exception as e:
+            await self._record_failure(batch, repr(e))
+            return
+
+        try:
+            async with get_session() as session:
+                await complete_jobs(session, job_ids)
+            self.stats.completed += len(job_ids)
+        except Exception:
+            pass
+
+    async def _record_failure(self, batch: list[tuple[int, str, int, dict]], error: str):
+        """Reschedule failed jobs with exponential backoff, give up after MAX_ATTEMPTS."""
+        by_attempts: dict[int, list[int]] = {}
+        for job_id, _, attempts, _ in batch:
+            by_attempts.setdefault(attempts, []).append(job_id)
+
+        try:
+            async with get_session() as session:
+                for attempts, job_ids in by_attempts.items():
+                    if attempts >= self.MAX_ATTEMPTS:
+                        await fail_jobs(session, job_ids, error, retry_delay=None)
+                        self.stats.failed += len(job_ids)
+                    else:
+                        delay = self.RETRY_BASE * 2 ** (attempts - 1)
+                        await fail_jobs(session, job_ids, error, retry_delay=delay)
+                        self.stats.retried += len(job_ids)
+        except Exception:
+            pass
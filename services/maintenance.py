@@ -0,0 +1,112 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Optional
+
+from database import (
+    get_session, get_prunable_movie_ids, delete_movies, delete_orphaned_people,
+    delete_stale_cache_rows, compact_database,
+)
+
+
+@dataclass
+class MaintenanceReport:
+    """What a maintenance run removed and reclaimed."""
+    movies: int = 0
+    people: int = 0
+    cache_rows: int = 0
+    bytes_reclaimed: int = 0
+    duration: float = 0.0
+    finished_at: float = field(default_factory=time.time)
+
+    def as_dict(self) -> dict:
+        return {
+            "movies": self.movies,
+            "people": self.people,
+            "cache_rows": self.cache_rows,
+            "bytes_reclaimed": self.bytes_reclaimed,
+            "duration": round(self.duration, 2),
+        }
+
+
+class MaintenanceService:
+    """Retention policy for the local movie cache.
+
+    Every search stores up to a hundred movies with their people, so the cache
+    is pruned in the background: movies not shown for MOVIE_RETENTION that hold
+    no user data (rating, wishlist, tags), then people left without movies and
+    stale cache rows. Finishes with incremental VACUUM and ANALYZE. In-memory
+    indexes passed in are refreshed when anything was deleted.
+    """
+
+    START_DELAY = 10 * 60  # Seconds after startup, so maintenance doesn't compete with the first searches
+    INTERVAL = 24 * 60 * 60  # Seconds between runs
+    MOVIE_RETENTION = timedelta(days=90)
+    CACHE_RETENTION = timedelta(days=60)  # Recommendation/filmography rows and failed jobs
+    BATCH_SIZE = 200  # Movies deleted per transaction
+    BATCH_PAUSE = 0.5  # Seconds between batches (keeps write locks short for the UI)
+    MAX_BATCHES = 50  # Per run; the rest is pruned next time
+
+    def __init__(self, suggestion_index=None, person_index=None, search_service=None):
+        self.suggestion_index = suggestion_index
+        self.person_index = person_index
+        self.search_service = search_service
+        self.last_report: Optional[MaintenanceReport] = None
+
+    async def run(self, shutdown_event: asyncio.Event):
+        """Run maintenance periodically until shutdown."""
+        delay = self.START_DELAY
+        while not shutdown_event.is_set():
+            try:
+                await asyncio.wait_for(shutdown_event.wait(), delay)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.run_once(shutdown_event)
+            except Exception:
+                pass
+            delay = self.INTERVAL
+
+    async def run_once(self, shutdown_event: Optional[asyncio.Event] = None) -> MaintenanceReport:
+        """Prune, compact and return the report (also kept in last_report)."""
+        started = time.monotonic()
+        report = MaintenanceReport()
+
+        for _ in range(self.MAX_BATCHES):
+            if shutdown_event is not None and shutdown_event.is_set():
+                break
+            async with get_session() as session:
+                movie_ids = await get_prunable_movie_ids(session, self.MOVIE_RETENTION, self.BATCH_SIZE)
+                report.movies += await delete_movies(session, movie_ids)
+            if len(movie_ids) < self.BATCH_SIZE:
+                break
+            await asyncio.sleep(self.BATCH_PAUSE)
+
+        async with get_session() as session:
+            report.people = await delete_orphaned_people(session)
+            report.cache_rows = await delete_stale_cache_rows(session, self.CACHE_RETENTION)
+
+        if report.movies or report.people:
+            await self._refresh_indexes()
+
+        if shutdown_event is None or not shutdown_event.is_set():
+            report.bytes_reclaimed = await compact_database()
+
+        report.duration = time.monotonic() - started
+        report.finished_at = time.time()
+        self.last_report = report
+        return report
+
+    async def _refresh_indexes(self):
+        """Drop deleted movies and people from the in-memory indexes."""
+        if self.person_index is not None:
+            self.person_index.invalidate()
+        if self.search_service is not None:
+            self.search_service.clear_result_cache()
+        if self.suggestion_index is not None:
+            try:
+                await self.suggestion_index.build()
+            except Exception:
+                pass
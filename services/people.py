@@ -0,0 +1,169 @@
+import asyncio
+from datetime import timedelta
+from typing import Optional
+
+from api import TMDBAPI
+from database import (
+    get_session, get_people_names, get_person_ids_by_name,
+    get_person_filmographies_batch, save_person_filmographies_batch,
+)
+from database.search_tokens import tokenize
+from .cache import MemoryCache
+
+
+class PersonIndex:
+    """Local person index: resolves names to TMDB person IDs and serves filmographies.
+
+    Names are resolved against stored directors and actors first; /search/person
+    is only called for unknown names that aren't the exact title of a search result.
+    Filmographies are cached in memory and in the DB (PersonFilmography).
+    """
+
+    MAX_PEOPLE = 2  # Top people whose filmographies are added to search results
+    FILMOGRAPHY_LIMIT = 10  # Movies and TV shows (each) per person added to search results
+    FILMOGRAPHY_STORE_LIMIT = 50  # Items (each) persisted per person
+    FILMOGRAPHY_MAX_AGE = timedelta(days=30)
+    MEMORY_CACHE_MAX_BYTES = 2 * 1024 * 1024
+    MEMORY_CACHE_TTL = 6 * 60 * 60
+
+    def __init__(self, tmdb_api: TMDBAPI):
+        self.tmdb_api = tmdb_api
+        # Normalized name -> TMDB person IDs, loaded from directors/actors on first use
+        self._names: Optional[dict[str, list[int]]] = None
+        self._filmographies = MemoryCache(
+            max_bytes=self.MEMORY_CACHE_MAX_BYTES,
+            ttl_seconds=self.MEMORY_CACHE_TTL,
+        )
+        # Normalized name -> person IDs from /search/person
+        self._remote_lookups = MemoryCache(max_bytes=256 * 1024, ttl_seconds=self.MEMORY_CACHE_TTL)
+
+    def invalidate(self):
+        """Forget the loaded names (people were deleted); reloaded on next use."""
+        self._names = None
+
+    @staticmethod
+    def _name_key(name: str) -> str:
+        return " ".join(tokenize(name))
+
+    async def search_filmographies(self, name: str, title_results: list[dict] = ()) -> list[dict]:
+        """Get basic movie/TV dicts of people matching name (as search_by_keyword adds them)."""
+        person_ids = await self.resolve(name, title_results)
+        if not person_ids:
+            return []
+
+        filmographies = await self.get_filmographies(person_ids)
+        items = []
+        for person_id in person_ids:
+            movies, tv_shows = filmographies.get(person_id, ([], []))
+            items.extend(movies[:self.FILMOGRAPHY_LIMIT])
+            items.extend(tv_shows[:self.FILMOGRAPHY_LIMIT])
+        return items
+
+    async def resolve(self, name: str, title_results: list[dict] = ()) -> list[int]:
+        """Resolve a name to up to MAX_PEOPLE TMDB person IDs."""
+        key = self._name_key(name)
+        if not key:
+            return []
+
+        person_ids = await self._local_ids(name, key)
+        if person_ids:
+            return person_ids[:self.MAX_PEOPLE]
+
+        if self._is_title(key, title_results):
+            return []
+
+        cached = self._remote_lookups.get(key)
+        if cached is not None:
+            return cached
+
+        people = await self.tmdb_api.search_person(name)
+        person_ids = [p.get("id") for p in people[:self.MAX_PEOPLE] if p.get("id")]
+        self._remote_lookups.set(key, person_ids)
+        return person_ids
+
+    async def _local_ids(self, name: str, key: str) -> list[int]:
+        """Look up stored directors/actors by normalized name, then by exact name (people added later)."""
+        try:
+            if self._names is None:
+                async with get_session() as session:
+                    people = await get_people_names(session)
+                names = {}
+                for tmdb_id, person_name in people:
+                    ids = names.setdefault(self._name_key(person_name), [])
+                    if tmdb_id not in ids:
+                        ids.append(tmdb_id)
+                self._names = names
+
+            person_ids = self._names.get(key)
+            if person_ids:
+                return person_ids
+
+            async with get_session() as session:
+                person_ids = await get_person_ids_by_name(session, name)
+            if person_ids:
+                self._names[key] = person_ids
+            return person_ids
+        except Exception:
+            return []
+
+    def _is_title(self, key: str, title_results: list[dict]) -> bool:
+        """Whether the query is exactly the title of a found movie/show (no person search needed)."""
+        for item in title_results:
+            for title in (item.get("title"), item.get("title_original")):
+                if title and self._name_key(title) == key:
+                    return True
+        return False
+
+    async def get_filmographies(self, person_ids: list[int]) -> dict[int, tuple[list[dict], list[dict]]]:
+        """Get (movies, tv_shows) per person: memory, then DB, then TMDB (saved to both)."""
+        output = {}
+        missing = []
+        for person_id in person_ids:
+            cached = self._filmographies.get(person_id)
+            if cached is not None:
+                output[person_id] = cached
+            else:
+                missing.append(person_id)
+        if not missing:
+            return output
+
+        try:
+            async with get_session() as session:
+                stored = await get_person_filmographies_batch(session, missing, self.FILMOGRAPHY_MAX_AGE)
+        except Exception:
+            stored = {}
+        for person_id, filmography in stored.items():
+            self._filmographies.set(person_id, filmography)
+            output[person_id] = filmography
+
+        to_fetch = [person_id for person_id in missing if person_id not in stored]
+        if not to_fetch:
+            return output
+
+        results = await asyncio.gather(
+            *(self._fetch_filmography(person_id) for person_id in to_fetch), return_exceptions=True
+        )
+        fetched = {}
+        for person_id, result in zip(to_fetch, results):
+            if isinstance(result, BaseException) or result is None:
+                continue
+            fetched[person_id] = result
+            self._filmographies.set(person_id, result)
+            output[person_id] = result
+
+        if fetched:
+            try:
+                async with get_session() as session:
+                    await save_person_filmographies_batch(session, fetched)
+            except Exception:
+                pass
+        return output
+
+    async def _fetch_filmography(self, person_id: int) -> Optional[tuple[list[dict], list[dict]]]:
+        movies, tv_shows = await asyncio.gather(
+            self.tmdb_api.get_person_movies(person_id),
+            self.tmdb_api.get_person_tv(person_id),
+        )
+        if not movies and not tv_shows:
+            return None  # Likely a failed request: don't cache
+        return movies[:self.FILMOGRAPHY_STORE_LIMIT], tv_shows[:self.FILMOGRAPHY_STORE_LIMIT]
@@ -1,41 +1,20 @@
+import asyncio
 from typing import Optional
 from collections import OrderedDict
+from datetime import timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.models import Movie
+from database.views import ScoringRow
 from database import (
-    get_all_user_ratings,
-    get_cached_recommendations, get_cached_recommendations_batch, save_cached_recommendations
+    get_all_user_ratings, get_session, PROFILE_SCORING,
+    get_cached_recommendations, get_cached_recommendations_batch, save_cached_recommendations,
+    save_cached_recommendations_batch, get_expiring_recommendation_keys, recommendation_job_key,
+    get_queued_job_keys,
 )
 from api import TMDBAPI
-
-
-class LRUCache:
-    """Simple LRU cache with max size."""
-
-    def __init__(self, max_size: int = 100):
-        self.max_size = max_size
-        self._cache: OrderedDict = OrderedDict()
-
-    def get(self, key):
-        if key in self._cache:
-            self._cache.move_to_end(key)
-            return self._cache[key]
-        return None
-
-    def set(self, key, value):
-        if key in self._cache:
-            self._cache.move_to_end(key)
-        else:
-            if len(self._cache) >= self.max_size:
-                self._cache.popitem(last=False)
-        self._cache[key] = value
-
-    def __contains__(self, key):
-        return key in self._cache
-
-    def clear(self):
-        self._cache.clear()
+from .cache import CacheStats, MemoryCache
+from .jobs import JobQueue
 
 
 class RecommenderService:
@@ -50,12 +29,30 @@ class RecommenderService:
 
     # Limits
     MAX_RATED_MOVIES_FOR_SIMILARITY = 30
-    MAX_CACHE_SIZE = 200  # Limit in-memory cache
+    MEMORY_CACHE_MAX_BYTES = 4 * 1024 * 1024  # ~4 MB of recommendation lists
+    MEMORY_CACHE_TTL = 6 * 60 * 60  # Re-check the DB tier every 6 hours
+
+    # Background refresh (stale-while-revalidate)
+    REFRESH_AHEAD_DAYS = 6  # Renew DB entries a day before they expire (7 days)
+    REFRESH_INTERVAL = 1.0  # Seconds between background TMDB calls
+    REFRESH_IDLE_INTERVAL = 60.0  # Seconds to sleep when nothing needs refreshing
+    REFRESH_BATCH_SIZE = 10
 
-    def __init__(self, tmdb_api: TMDBAPI):
+    def __init__(self, tmdb_api: TMDBAPI, job_queue: Optional[JobQueue] = None):
         self.tmdb_api = tmdb_api
-        # In-memory LRU cache for current session (backed by DB)
-        self._memory_cache = LRUCache(max_size=self.MAX_CACHE_SIZE)
+        self.job_queue = job_queue
+        if job_queue is not None:
+            job_queue.register("recommendations", self._handle_refresh_jobs)
+        # In-memory tier for the current session (backed by the DB tier)
+        self._memory_cache = MemoryCache(
+            max_bytes=self.MEMORY_CACHE_MAX_BYTES,
+            ttl_seconds=self.MEMORY_CACHE_TTL,
+        )
+        self._db_stats = CacheStats()
+        # Expired keys served from cache, waiting for background refresh (ordered set)
+        self._refresh_queue: OrderedDict = OrderedDict()
+        # In-flight TMDB recommendation requests, shared between concurrent callers
+        self._inflight: dict[tuple[int, bool], asyncio.Future] = {}
 
     async def calculate_score(
         self,
@@ -81,37 +78,49 @@ class RecommenderService:
             movie, session, cached_ratings, preloaded_recommendations
         )
 
-        # 2. Director rating (from M2M relationship)
-        if movie.director_list:
-            dir_scores = []
-            for director in movie.director_list:
-                if director.avg_rating is not None:
-                    dir_scores.append(director.avg_rating)
-            if dir_scores:
-                avg_dir = sum(dir_scores) / len(dir_scores)
-                score += self.WEIGHT_DIRECTOR * (avg_dir - 5)
-
-        # 3. Genres (from M2M relationship)
-        if movie.genre_list:
-            genre_scores = []
-            for genre in movie.genre_list:
-                if genre.avg_rating is not None:
-                    genre_scores.append(genre.avg_rating)
-            if genre_scores:
-                avg_genre = sum(genre_scores) / len(genre_scores)
-                score += self.WEIGHT_GENRES * (avg_genre - 5)
-
-        # 4. Actors (from M2M relationship)
-        if movie.actor_list:
-            actor_scores = []
-            for actor in movie.actor_list[:5]:  # Top 5 actors
-                if actor.avg_rating is not None:
-                    actor_scores.append(actor.avg_rating)
-            if actor_scores:
-                avg_actors = sum(actor_scores) / len(actor_scores)
-                score += self.WEIGHT_ACTORS * (avg_actors - 5)
-
-        # 5. Aggregator ratings (tiebreaker)
+        # 2-5. Directors, genres, actors and aggregator ratings
+        score += self._preference_score(
+            movie,
+            [g.avg_rating for g in movie.genre_list],
+            [d.avg_rating for d in movie.director_list],
+            [a.avg_rating for a in movie.actor_list],
+        )
+
+        return score
+
+    def score_row(self, row: ScoringRow, similarity: dict[int, float]) -> float:
+        """Personal score of a plain scoring row, same as calculate_score.
+
+        similarity maps (kinopoisk_id, is_tv) -> TMDB similarity score (see similarity_scores).
+        """
+        return (
+            self.WEIGHT_TMDB_SIMILARITY * similarity.get((row.kinopoisk_id, row.is_tv), 0.0)
+            + self._preference_score(row, row.genre_ratings, row.director_ratings, row.actor_ratings)
+        )
+
+    def _preference_score(self, movie, genre_ratings: list, director_ratings: list, actor_ratings: list) -> float:
+        """Score from entity avg_rating values (None = not rated, actors in billing order) and aggregators."""
+        score = 0.0
+
+        # Director rating
+        dir_scores = [r for r in director_ratings if r is not None]
+        if dir_scores:
+            avg_dir = sum(dir_scores) / len(dir_scores)
+            score += self.WEIGHT_DIRECTOR * (avg_dir - 5)
+
+        # Genres
+        genre_scores = [r for r in genre_ratings if r is not None]
+        if genre_scores:
+            avg_genre = sum(genre_scores) / len(genre_scores)
+            score += self.WEIGHT_GENRES * (avg_genre - 5)
+
+        # Actors
+        actor_scores = [r for r in actor_ratings[:5] if r is not None]  # Top 5 actors
+        if actor_scores:
+            avg_actors = sum(actor_scores) / len(actor_scores)
+            score += self.WEIGHT_ACTORS * (avg_actors - 5)
+
+        # Aggregator ratings (tiebreaker)
         aggregator_score = self._calculate_aggregator_score(movie)
         score += self.WEIGHT_AGGREGATORS * (aggregator_score - 5)
 
@@ -127,40 +136,23 @@ class RecommenderService:
         """Calculate score based on TMDB recommendations from rated movies."""
         # Use cached ratings if provided, otherwise fetch (slower)
         if cached_ratings is None:
-            user_ratings = await get_all_user_ratings(session)
+            user_ratings = await get_all_user_ratings(session, PROFILE_SCORING)
         else:
             user_ratings = cached_ratings
 
         if not user_ratings:
             return 0.0
 
-        # Filter out neutral ratings (5) - they don't affect recommendations
-        liked = [ur for ur in user_ratings if ur.rating >= 6]
-        disliked = [ur for ur in user_ratings if ur.rating <= 4]
-
-        # Sort and limit each group
-        half_limit = self.MAX_RATED_MOVIES_FOR_SIMILARITY // 2
-        top_liked = sorted(liked, key=lambda x: x.rating, reverse=True)[:half_limit]
-        top_disliked = sorted(disliked, key=lambda x: x.rating)[:half_limit]  # Lowest first
-
-        selected_ratings = top_liked + top_disliked
-
         total_score = 0.0
 
-        for ur in selected_ratings:
-            rated_movie = ur.movie
-            if not rated_movie:
-                continue
-
-            # Weight: rating of 5 is neutral, below is negative, above is positive
-            weight = ur.rating - 5  # Range: -4 to +5
-
+        for key, weight in self.similarity_sources(user_ratings).items():
+            if key[1] != movie.is_tv:
+                continue  # Recommendations share the source's media type
             # Get recommendations - use preloaded if available
-            key = (rated_movie.kinopoisk_id, rated_movie.is_tv)
             if preloaded_recommendations is not None and key in preloaded_recommendations:
                 rec_ids = preloaded_recommendations[key]
             else:
-                rec_ids = await self._get_cached_recommendations(session, rated_movie.kinopoisk_id, rated_movie.is_tv)
+                rec_ids = await self._get_cached_recommendations(*key)
 
             # Check if our movie is in the recommendations
             for i, rec_id in enumerate(rec_ids):
@@ -172,35 +164,52 @@ class RecommenderService:
 
         return total_score
 
-    async def _get_cached_recommendations(self, session: AsyncSession, tmdb_id: int, is_tv: bool) -> list[int]:
-        """Get TMDB recommendations with DB caching."""
-        cache_key = (tmdb_id, is_tv)
-
-        # Check memory cache first (LRU)
-        cached_mem = self._memory_cache.get(cache_key)
-        if cached_mem is not None:
-            return cached_mem
+    def similarity_sources(self, user_ratings: list) -> dict[tuple[int, bool], int]:
+        """Rated movies whose TMDB recommendations count for similarity.
 
-        # Check DB cache
-        cached = await get_cached_recommendations(session, tmdb_id, is_tv)
-        if cached is not None:
-            self._memory_cache.set(cache_key, cached)
-            return cached
-
-        # Fetch from API
-        if is_tv:
-            recs = await self.tmdb_api.get_recommendations_tv(tmdb_id)
-        else:
-            recs = await self.tmdb_api.get_recommendations_movie(tmdb_id)
-
-        # Extract IDs
-        rec_ids = [r.get('kinopoisk_id') for r in recs if r.get('kinopoisk_id')]
+        Returns dict mapping (tmdb_id, is_tv) -> weight (rating - 5: -4 to +5).
+        """
+        # Filter out neutral ratings (5) - they don't affect recommendations
+        liked = [ur for ur in user_ratings if ur.rating >= 6]
+        disliked = [ur for ur in user_ratings if ur.rating <= 4]
 
-        # Save to DB cache
-        await save_cached_recommendations(session, tmdb_id, is_tv, rec_ids)
-        self._memory_cache.set(cache_key, rec_ids)
+        # Sort and limit each group
+        half_limit = self.MAX_RATED_MOVIES_FOR_SIMILARITY // 2
+        top_liked = sorted(liked, key=lambda x: x.rating, reverse=True)[:half_limit]
+        top_disliked = sorted(disliked, key=lambda x: x.rating)[:half_limit]  # Lowest first
 
-        return rec_ids
+        return {
+            (ur.movie.kinopoisk_id, ur.movie.is_tv): ur.rating - 5
+            for ur in top_liked + top_disliked
+            if ur.movie
+        }
+
+    @staticmethod
+    def similarity_scores(
+        sources: dict[tuple[int, bool], int],
+        recommendations: dict[tuple[int, bool], list[int]]
+    ) -> dict[tuple[int, bool], float]:
+        """TMDB similarity score of every recommended title at once (as _tmdb_similarity_score).
+
+        Returns dict mapping (kinopoisk_id, is_tv) -> score; titles not listed score 0.
+        Recommendations share the source's media type.
+        """
+        scores = {}
+        for key, weight in sources.items():
+            seen = set()
+            for i, rec_id in enumerate(recommendations.get(key, [])):
+                if rec_id in seen:
+                    continue  # Only the first position counts
+                seen.add(rec_id)
+                rec_key = (rec_id, key[1])
+                scores[rec_key] = scores.get(rec_key, 0.0) + weight * max(0.1, 1.0 - (i * 0.05))
+        return scores
+
+    async def _get_cached_recommendations(self, tmdb_id: int, is_tv: bool) -> list[int]:
+        """Get TMDB recommendations with DB caching."""
+        cache_key = (tmdb_id, is_tv)
+        recs = await self.get_recommendations_batch([cache_key])
+        return recs.get(cache_key, [])
 
     def _calculate_aggregator_score(self, movie: Movie) -> float:
         """Calculate average score from aggregator ratings (normalized to 1-10)."""
@@ -224,84 +233,282 @@ class RecommenderService:
             return sum(scores) / len(scores)
         return 5.0  # Neutral if no ratings
 
+    async def _fetch_recommendation_ids(self, tmdb_id: int, is_tv: bool) -> list[int]:
+        """Fetch recommendation IDs from TMDB API."""
+        if is_tv:
+            recs = await self.tmdb_api.get_recommendations_tv(tmdb_id)
+        else:
+            recs = await self.tmdb_api.get_recommendations_movie(tmdb_id)
+        return [r.get('kinopoisk_id') for r in recs if r.get('kinopoisk_id')]
+
     def clear_cache(self):
         """Clear the recommendations cache."""
         self._memory_cache.clear()
 
-    async def has_user_ratings(self, session: AsyncSession, cached_ratings: list = None) -> bool:
-        """Check if user has any rated movies."""
-        if cached_ratings is not None:
-            return len(cached_ratings) > 0
-        user_ratings = await get_all_user_ratings(session)
-        return len(user_ratings) > 0
+    def cache_stats(self) -> dict:
+        """Hit/miss/eviction statistics for both cache tiers."""
+        return {
+            "memory": {
+                **self._memory_cache.stats.as_dict(),
+                "entries": len(self._memory_cache),
+                "size_bytes": self._memory_cache.size_bytes,
+            },
+            "db": self._db_stats.as_dict(),
+        }
+
+    async def warm_cache(self, session: AsyncSession, limit: int = 100) -> int:
+        """Load cached recommendations of rated movies into the memory tier.
+
+        Only the DB tier is read, no API calls are made. Returns the number of
+        entries loaded.
+        """
+        user_ratings = await get_all_user_ratings(session, PROFILE_SCORING)
+        ranked = sorted(user_ratings, key=lambda ur: abs(ur.rating - 5), reverse=True)
+        keys = [
+            (ur.movie.kinopoisk_id, ur.movie.is_tv)
+            for ur in ranked[:limit]
+            if ur.movie and ur.rating != 5
+        ]
+        if not keys:
+            return 0
+
+        stale_keys = set()
+        cached_recs = await get_cached_recommendations_batch(session, keys, stale_keys=stale_keys)
+        self.schedule_refresh(stale_keys)
+        for key, rec_ids in cached_recs.items():
+            self._memory_cache.set(key, rec_ids)
+        return len(cached_recs)
+
+    # =========================================================================
+    # Background refresh (stale-while-revalidate)
+    # =========================================================================
+
+    def schedule_refresh(self, keys):
+        """Queue (tmdb_id, is_tv) keys whose cached entries expired for background refresh."""
+        for key in keys:
+            self._refresh_queue[key] = None
+
+    def _take_refresh_batch(self) -> list[tuple[int, bool]]:
+        """Pop up to REFRESH_BATCH_SIZE keys from the refresh queue."""
+        batch = []
+        while self._refresh_queue and len(batch) < self.REFRESH_BATCH_SIZE:
+            key, _ = self._refresh_queue.popitem(last=False)
+            batch.append(key)
+        return batch
+
+    async def run_background_refresher(self, shutdown_event: asyncio.Event):
+        """Renew expired and soon-to-expire cache entries until shutdown.
+
+        Queued (already served stale) keys go first, then the oldest DB entries
+        that are about to expire. API calls are spaced by REFRESH_INTERVAL so the
+        refresher never competes with user-initiated searches for TMDB quota.
+        With a job queue the keys are handed over as durable jobs instead;
+        keys that already have a job are skipped, so the queue's backoff and
+        attempt limit apply to entries that keep failing.
+        """
+        while not shutdown_event.is_set():
+            keys = self._take_refresh_batch()
+            if not keys:
+                try:
+                    async with get_session() as session:
+                        keys = await get_expiring_recommendation_keys(
+                            session,
+                            max_age=timedelta(days=self.REFRESH_AHEAD_DAYS),
+                            limit=self.REFRESH_BATCH_SIZE,
+                            skip_job_kind="recommendations" if self.job_queue is not None else None,
+                        )
+                except Exception:
+                    keys = []
+
+            if not keys:
+                await self._wait_for_shutdown(shutdown_event, self.REFRESH_IDLE_INTERVAL)
+                continue
+
+            if self.job_queue is not None:
+                try:
+                    jobs = {
+                        recommendation_job_key(tmdb_id, is_tv): {"tmdb_id": tmdb_id, "is_tv": is_tv}
+                        for tmdb_id, is_tv in keys
+                    }
+                    async with get_session() as session:
+                        queued = await get_queued_job_keys(session, "recommendations", list(jobs))
+                    await self.job_queue.enqueue(
+                        "recommendations",
+                        [(job_key, payload) for job_key, payload in jobs.items() if job_key not in queued],
+                    )
+                except Exception:
+                    pass
+                # Pace the producer with the (rate-limited) job handler
+                if await self._wait_for_shutdown(shutdown_event, self.REFRESH_INTERVAL * len(keys)):
+                    return
+                continue
 
-    async def preload_recommendations(self, session: AsyncSession, cached_ratings: list) -> dict[tuple[int, bool], list[int]]:
+            for key in keys:
+                if shutdown_event.is_set():
+                    return
+                try:
+                    await self._refresh_entry(key)
+                except Exception:
+                    pass
+                if await self._wait_for_shutdown(shutdown_event, self.REFRESH_INTERVAL):
+                    return
+
+    async def _handle_refresh_jobs(self, session: AsyncSession, payloads: list[dict]):
+        """Refresh a batch of cache entries (job handler), spaced by REFRESH_INTERVAL."""
+        for i, payload in enumerate(payloads):
+            if i:
+                await asyncio.sleep(self.REFRESH_INTERVAL)
+            await self._refresh_entry((payload["tmdb_id"], payload["is_tv"]))
+
+    async def _refresh_entry(self, key: tuple[int, bool]):
+        """Re-fetch recommendations for a single key and update both cache layers."""
+        tmdb_id, is_tv = key
+        rec_ids = await self._fetch_recommendation_ids_shared(key)
+        async with get_session() as session:
+            if not rec_ids:
+                # Empty response may be a transient API error: keep the old list,
+                # only bump its timestamp so it isn't retried in a tight loop
+                rec_ids = await get_cached_recommendations(session, tmdb_id, is_tv, stale_keys=set()) or []
+            await save_cached_recommendations(session, tmdb_id, is_tv, rec_ids)
+        self._memory_cache.set(key, rec_ids)
+
+    @staticmethod
+    async def _wait_for_shutdown(shutdown_event: asyncio.Event, timeout: float) -> bool:
+        """Sleep up to timeout seconds; return True if shutdown was signalled."""
+        try:
+            await asyncio.wait_for(shutdown_event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def preload_recommendations(
+        self,
+        cached_ratings: list,
+        fetch_missing: bool = True
+    ) -> dict[tuple[int, bool], list[int]]:
         """Preload all recommendations needed for scoring in a single batch query.
 
         Returns dict mapping (tmdb_id, is_tv) -> list of recommended IDs.
         """
         if not cached_ratings:
             return {}
+        return await self.get_recommendations_batch(list(self.similarity_sources(cached_ratings)), fetch_missing)
 
-        # Filter out neutral ratings (5) - they don't affect recommendations
-        liked = [ur for ur in cached_ratings if ur.rating >= 6]
-        disliked = [ur for ur in cached_ratings if ur.rating <= 4]
+    # =========================================================================
+    # Candidate generation
+    # =========================================================================
 
-        # Sort and limit each group
-        half_limit = self.MAX_RATED_MOVIES_FOR_SIMILARITY // 2
-        top_liked = sorted(liked, key=lambda x: x.rating, reverse=True)[:half_limit]
-        top_disliked = sorted(disliked, key=lambda x: x.rating)[:half_limit]
-
-        selected_ratings = top_liked + top_disliked
-
-        # Collect keys for batch query
-        keys = []
-        for ur in selected_ratings:
-            if ur.movie:
-                keys.append((ur.movie.kinopoisk_id, ur.movie.is_tv))
-
-        if not keys:
-            return {}
+    async def get_recommendations_batch(
+        self,
+        keys: list[tuple[int, bool]],
+        fetch_missing: bool = True
+    ) -> dict[tuple[int, bool], list[int]]:
+        """Get TMDB recommendation IDs for many source movies at once.
 
-        # Batch fetch from DB
-        cached_recs = await get_cached_recommendations_batch(session, keys)
+        Lookup order: memory tier -> DB tier (single batch query) -> TMDB API
+        (skipped with fetch_missing=False: keys not cached are left out).
+        Concurrent requests for the same key share one API call, and all newly
+        fetched lists are written with a single commit. DB reads and the write
+        use their own short sessions, none is open while waiting for TMDB.
 
-        # Check memory cache and identify missing keys
+        Returns dict mapping (tmdb_id, is_tv) -> list of recommended IDs.
+        """
         result = {}
-        missing_keys = []
+        db_keys = []
 
-        for key in keys:
-            # Check memory cache first
+        for key in dict.fromkeys(keys):  # Dedupe, keep order
             cached_mem = self._memory_cache.get(key)
             if cached_mem is not None:
                 result[key] = cached_mem
-            elif key in cached_recs:
+            else:
+                db_keys.append(key)
+
+        if not db_keys:
+            return result
+
+        # Batch fetch from DB (expired entries are served and queued for refresh)
+        stale_keys = set()
+        async with get_session() as session:
+            cached_recs = await get_cached_recommendations_batch(session, db_keys, stale_keys=stale_keys)
+        self.schedule_refresh(stale_keys)
+
+        missing_keys = []
+        for key in db_keys:
+            if key in cached_recs:
+                self._db_stats.hits += 1
                 result[key] = cached_recs[key]
                 self._memory_cache.set(key, cached_recs[key])
             else:
+                self._db_stats.misses += 1
                 missing_keys.append(key)
 
-        # Fetch missing from API in parallel
-        if missing_keys:
-            import asyncio
-            tasks = []
-            for tmdb_id, is_tv in missing_keys:
-                if is_tv:
-                    tasks.append(self.tmdb_api.get_recommendations_tv(tmdb_id))
-                else:
-                    tasks.append(self.tmdb_api.get_recommendations_movie(tmdb_id))
-
-            api_results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            for key, api_result in zip(missing_keys, api_results):
-                if isinstance(api_result, Exception):
-                    result[key] = []
-                    continue
-
-                rec_ids = [r.get('kinopoisk_id') for r in api_result if r.get('kinopoisk_id')]
-                result[key] = rec_ids
-                self._memory_cache.set(key, rec_ids)
-                # Save to DB cache
-                await save_cached_recommendations(session, key[0], key[1], rec_ids)
+        if not missing_keys or not fetch_missing:
+            return result
+
+        # Fetch missing from API in parallel. Keys already being fetched by another
+        # caller are awaited, not re-requested; that caller also persists them.
+        owned_keys = {key for key in missing_keys if key not in self._inflight}
+        api_results = await asyncio.gather(
+            *[self._fetch_recommendation_ids_shared(key) for key in missing_keys],
+            return_exceptions=True
+        )
+
+        to_save = {}
+        for key, api_result in zip(missing_keys, api_results):
+            if isinstance(api_result, BaseException):
+                result[key] = []
+                continue
+            result[key] = api_result
+            self._memory_cache.set(key, api_result)
+            if key in owned_keys:
+                to_save[key] = api_result
+
+        # Single upsert + commit for everything fetched
+        if to_save:
+            async with get_session() as session:
+                await save_cached_recommendations_batch(session, to_save)
 
         return result
+
+    async def _fetch_recommendation_ids_shared(self, key: tuple[int, bool]) -> list[int]:
+        """Fetch recommendation IDs, joining an in-flight request for the same key."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_recommendation_ids(*key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def generate_candidates(
+        self,
+        source_movies: list[Movie],
+        per_source_limit: Optional[int] = None,
+        exclude: Optional[set[tuple[int, bool]]] = None
+    ) -> list[dict]:
+        """Collect recommended titles for a list of source (usually rated) movies.
+
+        Args:
+            source_movies: Movies whose TMDB recommendations are used
+            per_source_limit: Take at most this many recommendations per source
+            exclude: (kinopoisk_id, is_tv) keys to skip (e.g. already rated)
+
+        Returns:
+            Deduplicated list of {"kinopoisk_id", "is_tv"} dicts in source order.
+        """
+        keys = [(m.kinopoisk_id, m.is_tv) for m in source_movies]
+        recommendations = await self.get_recommendations_batch(keys)
+
+        seen = set(exclude) if exclude else set()
+        candidates = []
+        for key in keys:
+            rec_ids = recommendations.get(key, [])
+            if per_source_limit is not None:
+                rec_ids = rec_ids[:per_source_limit]
+            is_tv = key[1]  # Recommendations share the source's media type
+            for rec_id in rec_ids:
+                rec_key = (rec_id, is_tv)
+                if rec_id and rec_key not in seen:
+                    seen.add(rec_key)
+                    candidates.append({"kinopoisk_id": rec_id, "is_tv": is_tv})
+
+        return candidates
@@ -0,0 +1,179 @@
+import asyncio
+from typing import Optional
+
+from database import (
+    get_session, get_all_user_ratings, PROFILE_SCORING, get_scoring_rows, get_movie_ids_sharing_entities,
+    get_movie_ids_by_kp_ids, save_personal_scores, get_top_scored_movie_ids, get_personal_scores, get_movie_views,
+    add_movie_saved_listener, add_ratings_changed_listener, genre_mask_from_tmdb_ids,
+)
+from database.models import Movie
+from database.views import MovieView
+from .recommender import RecommenderService
+
+
+class PersonalScores:
+    """Personal score of every stored movie, kept in the personal_scores table.
+
+    Scores are computed with RecommenderService's weights (see score_row), so
+    ranking the local library is an indexed ORDER BY score instead of scoring
+    movies per search, and works offline. TMDB similarity uses cached
+    recommendation lists only.
+
+    Updates are incremental: a rating change rescores only movies that share a
+    genre, director or actor with the rated movie, or that are recommended by
+    a rated movie whose similarity weight changed; saved movies are rescored
+    as they come. The table is rebuilt at startup and every REBUILD_INTERVAL
+    to pick up refreshed aggregator ratings and recommendation lists.
+    """
+
+    START_DELAY = 5.0  # Seconds after startup before the first rebuild (the stored table is used meanwhile)
+    UPDATE_DELAY = 1.0  # Seconds to collect changes before rescoring
+    REBUILD_INTERVAL = 6 * 60 * 60
+    BATCH_SIZE = 2000  # Movies loaded per scoring query
+
+    def __init__(self, recommender: RecommenderService):
+        self.recommender = recommender
+        self._dirty_movie_ids: set[int] = set()  # Saved movies to rescore
+        self._rated_movie_ids: set[int] = set()  # Movies whose user rating changed
+        # Scoring context of the last (re)build: similarity sources and scores, whether anything is rated
+        self._sources: Optional[dict[tuple[int, bool], int]] = None
+        self._similarity: dict[tuple[int, bool], float] = {}
+        self._has_ratings = False
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        add_movie_saved_listener(self._on_movie_saved)
+        add_ratings_changed_listener(self._on_ratings_changed)
+
+    def _on_movie_saved(self, movie: Movie, names: list[str]):
+        if movie.id is not None:
+            self._dirty_movie_ids.add(movie.id)
+            self._wakeup.set()
+
+    def _on_ratings_changed(self, movie_ids: list[int]):
+        self._rated_movie_ids.update(movie_ids)
+        self._wakeup.set()
+
+    async def run(self, shutdown_event: asyncio.Event):
+        """Rebuild the table, then apply changes as they come until shutdown."""
+        loop = asyncio.get_running_loop()
+        delay = self.START_DELAY
+        next_rebuild = loop.time() + delay
+        while not shutdown_event.is_set():
+            try:
+                await asyncio.wait_for(shutdown_event.wait(), delay)
+                return
+            except asyncio.TimeoutError:
+                pass
+
+            try:
+                if loop.time() >= next_rebuild:
+                    next_rebuild = loop.time() + self.REBUILD_INTERVAL
+                    await self.rebuild()
+                elif self._dirty_movie_ids or self._rated_movie_ids:
+                    await self.update()
+            except Exception:
+                pass
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=1.0)
+            except asyncio.TimeoutError:
+                delay = 0
+                continue
+            self._wakeup.clear()
+            # Let a burst of changes (a search saving dozens of movies) settle
+            delay = self.UPDATE_DELAY
+
+    async def rebuild(self):
+        """Rescore all stored movies and replace the table."""
+        async with self._lock:
+            self._dirty_movie_ids.clear()
+            self._rated_movie_ids.clear()
+            await self._load_context()
+            async with get_session() as session:
+                rows = await get_scoring_rows(session)
+                await save_personal_scores(session, self._score_rows(rows), replace_all=True)
+
+    async def update(self):
+        """Rescore movies affected by changes since the last update."""
+        async with self._lock:
+            if self._sources is not None:
+                dirty, rated = self._dirty_movie_ids, self._rated_movie_ids
+                self._dirty_movie_ids, self._rated_movie_ids = set(), set()
+                try:
+                    affected = await self._affected_movie_ids(rated) if rated else set()
+                    if affected is not None:
+                        await self._rescore(list(affected | dirty))
+                        return
+                except Exception:
+                    # Retry with the next update
+                    self._dirty_movie_ids |= dirty
+                    self._rated_movie_ids |= rated
+                    raise
+        await self.rebuild()
+
+    async def top_unwatched(self, genres: Optional[list[int]] = None, limit: int = 50, offset: int = 0) -> list[MovieView]:
+        """Best scored stored movies that are neither rated nor in the wishlist.
+
+        Args:
+            genres: TMDB genre IDs (as selected in the search bar), all required
+        """
+        genre_mask = genre_mask_from_tmdb_ids(genres) if genres else 0
+        async with get_session() as session:
+            movie_ids = await get_top_scored_movie_ids(session, limit, offset, genre_mask=genre_mask)
+            return await get_movie_views(session, movie_ids)
+
+    async def best_unwatched(self) -> Optional[tuple[MovieView, float]]:
+        """Best scored stored movie that is neither rated nor in the wishlist, with its score."""
+        async with get_session() as session:
+            movie_ids = await get_top_scored_movie_ids(session, 1)
+            if not movie_ids:
+                return None
+            scores = await get_personal_scores(session, movie_ids)
+            views = await get_movie_views(session, movie_ids)
+        if not views or views[0].id not in scores:
+            return None
+        return views[0], scores[views[0].id]
+
+    async def _affected_movie_ids(self, rated_movie_ids: set[int]) -> Optional[set[int]]:
+        """Movies whose score depends on the ratings of rated_movie_ids (None: all of them)."""
+        had_ratings = self._has_ratings
+        changed_keys = await self._load_context(self._sources)
+        if had_ratings != self._has_ratings:
+            return None  # First rating added or last one removed: every score changes
+
+        recommended = await self.recommender.get_recommendations_batch(list(changed_keys), fetch_missing=False)
+        async with get_session() as session:
+            movie_ids = await get_movie_ids_sharing_entities(session, list(rated_movie_ids))
+            # Recommendations share the source's media type
+            movie_ids |= await get_movie_ids_by_kp_ids(
+                session, [(rec_id, is_tv) for (_, is_tv), rec_ids in recommended.items() for rec_id in rec_ids]
+            )
+        return movie_ids
+
+    async def _load_context(self, old_sources: Optional[dict] = None) -> set[tuple[int, bool]]:
+        """Reload ratings and similarity scores; returns sources whose weight differs from old_sources."""
+        async with get_session() as session:
+            user_ratings = await get_all_user_ratings(session, PROFILE_SCORING)
+        sources = self.recommender.similarity_sources(user_ratings)
+        old_sources = old_sources or {}
+        changed_keys = {
+            key for key in sources.keys() | old_sources.keys()
+            if sources.get(key) != old_sources.get(key)
+        }
+        recommendations = await self.recommender.get_recommendations_batch(list(sources), fetch_missing=False)
+        self._similarity = self.recommender.similarity_scores(sources, recommendations)
+        self._sources = sources
+        self._has_ratings = bool(user_ratings)
+        return changed_keys
+
+    async def _rescore(self, movie_ids: list[int]):
+        for start in range(0, len(movie_ids), self.BATCH_SIZE):
+            async with get_session() as session:
+                rows = await get_scoring_rows(session, movie_ids[start:start + self.BATCH_SIZE])
+                await save_personal_scores(session, self._score_rows(rows))
+
+    def _score_rows(self, rows) -> dict[int, float]:
+        if not self._has_ratings:
+            # Same fallback as search ranking without ratings
+            return {row.id: row.tmdb_rating or 0 for row in rows}
+        return {row.id: self.recommender.score_row(row, self._similarity) for row in rows}
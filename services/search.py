@@ -1,14 +1,22 @@
 import re
 import asyncio
+from datetime import datetime, timedelta
 from typing import Optional, Callable
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api import TMDBAPI, OMDBAPI, KinopoiskAPI, MDBListAPI
-from database import get_movie_by_kp_id, get_movies_by_kp_ids_batch, save_movie, search_local_movies_multi, get_all_user_ratings, get_session
+from database import get_movie_by_kp_id, get_movies_by_kp_ids_batch, save_movie, search_local_movies_multi, get_all_user_ratings, get_ratings_version, PROFILE_SCORING, count_movies_by_token_prefix, get_session, touch_movies
 from database.db import save_movie_m2m
-from database.models import Movie
+from database.genre_utils import genre_mask_from_tmdb_ids, has_genres
+from database.models import Movie, utc_now
+from database.views import MovieView
+from database.search_tokens import MATCH_PREFIX, TokenIndex, build_search_tokens, get_token_index, tokenize
 from .recommender import RecommenderService
+from .jobs import JobQueue
+from .people import PersonIndex
+from .scores import PersonalScores
+from .cache import MemoryCache
 
 
 class SearchService:
@@ -21,91 +29,147 @@ class SearchService:
         10749: None, 878: 10765, 53: None, 10752: 10768, 37: 37,
     }
 
-    def __init__(self, tmdb_api: TMDBAPI, omdb_api: OMDBAPI, kp_api: KinopoiskAPI, mdblist_api: MDBListAPI, recommender: RecommenderService):
+    # Streaming ratings enrichment (fetch_missing_ratings)
+    RATINGS_CONCURRENCY = 8  # Parallel lookups per ratings source
+    RATINGS_COMMIT_INTERVAL = 0.5  # Seconds between commits of streamed results
+    RATINGS_COMMIT_BATCH = 25  # ... or commit earlier once this many movies changed
+
+    # Ratings freshness policy (per source, see Movie.*_next_retry_at)
+    RATINGS_RETRY_BASE = timedelta(hours=12)  # First retry after a lookup found nothing
+    RATINGS_RETRY_MAX = timedelta(days=60)  # Backoff cap for titles without a rating
+    RATINGS_ERROR_RETRY_BASE = timedelta(minutes=30)  # First retry after a failed request (network, quota)
+    RATINGS_ERROR_RETRY_MAX = timedelta(days=1)
+    RATINGS_REFRESH_AGE = timedelta(days=30)  # Re-fetch found ratings this old
+
+    # Cached movies whose credits were never saved are re-fetched after this
+    # (normally the background M2M job saves them within seconds)
+    CREDITS_PENDING_GRACE = timedelta(hours=1)
+    ACCESS_TOUCH_INTERVAL = timedelta(days=1)  # last_accessed_at is updated at most this often (retention)
+
+    # Cross-search result cache: ranked (kinopoisk_id, is_tv, score) lists per query
+    RESULT_CACHE_MAX_BYTES = 1024 * 1024
+    RESULT_CACHE_TTL = 30 * 60  # TMDB results and ratings drift, re-run the pipeline after 30 min
+
+    # Magic button: TMDB recommendations of this many liked movies, details of this many candidates
+    MAGIC_SOURCES = 20
+    MAGIC_CANDIDATES = 50
+
+    # Per-word fallback for multi-word queries (see _run_word_searches)
+    WORD_SEARCH_BUDGET = 4  # Max search_by_keyword calls, each fans out into 3-9 TMDB requests
+    WORD_SEARCH_TARGET = 20  # Stop once this many results likely match all words
+    WORD_SEARCH_MIN_LENGTH = 3  # Shorter words are never searched on their own
+
+    # Background jobs for newly loaded movies (see services/jobs.py)
+    RATINGS_JOB_DELAY = timedelta(minutes=2)  # Let the UI's streaming fetch go first
+
+    def __init__(
+        self,
+        tmdb_api: TMDBAPI,
+        omdb_api: OMDBAPI,
+        kp_api: KinopoiskAPI,
+        mdblist_api: MDBListAPI,
+        recommender: RecommenderService,
+        job_queue: Optional[JobQueue] = None,
+        person_index: Optional[PersonIndex] = None,
+        personal_scores: Optional[PersonalScores] = None,
+    ):
         self.tmdb_api = tmdb_api
         self.omdb_api = omdb_api
         self.kp_api = kp_api
         self.mdblist_api = mdblist_api
         self.recommender = recommender
+        self.job_queue = job_queue
+        self.person_index = person_index
+        self.personal_scores = personal_scores
+        self._result_cache = MemoryCache(
+            max_bytes=self.RESULT_CACHE_MAX_BYTES,
+            ttl_seconds=self.RESULT_CACHE_TTL,
+        )
+        # word -> number of results of its first search_by_keyword page (selectivity hint)
+        self._word_result_sizes = MemoryCache(max_bytes=64 * 1024)
+        # Background load of magic button candidates (see find_magic_recommendation)
+        self._magic_refresh: Optional[asyncio.Task] = None
+        if job_queue is not None:
+            job_queue.register("m2m", self._handle_m2m_jobs)
+            job_queue.register("ratings", self._handle_ratings_jobs)
 
     async def close(self):
         """Close the search service (clears any internal caches)."""
+        if self._magic_refresh is not None:
+            self._magic_refresh.cancel()
         self.recommender.clear_cache()
-
-    async def _save_m2m_background(self, pending_m2m: list[tuple]):
-        """Save directors/actors in background (doesn't block search results)."""
-        try:
-            async with get_session() as session:
-                for movie_id, directors, actors in pending_m2m:
-                    try:
-                        await save_movie_m2m(session, movie_id, directors, actors)
-                    except Exception:
-                        pass
-        except Exception:
-            pass
-
-    async def search_movies(self, session: AsyncSession, query: str, page: int = 1, genres: list[int] = None, skip_ratings: bool = False, start_page: int = 1, num_pages: int = 3) -> list[Movie]:
-        """Search for movies AND TV shows by keyword and/or genres."""
+        self._result_cache.clear()
+
+    def clear_result_cache(self):
+        """Forget ranked results of earlier searches (their movies may have been deleted)."""
+        self._result_cache.clear()
+
+    async def _handle_m2m_jobs(self, session: AsyncSession, payloads: list[dict]):
+        """Save directors/actors for a batch of movies (job handler, single commit)."""
+        for payload in payloads:
+            await save_movie_m2m(
+                session, payload["movie_id"], payload.get("directors"), payload.get("actors"), auto_commit=False
+            )
+        await session.commit()
+
+    async def _handle_ratings_jobs(self, session: AsyncSession, payloads: list[dict]):
+        """Fetch ratings the streaming UI fetch didn't get to (job handler).
+
+        Movies fetched in the meantime are skipped by the freshness policy.
+        """
+        keys = [(payload["kinopoisk_id"], payload["is_tv"]) for payload in payloads]
+        movies_map = await get_movies_by_kp_ids_batch(session, keys)
+        await self.fetch_missing_ratings(session, list(movies_map.values()))
+
+    async def search_movies(self, query: str, page: int = 1, genres: list[int] = None, skip_ratings: bool = False, start_page: int = 1, num_pages: int = 3, match_mode: str = MATCH_PREFIX) -> list[MovieView]:
+        """Search for movies AND TV shows by keyword and/or genres.
+
+        Results must contain every query word (match_mode: "exact", "prefix"
+        or "fuzzy", see database/search_tokens.py).
+        Ranked results are cached per (query, genres, page window) until the
+        user's ratings change, so repeating a search is a single DB batch-load.
+
+        DB access happens in short sessions between the network phases, so no
+        connection is held while waiting for TMDB. Returns views (see MovieView).
+        """
         query_words = [w.lower() for w in query.split() if w.strip()]
+        query_tokens = tokenize(query)
         genres = genres or []
 
         if not query_words and not genres:
             return []
 
+        # Ranking depends on ratings: tag the result with the version it was computed for
+        ratings_version = get_ratings_version()
+        cache_key = (" ".join(query_tokens), tuple(sorted(genres)), start_page, num_pages, match_mode)
+
         seen_movie_ids = set()
         seen_tv_ids = set()
         all_movies = []
         all_search_results = []
 
-        from database import get_rated_movies, get_cached_recommendations_batch, save_cached_recommendations
+        from database import get_rated_movies
 
-        # 1. Get recommendations from user's rated movies (only on first page)
-        if start_page > 1:
-            rated_movies = []
-        else:
-            rated_movies = await get_rated_movies(session, min_rating=6)
-        rated_movies = rated_movies[:10]
-        uncached_rated = []
-
-        # Batch fetch all cached recommendations
-        cache_keys = [(m.kinopoisk_id, m.is_tv) for m in rated_movies]
-        cached_recs = await get_cached_recommendations_batch(session, cache_keys)
-
-        for rated in rated_movies:
-            key = (rated.kinopoisk_id, rated.is_tv)
-            cached_ids = cached_recs.get(key)
-            if cached_ids is not None:
-                for rec_id in cached_ids[:10]:
-                    target_set = seen_tv_ids if rated.is_tv else seen_movie_ids
-                    if rec_id and rec_id not in target_set:
-                        target_set.add(rec_id)
-                        all_search_results.append({"kinopoisk_id": rec_id, "is_tv": rated.is_tv})
-            else:
-                uncached_rated.append(rated)
-
-        # Fetch uncached recommendations concurrently
-        if uncached_rated:
-            tasks = []
-            for r in uncached_rated:
-                if r.is_tv:
-                    tasks.append(self.tmdb_api.get_recommendations_tv(r.kinopoisk_id))
-                else:
-                    tasks.append(self.tmdb_api.get_recommendations_movie(r.kinopoisk_id))
+        async with get_session() as session:
+            cached_movies = await self._get_cached_results(session, cache_key, ratings_version)
 
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            # Rated movies for recommendations (only on first page)
+            if cached_movies is not None or start_page > 1:
+                rated_movies = []
+            else:
+                rated_movies = await get_rated_movies(session, min_rating=6, profile=PROFILE_SCORING)
+        if cached_movies is not None:
+            await self._mark_accessed(cached_movies)
+            return [MovieView.from_movie(m) for m in cached_movies]
+        rated_movies = rated_movies[:10]
 
-            for rated, result in zip(uncached_rated, results):
-                if isinstance(result, Exception):
-                    continue
-                rec_ids = [r.get("kinopoisk_id") for r in result if r.get("kinopoisk_id")]
-                await save_cached_recommendations(session, rated.kinopoisk_id, rated.is_tv, rec_ids)
-                for rec in result[:10]:
-                    rec_id = rec.get("kinopoisk_id")
-                    is_tv = rec.get("is_tv", False)
-                    target_set = seen_tv_ids if is_tv else seen_movie_ids
-                    if rec_id and rec_id not in target_set:
-                        target_set.add(rec_id)
-                        all_search_results.append(rec)
+        # 1. Get recommendations from user's rated movies
+        if rated_movies:
+            candidates = await self.recommender.generate_candidates(rated_movies, per_source_limit=10)
+            for candidate in candidates:
+                target_set = seen_tv_ids if candidate["is_tv"] else seen_movie_ids
+                target_set.add(candidate["kinopoisk_id"])
+                all_search_results.append(candidate)
 
         # 2. Parallel API calls for discover and search
         api_tasks = []
@@ -126,13 +190,13 @@ class SearchService:
             # Search by full query first (fast for simple queries)
             full_query = " ".join(query_words)
             for pg in range(start_page, end_page):
-                api_tasks.append(self.tmdb_api.search_by_keyword(full_query, pg))
+                api_tasks.append(self._search_by_keyword(full_query, pg))
                 task_info.append(("search", full_query, pg))
 
         if api_tasks:
             results = await asyncio.gather(*api_tasks, return_exceptions=True)
             for info, result in zip(task_info, results):
-                if isinstance(result, Exception):
+                if isinstance(result, BaseException):
                     continue
                 is_keyword_search = info[0] == "search"
                 for item in result:
@@ -145,45 +209,162 @@ class SearchService:
                         if is_keyword_search:
                             keyword_results_count += 1
 
-        # Hybrid: if full phrase returned few results, also search by individual words
+        # Hybrid: if full phrase returned few results, also search by the most selective words
         if query_words and len(query_words) > 1 and keyword_results_count < 20:
-            word_tasks = []
-            for word in query_words:
-                if len(word) >= 3:  # Skip short words
-                    for pg in range(start_page, min(start_page + 2, end_page)):  # Fewer pages per word
-                        word_tasks.append(self.tmdb_api.search_by_keyword(word, pg))
-
-            if word_tasks:
-                word_results = await asyncio.gather(*word_tasks, return_exceptions=True)
-                for result in word_results:
-                    if isinstance(result, Exception):
-                        continue
-                    for item in result:
-                        tmdb_id = item.get("kinopoisk_id")
-                        is_tv = item.get("is_tv", False)
-                        target_set = seen_tv_ids if is_tv else seen_movie_ids
-                        if tmdb_id and tmdb_id not in target_set:
-                            target_set.add(tmdb_id)
-                            all_search_results.append(item)
+            await self._run_word_searches(
+                query_words, query_tokens, match_mode, start_page, end_page,
+                all_search_results, seen_movie_ids, seen_tv_ids,
+            )
 
         # 3. Load full info for API results (limit to avoid loading hundreds)
         if all_search_results:
             # Limit to first 100 results - no point loading more than we'll show
             limited_results = all_search_results[:100]
-            api_movies = await self._load_movies_parallel(session, limited_results, skip_ratings=skip_ratings)
+            api_movies = await self._load_movies_parallel(limited_results, skip_ratings=skip_ratings)
             all_movies.extend(api_movies)
 
         # 4. Filter by ALL query words
-        if query_words:
-            filtered_movies = [m for m in all_movies if self._matches_all_words(m, query_words)]
+        if query_tokens:
+            filtered_movies = [m for m in all_movies if self._matches_all_words(m, query_tokens, match_mode)]
         else:
             filtered_movies = all_movies
 
         # 5. Filter by selected genres
         if genres:
-            filtered_movies = [m for m in filtered_movies if self._matches_genres(m, genres)]
+            genre_mask = genre_mask_from_tmdb_ids(genres)
+            filtered_movies = [m for m in filtered_movies if m.genre_mask and has_genres(m.genre_mask, genre_mask)]
+
+        scored_movies = await self._score_movies(filtered_movies)
+        self._result_cache.set(
+            cache_key,
+            (ratings_version, [(m.kinopoisk_id, m.is_tv, score) for m, score in scored_movies]),
+        )
+        movies = [movie for movie, _ in scored_movies]
+        await self._mark_accessed(movies)
+        return [MovieView.from_movie(m) for m in movies]
+
+    async def _get_cached_results(self, session: AsyncSession, cache_key: tuple, ratings_version: int) -> Optional[list[Movie]]:
+        """Load a cached ranked search result, or None if missing or outdated."""
+        entry = self._result_cache.get(cache_key)
+        if entry is None:
+            return None
+
+        version, ranked = entry
+        if version != ratings_version:
+            self._result_cache.discard(cache_key)
+            return None
 
-        return await self._sort_by_user_preference(session, filtered_movies)
+        movies_map = await get_movies_by_kp_ids_batch(session, [(kp_id, is_tv) for kp_id, is_tv, _ in ranked])
+        if len(movies_map) < len(ranked):
+            # Some movies are gone from the DB, run the full search again
+            self._result_cache.discard(cache_key)
+            return None
+        return [movies_map[(kp_id, is_tv)] for kp_id, is_tv, _ in ranked]
+
+    def result_cache_stats(self) -> dict:
+        """Hit/miss counters of the cross-search result cache."""
+        return {
+            "entries": len(self._result_cache),
+            "size_bytes": self._result_cache.size_bytes,
+            **self._result_cache.stats.as_dict(),
+        }
+
+    async def _search_by_keyword(self, keyword: str, page: int) -> list[dict]:
+        """TMDBAPI.search_by_keyword with people resolved through the local person index."""
+        if self.person_index is None:
+            return await self.tmdb_api.search_by_keyword(keyword, page)
+
+        results = await self.tmdb_api.search_by_keyword(keyword, page, include_people=False)
+        try:
+            person_items = await self.person_index.search_filmographies(keyword, results)
+        except Exception:
+            person_items = []
+
+        seen = {(item.get("kinopoisk_id"), item.get("is_tv", False)) for item in results}
+        for item in person_items:
+            key = (item.get("kinopoisk_id"), item.get("is_tv", False))
+            if key[0] and key not in seen:
+                seen.add(key)
+                results.append(item)
+        return results
+
+    async def _plan_word_searches(self, query_words: list[str]) -> list[str]:
+        """Order query words for per-word search, most selective first.
+
+        Selectivity is estimated from how many local movies contain the word
+        (rarer is better) and how many results the word returned before.
+        Words known to return nothing are dropped.
+        """
+        words = list(dict.fromkeys(w for w in query_words if len(w) >= self.WORD_SEARCH_MIN_LENGTH))
+        if not words:
+            return []
+
+        word_tokens = {word: tokenize(word) for word in words}
+        try:
+            all_tokens = list({t for tokens in word_tokens.values() for t in tokens})
+            async with get_session() as session:
+                doc_freq = await count_movies_by_token_prefix(session, all_tokens)
+        except Exception:
+            doc_freq = {}
+
+        def selectivity(word: str) -> tuple:
+            tokens = word_tokens[word]
+            df = min((doc_freq.get(t, 0) for t in tokens), default=0)
+            result_size = self._word_result_sizes.get(word)
+            return (df, result_size if result_size is not None else 0, -len(word))
+
+        words = [w for w in words if self._word_result_sizes.get(w) != 0]
+        return sorted(words, key=selectivity)
+
+    async def _run_word_searches(
+        self,
+        query_words: list[str],
+        query_tokens: list[str],
+        match_mode: str,
+        start_page: int,
+        end_page: int,
+        all_search_results: list[dict],
+        seen_movie_ids: set[int],
+        seen_tv_ids: set[int],
+    ):
+        """Search by single words within WORD_SEARCH_BUDGET, adding new items to all_search_results.
+
+        Words are searched one at a time in planned order and the loop stops
+        early once WORD_SEARCH_TARGET results likely match the whole query.
+        """
+        likely_matches = sum(1 for item in all_search_results if self._likely_matches(item, query_tokens, match_mode))
+        budget = self.WORD_SEARCH_BUDGET
+
+        for word in await self._plan_word_searches(query_words):
+            if budget <= 0 or likely_matches >= self.WORD_SEARCH_TARGET:
+                break
+
+            pages = list(range(start_page, min(start_page + 2, end_page)))[:budget]  # Fewer pages per word
+            budget -= len(pages)
+            results = await asyncio.gather(
+                *(self._search_by_keyword(word, pg) for pg in pages), return_exceptions=True
+            )
+
+            for pg, result in zip(pages, results):
+                if isinstance(result, BaseException):
+                    continue
+                if pg == start_page:
+                    self._word_result_sizes.set(word, len(result))
+                for item in result:
+                    tmdb_id = item.get("kinopoisk_id")
+                    is_tv = item.get("is_tv", False)
+                    target_set = seen_tv_ids if is_tv else seen_movie_ids
+                    if tmdb_id and tmdb_id not in target_set:
+                        target_set.add(tmdb_id)
+                        all_search_results.append(item)
+                        if self._likely_matches(item, query_tokens, match_mode):
+                            likely_matches += 1
+
+    @staticmethod
+    def _likely_matches(item: dict, query_tokens: list[str], match_mode: str) -> bool:
+        """Cheap pre-check of a search result (titles and overview only, no people/genres)."""
+        tokens = build_search_tokens(item.get("title"), item.get("title_original"), item.get("description"))
+        return TokenIndex(tokens).matches(query_tokens, match_mode)
 
     def _map_movie_genres_to_tv(self, movie_genre_ids: list[int]) -> list[int]:
         """Map movie genre IDs to TV genre IDs."""
@@ -196,8 +377,12 @@ class SearchService:
                 tv_genres.append(tv_gid)
         return tv_genres
 
-    async def _load_movies_parallel(self, session: AsyncSession, search_results: list[dict], skip_ratings: bool = False) -> list[Movie]:
-        """Load movie/TV details concurrently."""
+    async def _load_movies_parallel(self, search_results: list[dict], skip_ratings: bool = False) -> list[Movie]:
+        """Load movie/TV details concurrently.
+
+        Runs in three phases: a short read of cached movies, the API fetch
+        without a session, then one short write transaction for the new ones.
+        """
         movies = []
         to_load = []
 
@@ -210,9 +395,11 @@ class SearchService:
                 all_ids.append((kp_id, is_tv))
 
         # Batch query to check which movies are already cached
-        cached_movies = await get_movies_by_kp_ids_batch(session, all_ids)
+        async with get_session() as session:
+            cached_movies = await get_movies_by_kp_ids_batch(session, all_ids)
 
-        # Separate cached from uncached
+        # Separate cached from uncached (by hydration state, credit lists may be empty)
+        now = utc_now().replace(tzinfo=None)
         for result in search_results:
             kp_id = result.get("kinopoisk_id")
             is_tv = result.get("is_tv", False)
@@ -220,7 +407,7 @@ class SearchService:
                 continue
 
             existing_movie = cached_movies.get((kp_id, is_tv))
-            if existing_movie and existing_movie.director_list:
+            if existing_movie and not self._needs_details(existing_movie, now):
                 movies.append(existing_movie)
             else:
                 to_load.append((kp_id, is_tv))
@@ -230,143 +417,271 @@ class SearchService:
             results = await asyncio.gather(*tasks, return_exceptions=True)
 
             saved_movies = []
-            pending_m2m = []  # (movie_id, directors, actors) for background save
+            pending_m2m = []  # (movie_id, directors, actors) saved by background jobs
 
-            for result in results:
-                if isinstance(result, Exception) or result is None:
-                    continue
-                try:
-                    # Extract M2M data before save (save_movie pops them)
-                    directors = result.get("directors")
-                    actors = result.get("actors")
+            async with get_session() as session:
+                for result in results:
+                    if isinstance(result, BaseException) or result is None:
+                        continue
+                    try:
+                        # Extract M2M data before save (save_movie pops them)
+                        directors = result.get("directors")
+                        actors = result.get("actors")
 
-                    # Fast save without directors/actors
-                    movie = await save_movie(session, result.copy(), auto_commit=False, skip_m2m=True)
-                    saved_movies.append(movie)
+                        # Fast save without directors/actors
+                        movie = await save_movie(session, result.copy(), auto_commit=False, skip_m2m=True)
+                        saved_movies.append(movie)
 
-                    # Queue M2M for background processing
-                    if directors or actors:
-                        pending_m2m.append((movie.id, directors, actors))
-                except Exception:
-                    pass
+                        if directors or actors:
+                            pending_m2m.append((movie.id, directors, actors))
+                    except Exception:
+                        pass
 
-            # Single commit for all movies
-            if saved_movies:
-                await session.commit()
-                for movie in saved_movies:
-                    await session.refresh(movie, ["genre_list", "director_list", "actor_list"])
-                movies.extend(saved_movies)
+                # Jobs are committed together with the movies, so none are lost on exit
+                if self.job_queue is not None:
+                    await self._enqueue_movie_jobs(session, saved_movies, pending_m2m, skip_ratings)
 
-            # Schedule background M2M save
-            if pending_m2m:
-                asyncio.create_task(self._save_m2m_background(pending_m2m))
+                # Single commit for all movies
+                if saved_movies:
+                    await session.commit()
+                    for movie in saved_movies:
+                        await session.refresh(movie, ["genre_list", "director_list", "actor_list"])
+                    movies.extend(saved_movies)
+
+                if self.job_queue is None and pending_m2m:
+                    for movie_id, directors, actors in pending_m2m:
+                        await save_movie_m2m(session, movie_id, directors, actors, auto_commit=False)
+                    await session.commit()
+
+            if self.job_queue is not None:
+                self.job_queue.notify()
 
         return movies
 
-    async def fetch_missing_ratings(self, session: AsyncSession, movies: list[Movie], on_movie_updated: Optional[Callable] = None):
-        """Fetch missing ratings for movies without blocking the database."""
+    def _needs_details(self, movie: Movie, now: datetime) -> bool:
+        """Whether a cached movie has to be downloaded again."""
+        if movie.details_loaded_at is None:
+            return True
+        if movie.credits_loaded_at is not None:
+            return False
+        # Credits still pending: wait for the background save before giving up on it
+        return movie.details_loaded_at.replace(tzinfo=None) <= now - self.CREDITS_PENDING_GRACE
+
+    async def _enqueue_movie_jobs(
+        self,
+        session: AsyncSession,
+        saved_movies: list[Movie],
+        pending_m2m: list[tuple],
+        skip_ratings: bool
+    ):
+        """Add background jobs for freshly saved movies to the caller's transaction."""
+        await self.job_queue.enqueue(
+            "m2m",
+            [
+                (str(movie_id), {"movie_id": movie_id, "directors": directors, "actors": actors})
+                for movie_id, directors, actors in pending_m2m
+            ],
+            session=session,
+        )
+        if skip_ratings:
+            await self.job_queue.enqueue(
+                "ratings",
+                [
+                    (f"{m.kinopoisk_id}:{int(m.is_tv)}", {"kinopoisk_id": m.kinopoisk_id, "is_tv": m.is_tv})
+                    for m in saved_movies
+                ],
+                delay=self.RATINGS_JOB_DELAY,
+                session=session,
+            )
+
+    async def fetch_missing_ratings(
+        self,
+        session: AsyncSession,
+        movies: list[Movie],
+        on_movie_updated: Optional[Callable] = None,
+        priority_ids: Optional[set[int]] = None,
+    ):
+        """Fetch missing ratings, applying each result as soon as it arrives.
+
+        Lookups for movies in priority_ids (e.g. visible cards) are started first.
+        Every result is applied and reported via on_movie_updated (as a
+        MovieView) right away; commits happen in small time-boxed batches.
+        movies may be Movie instances or views.
+        """
         has_rating_api = self.mdblist_api or self.omdb_api
+        priority_ids = priority_ids or set()
+        now = utc_now().replace(tzinfo=None)  # SQLite stores naive UTC
+
+        # 1. Load the movies (callers may pass views) in a single query, then
+        # collect the info we need, visible movies first (stable order otherwise)
+        keys = [(m.kinopoisk_id, m.is_tv) for m in sorted(movies, key=lambda m: m.id not in priority_ids)]
+        movies_map = await get_movies_by_kp_ids_batch(session, keys)
+        # End the read transaction: the connection goes back to the pool during lookups
+        await session.commit()
 
-        # 1. Collect movie info we need (without holding session during HTTP calls)
         movies_info = []
-        for m in movies:
+        for m in (movies_map[key] for key in keys if key in movies_map):
             movies_info.append({
                 "kinopoisk_id": m.kinopoisk_id,
                 "is_tv": m.is_tv,
                 "imdb_id": m.imdb_id,
-                "imdb_rating": m.imdb_rating,
-                "kp_rating": m.kp_rating,
                 "title": m.title,
                 "title_original": m.title_original,
                 "year": m.year,
+                "external_due": self._ratings_due(m, "external", now),
+                "kp_due": self._ratings_due(m, "kp", now),
             })
 
-        # 2. Fetch all external ratings concurrently (no DB access needed)
-        external_results = {}
-        if has_rating_api:
-            needing_external = [m for m in movies_info if m["imdb_rating"] is None]
-            if needing_external:
-                tasks = [self._fetch_external_ratings_by_info(m) for m in needing_external]
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                for m, result in zip(needing_external, results):
-                    if not isinstance(result, Exception) and result:
-                        external_results[m["kinopoisk_id"]] = result
-
-        # 3. Fetch all KP ratings concurrently (no DB access needed)
-        kp_results = {}
-        if self.kp_api:
-            needing_kp = [m for m in movies_info if m["kp_rating"] is None]
-            if needing_kp:
-                tasks = [self._fetch_kp_rating(m) for m in needing_kp]
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                for m, result in zip(needing_kp, results):
-                    if not isinstance(result, Exception) and result is not None:
-                        kp_results[m["kinopoisk_id"]] = result
-
-        # 4. Batch fetch all movies that need updates
-        keys_to_update = [
-            (m["kinopoisk_id"], m["is_tv"])
-            for m in movies_info
-            if external_results.get(m["kinopoisk_id"]) or kp_results.get(m["kinopoisk_id"]) is not None
-        ]
-
-        if not keys_to_update:
+        needing_external = [m for m in movies_info if m["external_due"]] if has_rating_api else []
+        needing_kp = [m for m in movies_info if m["kp_due"]] if self.kp_api else []
+        if not needing_external and not needing_kp:
             return
 
-        movies_map = await get_movies_by_kp_ids_batch(session, keys_to_update)
-
-        # 5. Update all movies and commit once
-        updated_movies = []
-        for m_info in movies_info:
-            kp_id = m_info["kinopoisk_id"]
-            ext_data = external_results.get(kp_id, {})
-            kp_data = kp_results.get(kp_id)
+        # 2. Start lookups in priority order; semaphores (FIFO) bound concurrency per source
+        external_sem = asyncio.Semaphore(self.RATINGS_CONCURRENCY)
+        kp_sem = asyncio.Semaphore(self.RATINGS_CONCURRENCY)
+
+        async def fetch(m_info: dict, source: str):
+            try:
+                if source == "external":
+                    async with external_sem:
+                        return m_info, source, await self._fetch_external_ratings_by_info(m_info), False
+                async with kp_sem:
+                    return m_info, source, await self._fetch_kp_rating(m_info), False
+            except Exception:
+                return m_info, source, None, True
+
+        tasks = [asyncio.ensure_future(fetch(m, "external")) for m in needing_external]
+        tasks += [asyncio.ensure_future(fetch(m, "kp")) for m in needing_kp]
+
+        # 3. Apply results as they complete, commit in time-boxed batches
+        loop = asyncio.get_running_loop()
+        last_commit = loop.time()
+        pending_commit = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                m_info, source, result, failed = await next_done
+                movie = movies_map.get((m_info["kinopoisk_id"], m_info["is_tv"]))
+                if not movie:
+                    continue
 
-            if not ext_data and kp_data is None:
-                continue
+                if failed:
+                    status = "error"
+                elif source == "external":
+                    status = "ok" if result and result.get("imdb") is not None else "missing"
+                else:
+                    status = "ok" if result is not None else "missing"
+
+                changed = bool(result) and self._apply_ratings(movie, source, result)
+                self._record_ratings_attempt(movie, source, status, now)
+                pending_commit += 1
+                if changed and on_movie_updated:
+                    on_movie_updated(MovieView.from_movie(movie))
+
+                if pending_commit and (
+                    pending_commit >= self.RATINGS_COMMIT_BATCH
+                    or loop.time() - last_commit >= self.RATINGS_COMMIT_INTERVAL
+                ):
+                    await session.commit()
+                    pending_commit = 0
+                    last_commit = loop.time()
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Keep the ratings applied so far, also when a superseded view cancels the fetch
+            if pending_commit:
+                await session.commit()
 
-            movie = movies_map.get((kp_id, m_info["is_tv"]))
-            if not movie:
-                continue
+    def _ratings_due(self, movie: Movie, source: str, now: datetime) -> bool:
+        """Whether ratings from source ("external" or "kp") should be (re)fetched for a movie."""
+        next_retry = movie.external_next_retry_at if source == "external" else movie.kp_next_retry_at
+        if next_retry is not None:
+            return next_retry.replace(tzinfo=None) <= now
+
+        # Never checked: fetch missing ratings, refresh ones stored long ago
+        rating = movie.imdb_rating if source == "external" else movie.kp_rating
+        if rating is None or movie.created_at is None:
+            return True
+        return movie.created_at.replace(tzinfo=None) <= now - self.RATINGS_REFRESH_AGE
+
+    def _record_ratings_attempt(self, movie: Movie, source: str, status: str, now: datetime):
+        """Store lookup outcome and schedule the next one (exponential backoff on misses)."""
+        previous_attempts = getattr(movie, f"{source}_attempts") or 0
+        for key, value in self._ratings_attempt_fields(source, status, previous_attempts, now).items():
+            setattr(movie, key, value)
+
+    def _ratings_attempt_fields(self, source: str, status: str, previous_attempts: int, now: datetime) -> dict:
+        """Movie column values recording a lookup outcome (see _record_ratings_attempt)."""
+        if status == "ok":
+            attempts = 0
+            delay = self.RATINGS_REFRESH_AGE
+        else:
+            attempts = previous_attempts + 1
+            # A failed request says nothing about the title: retry much sooner than a miss
+            base, cap = (
+                (self.RATINGS_ERROR_RETRY_BASE, self.RATINGS_ERROR_RETRY_MAX) if status == "error"
+                else (self.RATINGS_RETRY_BASE, self.RATINGS_RETRY_MAX)
+            )
+            delay = min(base * 2 ** min(attempts - 1, 16), cap)
+        return {
+            f"{source}_checked_at": now,
+            f"{source}_status": status,
+            f"{source}_attempts": attempts,
+            f"{source}_next_retry_at": now + delay,
+            "ratings_loaded_at": now,
+        }
 
-            updated = False
-            if ext_data.get("imdb") is not None:
-                movie.imdb_rating = ext_data["imdb"]
-                updated = True
-            if ext_data.get("rotten_tomatoes") is not None:
-                movie.rotten_tomatoes = ext_data["rotten_tomatoes"]
-                updated = True
-            if ext_data.get("metacritic") is not None:
-                movie.metacritic = ext_data["metacritic"]
-                updated = True
-            if kp_data is not None:
-                movie.kp_rating = kp_data
-                updated = True
-
-            if updated:
-                updated_movies.append(movie)
-
-        if updated_movies:
-            await session.commit()
-            if on_movie_updated:
-                for movie in updated_movies:
-                    on_movie_updated(movie)
+    @staticmethod
+    def _apply_ratings(movie: Movie, source: str, result) -> bool:
+        """Apply a rating lookup result to a movie. Returns True if anything changed."""
+        if source == "kp":
+            movie.kp_rating = result
+            return True
+
+        updated = False
+        if result.get("imdb") is not None:
+            movie.imdb_rating = result["imdb"]
+            updated = True
+        if result.get("rotten_tomatoes") is not None:
+            movie.rotten_tomatoes = result["rotten_tomatoes"]
+            updated = True
+        if result.get("metacritic") is not None:
+            movie.metacritic = result["metacritic"]
+            updated = True
+        return updated
 
     async def _fetch_external_ratings_by_info(self, movie_info: dict) -> dict:
-        """Fetch external ratings using movie info dict."""
+        """Fetch external ratings using movie info dict (MDBList, then OMDB).
+
+        Raises the lookup error when a source failed and none found ratings,
+        so the attempt is recorded as an error rather than a missing rating.
+        """
         ratings = {}
+        error = None
 
         if self.mdblist_api:
-            ratings = await self.mdblist_api.get_ratings_by_tmdb_id(movie_info["kinopoisk_id"], movie_info["is_tv"])
+            try:
+                ratings = await self.mdblist_api.get_ratings_by_tmdb_id(
+                    movie_info["kinopoisk_id"], movie_info["is_tv"]
+                )
+            except Exception as e:
+                error = e
 
         if not ratings and self.omdb_api and movie_info.get("imdb_id"):
-            omdb_ratings = await self.omdb_api.get_ratings_by_imdb_id(movie_info["imdb_id"])
-            ratings = {
-                "imdb": omdb_ratings.get("imdb"),
-                "rotten_tomatoes": omdb_ratings.get("rotten_tomatoes"),
-                "metacritic": omdb_ratings.get("metacritic"),
-            }
-
+            try:
+                omdb_ratings = await self.omdb_api.get_ratings_by_imdb_id(movie_info["imdb_id"])
+            except Exception as e:
+                error = e
+                omdb_ratings = {}
+            if omdb_ratings:
+                ratings = {
+                    "imdb": omdb_ratings.get("imdb"),
+                    "rotten_tomatoes": omdb_ratings.get("rotten_tomatoes"),
+                    "metacritic": omdb_ratings.get("metacritic"),
+                }
+
+        if not ratings and error is not None:
+            raise error
         return ratings
 
 
@@ -381,29 +696,33 @@ class SearchService:
             return None
 
         if not skip_ratings:
-            await self._fetch_external_ratings(full_info, item_id, is_tv)
+            # Record lookups like fetch_missing_ratings does, so _ratings_due doesn't repeat them
+            now = utc_now().replace(tzinfo=None)
+            if self.mdblist_api or self.omdb_api:
+                try:
+                    await self._fetch_external_ratings(full_info, item_id, is_tv)
+                    status = "ok" if full_info.get("imdb_rating") is not None else "missing"
+                except Exception:
+                    status = "error"
+                full_info.update(self._ratings_attempt_fields("external", status, 0, now))
 
             if self.kp_api:
-                kp_rating = await self._fetch_kp_rating(full_info)
+                try:
+                    kp_rating = await self._fetch_kp_rating(full_info)
+                    status = "ok" if kp_rating is not None else "missing"
+                except Exception:
+                    kp_rating, status = None, "error"
                 if kp_rating is not None:
                     full_info["kp_rating"] = kp_rating
+                full_info.update(self._ratings_attempt_fields("kp", status, 0, now))
 
         return full_info
 
     async def _fetch_external_ratings(self, full_info: dict, tmdb_id: int, is_tv: bool):
-        """Fetch IMDB/RT/MC ratings."""
-        ratings = {}
-
-        if self.mdblist_api:
-            ratings = await self.mdblist_api.get_ratings_by_tmdb_id(tmdb_id, is_tv)
-
-        if not ratings and self.omdb_api and full_info.get("imdb_id"):
-            omdb_ratings = await self.omdb_api.get_ratings_by_imdb_id(full_info["imdb_id"])
-            ratings = {
-                "imdb": omdb_ratings.get("imdb"),
-                "rotten_tomatoes": omdb_ratings.get("rotten_tomatoes"),
-                "metacritic": omdb_ratings.get("metacritic"),
-            }
+        """Fetch IMDB/RT/MC ratings into full_info (lookup errors are raised)."""
+        ratings = await self._fetch_external_ratings_by_info(
+            {"kinopoisk_id": tmdb_id, "is_tv": is_tv, "imdb_id": full_info.get("imdb_id")}
+        )
 
         if ratings.get("imdb") is not None:
             full_info["imdb_rating"] = ratings["imdb"]
@@ -413,7 +732,7 @@ class SearchService:
             full_info["metacritic"] = ratings["metacritic"]
 
     async def _fetch_kp_rating(self, movie_info: dict) -> Optional[float]:
-        """Fetch Kinopoisk rating by searching for movie by title and year."""
+        """Fetch Kinopoisk rating by searching for movie by title and year (lookup errors are raised)."""
         if not self.kp_api:
             return None
 
@@ -450,219 +769,183 @@ class SearchService:
                 return True
             return abs(y1 - y2) <= 1
 
-        try:
-            all_results = []
-
-            search_title = strip_parentheses(title)
-            results = await self.kp_api.search_by_keyword(search_title)
-            all_results.extend(results[:15])
-
-            if title_original:
-                search_orig = strip_parentheses(title_original)
-                if search_orig.lower() != search_title.lower():
-                    results_orig = await self.kp_api.search_by_keyword(search_orig)
-                    for r in results_orig[:15]:
-                        if r.get("kinopoisk_id") not in {x.get("kinopoisk_id") for x in all_results}:
-                            all_results.append(r)
-
-            for result in all_results:
-                result_title = result.get("title") or ""
-                result_title_orig = result.get("title_original") or ""
-                result_year = result.get("year")
-
-                title_ok = titles_match(title, result_title) or (
-                    title_original and titles_match(title_original, result_title_orig)
-                )
-                year_ok = years_match(year, result_year)
+        all_results = []
 
-                if title_ok and year_ok:
-                    rating = result.get("kp_rating")
-                    if rating:
-                        return rating
+        search_title = strip_parentheses(title)
+        results = await self.kp_api.search_by_keyword(search_title)
+        all_results.extend(results[:15])
 
-        except Exception:
-            pass
+        if title_original:
+            search_orig = strip_parentheses(title_original)
+            if search_orig.lower() != search_title.lower():
+                results_orig = await self.kp_api.search_by_keyword(search_orig)
+                for r in results_orig[:15]:
+                    if r.get("kinopoisk_id") not in {x.get("kinopoisk_id") for x in all_results}:
+                        all_results.append(r)
 
-        return None
+        for result in all_results:
+            result_title = result.get("title") or ""
+            result_title_orig = result.get("title_original") or ""
+            result_year = result.get("year")
 
-    def _matches_all_words(self, movie: Movie, query_words: list[str]) -> bool:
-        """Check if movie matches ALL query words."""
-        searchable_text = self._get_searchable_text(movie)
-        for word in query_words:
-            if word not in searchable_text:
-                return False
-        return True
-
-    def _matches_genres(self, movie: Movie, genre_ids: list[int]) -> bool:
-        """Check if movie matches ALL selected genres."""
-        if not movie.genre_list:
-            return False
+            title_ok = titles_match(title, result_title) or (
+                title_original and titles_match(title_original, result_title_orig)
+            )
+            year_ok = years_match(year, result_year)
 
-        movie_genre_names = {g.name.lower() for g in movie.genre_list}
-
-        genre_names = {
-            28: "боевик", 12: "приключения", 16: "мультфильм", 35: "комедия",
-            80: "криминал", 99: "документальный", 18: "драма", 10751: "семейный",
-            14: "фэнтези", 36: "история", 27: "ужасы", 10402: "музыка",
-            9648: "детектив", 10749: "мелодрама", 878: "фантастика",
-            10770: "тв фильм", 53: "триллер", 10752: "военный", 37: "вестерн",
-            10759: "боевик", 10765: "фантастика", 10762: "детский",
-            10763: "новости", 10764: "реалити", 10766: "мыльная опера",
-            10767: "ток-шоу", 10768: "военный",
-        }
+            if title_ok and year_ok:
+                rating = result.get("kp_rating")
+                if rating:
+                    return rating
 
-        for genre_id in genre_ids:
-            genre_name = genre_names.get(genre_id, "")
-            if genre_name and genre_name not in movie_genre_names:
-                return False
+        return None
 
-        return True
+    def _matches_all_words(self, movie: Movie, query_tokens: list[str], mode: str = MATCH_PREFIX) -> bool:
+        """Check if movie matches ALL query tokens (see tokenize)."""
+        if movie.search_tokens is None:
+            # Not indexed yet: build the index from loaded relationships
+            return TokenIndex(self._get_searchable_text(movie)).matches(query_tokens, mode)
+        return get_token_index(movie).matches(query_tokens, mode)
 
     def _get_searchable_text(self, movie: Movie) -> str:
-        """Get all searchable text from movie."""
-        parts = []
-        if movie.title:
-            parts.append(movie.title.lower())
-        if movie.title_original:
-            parts.append(movie.title_original.lower())
-        if movie.genre_list:
-            parts.append(movie.genres_display.lower())
-        if movie.director_list:
-            parts.append(movie.directors_display.lower())
-        if movie.actor_list:
-            parts.append(movie.actors_display.lower())
-        if movie.description:
-            parts.append(movie.description.lower())
-        return " ".join(parts)
-
-    async def _sort_by_user_preference(self, session: AsyncSession, movies: list[Movie]) -> list[Movie]:
+        """Get search tokens of a movie from its fields and loaded relationships."""
+        return build_search_tokens(
+            movie.title,
+            movie.title_original,
+            movie.genres_display,
+            movie.directors_display,
+            movie.actors_display,
+            movie.description,
+        )
+
+    async def _sort_by_user_preference(self, movies: list[Movie]) -> list[Movie]:
         """Sort movies by personal recommendation score."""
+        return [movie for movie, _ in await self._score_movies(movies)]
+
+    async def _score_movies(self, movies: list[Movie]) -> list[tuple[Movie, float]]:
+        """Score movies by personal recommendation score, best first.
+
+        Without user ratings the TMDB rating is used as the score.
+        """
         if not movies:
-            return movies
+            return []
 
         # Pre-load all user ratings ONCE for the entire sorting operation
-        cached_ratings = await get_all_user_ratings(session)
+        async with get_session() as session:
+            cached_ratings = await get_all_user_ratings(session, PROFILE_SCORING)
 
-        if not await self.recommender.has_user_ratings(session, cached_ratings):
-            return sorted(movies, key=lambda m: m.tmdb_rating or 0, reverse=True)
+        if not cached_ratings:
+            scored_movies = [(movie, movie.tmdb_rating or 0) for movie in movies]
+            scored_movies.sort(key=lambda x: x[1], reverse=True)
+            return scored_movies
 
         # Pre-load all recommendations ONCE (avoids N*M DB queries)
-        preloaded_recs = await self.recommender.preload_recommendations(session, cached_ratings)
+        preloaded_recs = await self.recommender.preload_recommendations(cached_ratings)
 
         scored_movies = []
         for movie in movies:
-            score = await self.recommender.calculate_score(movie, session, cached_ratings, preloaded_recs)
+            score = await self.recommender.calculate_score(movie, None, cached_ratings, preloaded_recs)
             scored_movies.append((movie, score))
 
         scored_movies.sort(key=lambda x: x[1], reverse=True)
-        return [movie for movie, _ in scored_movies]
-
-    async def find_magic_recommendation(self, session: AsyncSession) -> Optional[Movie]:
-        """Find the single best unwatched movie based on user's preferences."""
-        from database import get_rated_movies, get_cached_recommendations_batch, save_cached_recommendations, get_wishlist_movie_ids
-
-        rated_movies = await get_rated_movies(session, min_rating=6)
-        if not rated_movies:
-            return None
-
-        # Pre-load all user ratings ONCE (used for filtering and scoring)
-        cached_ratings = await get_all_user_ratings(session)
-        rated_ids = {(ur.movie.kinopoisk_id, ur.movie.is_tv) for ur in cached_ratings}
+        return scored_movies
 
-        # Get wishlist movie IDs to exclude them from recommendations
-        wishlist_ids = await get_wishlist_movie_ids(session)
-
-        seen_ids = set()
-        candidates = []
-        uncached = []
-
-        # Batch fetch all cached recommendations
-        top_rated = rated_movies[:20]
-        cache_keys = [(m.kinopoisk_id, m.is_tv) for m in top_rated]
-        cached_recs = await get_cached_recommendations_batch(session, cache_keys)
-
-        for rated in top_rated:
-            key = (rated.kinopoisk_id, rated.is_tv)
-            cached_ids = cached_recs.get(key)
-            if cached_ids is not None:
-                for rec_id in cached_ids:
-                    rec_key = (rec_id, rated.is_tv)
-                    if rec_key not in rated_ids and rec_key not in seen_ids:
-                        seen_ids.add(rec_key)
-                        candidates.append({"kinopoisk_id": rec_id, "is_tv": rated.is_tv})
-            else:
-                uncached.append(rated)
+    async def find_magic_recommendation(self) -> Optional[MovieView]:
+        """Find the single best unwatched movie based on user's preferences.
 
-        if uncached:
-            tasks = []
-            for r in uncached:
-                if r.is_tv:
-                    tasks.append(self.tmdb_api.get_recommendations_tv(r.kinopoisk_id))
-                else:
-                    tasks.append(self.tmdb_api.get_recommendations_movie(r.kinopoisk_id))
+        When personal scores are kept, the best scored stored movie is returned
+        without network calls, and TMDB recommendations of liked movies are
+        loaded in background: they are saved, scored by PersonalScores and
+        compete from the next click on. Otherwise the TMDB recommendations are
+        loaded and scored here.
+        """
+        from database import get_rated_movies, get_wishlist_movie_ids
 
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+        async with get_session() as session:
+            rated_movies = await get_rated_movies(session, min_rating=6, profile=PROFILE_SCORING)
+            if not rated_movies:
+                return None
 
-            for rated, result in zip(uncached, results):
-                if isinstance(result, Exception):
-                    continue
-                rec_ids = [r.get("kinopoisk_id") for r in result if r.get("kinopoisk_id")]
-                await save_cached_recommendations(session, rated.kinopoisk_id, rated.is_tv, rec_ids)
-                for rec in result:
-                    rec_id = rec.get("kinopoisk_id")
-                    is_tv = rec.get("is_tv", False)
-                    key = (rec_id, is_tv)
-                    if key not in rated_ids and key not in seen_ids:
-                        seen_ids.add(key)
-                        candidates.append(rec)
+            # Pre-load all user ratings ONCE (used for filtering and scoring)
+            cached_ratings = await get_all_user_ratings(session, PROFILE_SCORING)
 
-        if not candidates:
-            return None
+            # Get wishlist movie IDs to exclude them from recommendations
+            wishlist_ids = await get_wishlist_movie_ids(session)
+        rated_ids = {(ur.movie.kinopoisk_id, ur.movie.is_tv) for ur in cached_ratings}
 
-        movies = await self._load_movies_parallel(session, candidates[:50])
+        if self.personal_scores is not None:
+            stored_best = await self.personal_scores.best_unwatched()
+            if stored_best is not None:
+                self._start_magic_refresh(rated_movies, rated_ids)
+                await self._mark_accessed([stored_best[0]])
+                return stored_best[0]
 
-        if not movies:
-            return None
+        movies = await self._load_magic_candidates(rated_movies, rated_ids)
 
         # Pre-load all recommendations ONCE
-        preloaded_recs = await self.recommender.preload_recommendations(session, cached_ratings)
+        preloaded_recs = await self.recommender.preload_recommendations(cached_ratings) if movies else {}
 
         best_movie = None
         best_score = float('-inf')
-
         for movie in movies:
             if (movie.kinopoisk_id, movie.is_tv) in rated_ids:
                 continue
             # Skip movies that are in wishlist
             if movie.id in wishlist_ids:
                 continue
-            score = await self.recommender.calculate_score(movie, session, cached_ratings, preloaded_recs)
+            score = await self.recommender.calculate_score(movie, None, cached_ratings, preloaded_recs)
             if score > best_score:
                 best_score = score
                 best_movie = movie
 
-        return best_movie
+        if best_movie is None:
+            return None
+        await self._mark_accessed([best_movie])
+        return MovieView.from_movie(best_movie)
 
-    async def find_similar_movies(self, session: AsyncSession, source_movie: Movie) -> list[Movie]:
-        """Find movies similar to the given movie using TMDB recommendations."""
-        from database import get_cached_recommendations, save_cached_recommendations
+    async def _load_magic_candidates(self, rated_movies: list[Movie], rated_ids: set[tuple[int, bool]]) -> list[Movie]:
+        """Load (and store) TMDB recommendations of liked movies."""
+        candidates = await self.recommender.generate_candidates(rated_movies[:self.MAGIC_SOURCES], exclude=rated_ids)
+        if not candidates:
+            return []
+        return await self._load_movies_parallel(candidates[:self.MAGIC_CANDIDATES])
 
-        cached_ids = await get_cached_recommendations(session, source_movie.kinopoisk_id, source_movie.is_tv)
+    def _start_magic_refresh(self, rated_movies: list[Movie], rated_ids: set[tuple[int, bool]]):
+        """Load magic candidates in background unless a load is running (new movies get personal scores when saved)."""
+        if self._magic_refresh is not None and not self._magic_refresh.done():
+            return
 
-        if cached_ids is not None:
-            candidates = [{"kinopoisk_id": rid, "is_tv": source_movie.is_tv} for rid in cached_ids]
-        else:
-            if source_movie.is_tv:
-                recs = await self.tmdb_api.get_recommendations_tv(source_movie.kinopoisk_id)
-            else:
-                recs = await self.tmdb_api.get_recommendations_movie(source_movie.kinopoisk_id)
+        async def refresh():
+            try:
+                await self._load_magic_candidates(rated_movies, rated_ids)
+            except Exception:
+                pass  # Offline: the stored movies are offered meanwhile
+
+        self._magic_refresh = asyncio.ensure_future(refresh())
 
-            rec_ids = [r.get("kinopoisk_id") for r in recs if r.get("kinopoisk_id")]
-            await save_cached_recommendations(session, source_movie.kinopoisk_id, source_movie.is_tv, rec_ids)
-            candidates = recs
+    async def browse_library(self, genres: list[int] = None, limit: int = 50, offset: int = 0) -> list[MovieView]:
+        """Best scored stored movies not rated or wishlisted, optionally of all given genres (no network)."""
+        if self.personal_scores is None:
+            return []
+        movies = await self.personal_scores.top_unwatched(genres, limit, offset)
+        await self._mark_accessed(movies)
+        return movies
+
+    async def find_similar_movies(self, source_movie: MovieView) -> list[MovieView]:
+        """Find movies similar to the given movie using TMDB recommendations."""
+        candidates = await self.recommender.generate_candidates([source_movie])
 
         if not candidates:
             return []
 
-        movies = await self._load_movies_parallel(session, candidates[:40])
-        return await self._sort_by_user_preference(session, movies)
+        movies = await self._load_movies_parallel(candidates[:40])
+        await self._mark_accessed(movies)
+        return [MovieView.from_movie(m) for m in await self._sort_by_user_preference(movies)]
+
+    async def _mark_accessed(self, movies: list[Movie]):
+        """Record that movies were shown, so the retention policy keeps them."""
+        try:
+            async with get_session() as session:
+                await touch_movies(session, [m.id for m in movies], self.ACCESS_TOUCH_INTERVAL)
+        except Exception:
+            pass
@@ -0,0 +1,140 @@
+from bisect import bisect_left, bisect_right
+from typing import NamedTuple, Optional
+
+from database import get_session, get_movie_titles, get_people_names, add_movie_saved_listener
+from database.models import Movie
+from database.search_tokens import tokenize
+
+KIND_MOVIE = "movie"
+KIND_TV = "tv"
+KIND_PERSON = "person"
+
+
+class Suggestion(NamedTuple):
+    label: str  # Shown in the list, e.g. "Матрица (1999)"
+    query: str  # Put into the search field when chosen
+    kind: str  # KIND_MOVIE, KIND_TV or KIND_PERSON
+
+
+class SuggestionIndex:
+    """In-memory prefix index of local titles and people for search-as-you-type.
+
+    Keys are normalized names and every word-start suffix of them ("the matrix",
+    "matrix"), kept in a sorted list: a lookup is a bisect plus a short scan.
+    Built from the DB at startup, updated on every save_movie and rebuilt
+    after maintenance deletes movies and people.
+    """
+
+    MIN_QUERY_LENGTH = 2
+    LIMIT = 8
+    SCAN_LIMIT = 200  # Matching keys examined per lookup before ranking
+
+    def __init__(self):
+        self._keys: list[str] = []
+        self._refs: list[tuple[int, bool]] = []  # (item index, matches from the start of the name)
+        self._items: list[Suggestion] = []
+        self._item_ids: dict[tuple[str, str], int] = {}  # (kind, label) -> item index
+        self._saved_during_build: Optional[list[tuple[Movie, list[str]]]] = None
+        self.is_ready = False
+        add_movie_saved_listener(self._on_movie_saved)
+
+    async def build(self):
+        """(Re)load all stored titles and people; movies saved meanwhile are kept.
+
+        The current index keeps serving lookups until the new one replaces it.
+        """
+        self._saved_during_build = []
+        try:
+            async with get_session() as session:
+                titles = await get_movie_titles(session)
+                people = await get_people_names(session)
+        finally:
+            saved, self._saved_during_build = self._saved_during_build, None
+
+        self._items, self._item_ids = [], {}
+        entries = []
+        for title, title_original, year, is_tv in titles:
+            entries.extend(self._movie_entries(title, title_original, year, is_tv))
+        for _, name in people:
+            entries.extend(self._person_entries(name))
+        for movie, names in saved:
+            entries.extend(self._movie_entries(movie.title, movie.title_original, movie.year, movie.is_tv))
+            for name in names:
+                entries.extend(self._person_entries(name))
+
+        entries.sort(key=lambda entry: entry[0])
+        self._keys = [key for key, _ in entries]
+        self._refs = [ref for _, ref in entries]
+        self.is_ready = True
+
+    def suggest(self, query: str, limit: int = None) -> list[Suggestion]:
+        """Titles and people whose name (or any word of it onwards) starts with query."""
+        prefix = " ".join(tokenize(query))
+        if len(prefix) < self.MIN_QUERY_LENGTH:
+            return []
+
+        best: dict[int, bool] = {}
+        i = bisect_left(self._keys, prefix)
+        end = min(len(self._keys), i + self.SCAN_LIMIT)
+        while i < end and self._keys[i].startswith(prefix):
+            item_id, from_start = self._refs[i]
+            best[item_id] = best.get(item_id, False) or from_start
+            i += 1
+
+        # Names starting with the query first, then shorter (closer) names
+        ranked = sorted(best, key=lambda item_id: (not best[item_id], len(self._items[item_id].label)))
+        return [self._items[item_id] for item_id in ranked[:limit or self.LIMIT]]
+
+    def add_movie(self, title: str, title_original: Optional[str], year: Optional[int], is_tv: bool):
+        self._insert(self._movie_entries(title, title_original, year, is_tv))
+
+    def add_person(self, name: str):
+        self._insert(self._person_entries(name))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _on_movie_saved(self, movie: Movie, people: list[str]):
+        if self._saved_during_build is not None:
+            self._saved_during_build.append((movie, people))
+        self.add_movie(movie.title, movie.title_original, movie.year, movie.is_tv)
+        for name in people:
+            self.add_person(name)
+
+    def _insert(self, entries: list[tuple[str, tuple[int, bool]]]):
+        for key, ref in entries:
+            i = bisect_right(self._keys, key)
+            self._keys.insert(i, key)
+            self._refs.insert(i, ref)
+
+    def _movie_entries(self, title: str, title_original: Optional[str], year: Optional[int], is_tv: bool):
+        if not title:
+            return []
+        label = f"{title} ({year})" if year else title
+        item_id = self._get_item_id(Suggestion(label, title, KIND_TV if is_tv else KIND_MOVIE))
+        if item_id is None:
+            return []
+        entries = self._name_entries(title, item_id)
+        if title_original and title_original != title:
+            entries.extend(self._name_entries(title_original, item_id))
+        return entries
+
+    def _person_entries(self, name: Optional[str]):
+        if not name:
+            return []
+        item_id = self._get_item_id(Suggestion(name, name, KIND_PERSON))
+        return [] if item_id is None else self._name_entries(name, item_id)
+
+    def _get_item_id(self, item: Suggestion) -> Optional[int]:
+        """Index of a new item, None if it is already indexed."""
+        key = (item.kind, item.label)
+        if key in self._item_ids:
+            return None
+        self._item_ids[key] = len(self._items)
+        self._items.append(item)
+        return self._item_ids[key]
+
+    @staticmethod
+    def _name_entries(name: str, item_id: int) -> list[tuple[str, tuple[int, bool]]]:
+        tokens = tokenize(name)
+        return [(" ".join(tokens[i:]), (item_id, i == 0)) for i in range(len(tokens))]
@@ -0,0 +1,133 @@
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from database import get_session, apply_user_edits, EDIT_RATING, EDIT_WISHLIST, EDIT_TAGS
+
+# Called without arguments when the batch holding an edit fails (UI reverts its optimistic update)
+ErrorCallback = Callable[[], None]
+
+
+@dataclass
+class WriteStats:
+    """Write queue counters for the current session."""
+    queued: int = 0
+    coalesced: int = 0  # Edits replaced by a newer one before they were written
+    written: int = 0
+    failed: int = 0
+    batches: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "queued": self.queued,
+            "coalesced": self.coalesced,
+            "written": self.written,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+
+class WriteQueue:
+    """Single writer for user edits: ratings, reviews, wishlist and tags.
+
+    Edits are kept per (kind, movie): a newer edit replaces the pending one,
+    so clicking through the stars writes only the last rating. Pending edits
+    are written DEBOUNCE seconds after the last one (at most MAX_DELAY after
+    the first) in one transaction, in the order they were made, and entity
+    ratings are recomputed once per batch.
+    """
+
+    DEBOUNCE = 0.4  # Seconds of quiet before a batch is written
+    MAX_DELAY = 2.0  # Seconds an edit may wait while edits keep coming
+
+    def __init__(self):
+        # (kind, movie_id) -> (value, on_error), oldest edit first
+        self._pending: OrderedDict[tuple[str, int], tuple[object, Optional[ErrorCallback]]] = OrderedDict()
+        self._wakeup = asyncio.Event()
+        self._write_lock = asyncio.Lock()
+        self._first_edit_at: Optional[float] = None
+        self._last_edit_at: Optional[float] = None
+        self.stats = WriteStats()
+
+    def set_rating(self, movie_id: int, rating: int, review: Optional[str] = None,
+                   on_error: Optional[ErrorCallback] = None):
+        """Queue a rating (and review; None keeps the stored review)."""
+        if review is None:
+            # Keep a review queued with an earlier rating of the same movie
+            pending = self._pending.get((EDIT_RATING, movie_id))
+            if pending and pending[0] is not None:
+                review = pending[0][1]
+        self._put(EDIT_RATING, movie_id, (rating, review), on_error)
+
+    def delete_rating(self, movie_id: int, on_error: Optional[ErrorCallback] = None):
+        self._put(EDIT_RATING, movie_id, None, on_error)
+
+    def set_wishlist(self, movie_id: int, in_wishlist: bool, on_error: Optional[ErrorCallback] = None):
+        self._put(EDIT_WISHLIST, movie_id, in_wishlist, on_error)
+
+    def set_tags(self, movie_id: int, tag_ids: list[int], on_error: Optional[ErrorCallback] = None):
+        self._put(EDIT_TAGS, movie_id, list(tag_ids), on_error)
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def _put(self, kind: str, movie_id: int, value, on_error: Optional[ErrorCallback]):
+        key = (kind, movie_id)
+        if key in self._pending:
+            self.stats.coalesced += 1
+            del self._pending[key]  # Re-insert at the end: edits are applied in order
+        self._pending[key] = (value, on_error)
+        self.stats.queued += 1
+
+        now = asyncio.get_running_loop().time()
+        if self._first_edit_at is None:
+            self._first_edit_at = now
+        self._last_edit_at = now
+        self._wakeup.set()
+
+    async def run(self, shutdown_event: asyncio.Event):
+        """Write pending edits in debounced batches until shutdown (flush() writes the rest)."""
+        loop = asyncio.get_running_loop()
+        while not shutdown_event.is_set():
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=1.0)
+            except asyncio.TimeoutError:
+                continue
+            self._wakeup.clear()
+
+            while self._pending and not shutdown_event.is_set():
+                deadline = min(self._last_edit_at + self.DEBOUNCE, self._first_edit_at + self.MAX_DELAY)
+                delay = deadline - loop.time()
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+            if not shutdown_event.is_set():
+                await self.flush()
+
+    async def flush(self):
+        """Write all pending edits now in a single transaction."""
+        async with self._write_lock:
+            if not self._pending:
+                return
+            batch = self._pending
+            self._pending = OrderedDict()
+            self._first_edit_at = None
+
+            try:
+                async with get_session() as session:
+                    await apply_user_edits(
+                        session, [(kind, movie_id, value) for (kind, movie_id), (value, _) in batch.items()]
+                    )
+            except Exception:
+                self.stats.failed += len(batch)
+                for _, on_error in batch.values():
+                    if on_error:
+                        try:
+                            on_error()
+                        except Exception:
+                            pass
+                return
+            self.stats.written += len(batch)
+            self.stats.batches += 1
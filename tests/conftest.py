@@ -0,0 +1,19 @@
+import asyncio
+
+import pytest
+
+from database import init_db, close_db
+
+
+@pytest.fixture
+def run_db(tmp_path):
+    """Run an async test function against a fresh database (and cache database) in tmp_path."""
+    def run(test):
+        async def main():
+            await init_db(str(tmp_path / "movie_picker.db"))
+            try:
+                return await test()
+            finally:
+                await close_db()
+        return asyncio.run(main())
+    return run
@@ -0,0 +1,25 @@
+from database import get_session, save_movie, get_movie_views, get_movie_description
+from database.models import DESCRIPTION_PREVIEW_LENGTH
+
+
+def test_description_truncated_only_when_full_text_is_longer(run_db):
+    exact = "а" * DESCRIPTION_PREVIEW_LENGTH
+    longer = "б" * (DESCRIPTION_PREVIEW_LENGTH + 1)
+
+    async def test():
+        async with get_session() as session:
+            fits = await save_movie(session, {"kinopoisk_id": 1, "title": "Ровно", "description": exact})
+            cut = await save_movie(session, {"kinopoisk_id": 2, "title": "Длиннее", "description": longer})
+            assert (fits.description_truncated, cut.description_truncated) == (False, True)
+            assert cut.description == longer[:DESCRIPTION_PREVIEW_LENGTH]
+
+            views = await get_movie_views(session, [fits.id, cut.id])
+            assert [view.description_truncated for view in views] == [False, True]
+            assert await get_movie_description(session, cut.id) == longer
+
+            # A shorter text on re-fetch drops the stored full text and the flag
+            cut = await save_movie(session, {"kinopoisk_id": 2, "title": "Длиннее", "description": exact})
+            assert not cut.description_truncated
+            assert await get_movie_description(session, cut.id) == exact
+
+    run_db(test)
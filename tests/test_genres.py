@@ -0,0 +1,37 @@
+from database import (
+    get_session, save_movie, save_user_rating, get_all_user_ratings_filtered,
+    genre_mask_from_names, genre_mask_from_tmdb_ids, has_genres,
+)
+from database.genre_utils import GENRE_BITS, TMDB_GENRE_NAMES
+
+
+def test_tmdb_tv_genres_map_like_search_filter():
+    assert TMDB_GENRE_NAMES[878] == "фантастика"
+    assert TMDB_GENRE_NAMES[14] == "фэнтези"
+    assert TMDB_GENRE_NAMES[10765] == "фантастика"
+    assert TMDB_GENRE_NAMES[10759] == "боевик"
+    assert TMDB_GENRE_NAMES[10768] == "военный"
+
+
+def test_unknown_genres_match_nothing():
+    drama = GENRE_BITS["драма"]
+    assert genre_mask_from_tmdb_ids([18]) == drama
+    assert genre_mask_from_names(["Драма"]) == drama
+
+    for mask in (genre_mask_from_tmdb_ids([99999]), genre_mask_from_tmdb_ids([18, 99999]),
+                 genre_mask_from_names(["нуар"])):
+        assert mask  # Not the empty "any genre" mask
+        assert not has_genres(drama, mask)
+        assert not has_genres(sum(GENRE_BITS.values()), mask)
+
+
+def test_unknown_genre_filters_ratings_in_sql(run_db):
+    async def test():
+        async with get_session() as session:
+            movie = await save_movie(session, {"kinopoisk_id": 1, "title": "Фильм", "genres": "драма"})
+            await save_user_rating(session, movie.id, 8)
+
+            assert len(await get_all_user_ratings_filtered(session, genres=["драма"])) == 1
+            assert await get_all_user_ratings_filtered(session, genres=["нуар"]) == []
+
+    run_db(test)
@@ -0,0 +1,114 @@
+import asyncio
+import json
+from datetime import timedelta
+
+from sqlalchemy import select, update
+
+from database import (
+    get_session, enqueue_jobs, claim_jobs, complete_jobs, fail_jobs, save_cached_recommendations_batch,
+    recommendation_job_key,
+)
+from database.models import Job, RecommendationCache, utc_now
+from services import JobQueue, RecommenderService
+
+
+async def _jobs_by_key(kind: str) -> dict[str, Job]:
+    async with get_session() as session:
+        result = await session.execute(select(Job).filter(Job.kind == kind))
+        return {job.key: job for job in result.scalars().all()}
+
+
+def test_enqueue_leaves_running_job_alone(run_db):
+    async def test():
+        async with get_session() as session:
+            await enqueue_jobs(session, "m2m", [("a", {"v": 1})])
+            claimed = await claim_jobs(session)
+            await enqueue_jobs(session, "m2m", [("a", {"v": 1})])
+
+        job = (await _jobs_by_key("m2m"))["a"]
+        assert (job.status, job.attempts, job.rerun, json.loads(job.payload)) == ("running", 1, False, {"v": 1})
+
+        # Same payload: the in-flight run completes the job, it is not run again
+        async with get_session() as session:
+            await complete_jobs(session, [claimed[0].id])
+        assert await _jobs_by_key("m2m") == {}
+
+    run_db(test)
+
+
+def test_enqueue_during_run_reruns_with_new_payload(run_db):
+    async def test():
+        async with get_session() as session:
+            await enqueue_jobs(session, "m2m", [("a", {"v": 1}), ("b", {"v": 1})])
+            claimed = await claim_jobs(session)
+            await enqueue_jobs(session, "m2m", [("a", {"v": 2}), ("b", {"v": 2})])
+
+        jobs = await _jobs_by_key("m2m")
+        assert (jobs["a"].status, jobs["a"].rerun, json.loads(jobs["a"].payload)) == ("running", True, {"v": 2})
+
+        # The old payload's run finishes: the job is queued again instead of deleted
+        ids = {job.key: job.id for job in claimed}
+        async with get_session() as session:
+            await complete_jobs(session, [ids["a"]])
+            await fail_jobs(session, [ids["b"]], "timeout", retry_delay=None)  # Would give up without the rerun
+        jobs = await _jobs_by_key("m2m")
+        assert (jobs["a"].status, jobs["a"].rerun, jobs["a"].attempts) == ("pending", False, 0)
+        assert (jobs["b"].status, jobs["b"].rerun, jobs["b"].attempts) == ("pending", False, 1)
+
+        async with get_session() as session:
+            claimed = await claim_jobs(session)
+            assert {job.key: json.loads(job.payload) for job in claimed} == {"a": {"v": 2}, "b": {"v": 2}}
+            await complete_jobs(session, [job.id for job in claimed])
+        assert await _jobs_by_key("m2m") == {}
+
+    run_db(test)
+
+
+def test_enqueue_keeps_attempts_and_backoff(run_db):
+    async def test():
+        retry_at = utc_now().replace(tzinfo=None) + timedelta(minutes=30)
+        async with get_session() as session:
+            await enqueue_jobs(session, "m2m", [("a", {"v": 1})])
+            await session.execute(update(Job).values(attempts=3, next_run_at=retry_at, status="failed"))
+            await session.commit()
+            await enqueue_jobs(session, "m2m", [("a", {"v": 2}), ("b", {"v": 2})])
+
+        jobs = await _jobs_by_key("m2m")
+        assert set(jobs) == {"a", "b"}
+        assert (jobs["a"].status, jobs["a"].attempts, json.loads(jobs["a"].payload)) == ("pending", 3, {"v": 2})
+        assert jobs["a"].next_run_at == retry_at
+        assert jobs["b"].attempts == 0
+
+    run_db(test)
+
+
+def test_refresher_skips_keys_with_jobs(run_db):
+    async def test():
+        old = utc_now().replace(tzinfo=None) - timedelta(days=30)
+        async with get_session() as session:
+            await save_cached_recommendations_batch(session, {(1, False): [10], (2, False): [20], (3, True): [30]})
+            await session.execute(update(RecommendationCache).values(updated_at=old))
+            await session.commit()
+            # Key 1 is backing off after failed attempts
+            await enqueue_jobs(session, "recommendations", [(recommendation_job_key(1, False), {"tmdb_id": 1})])
+            await session.execute(
+                update(Job).filter(Job.key == recommendation_job_key(1, False)).values(attempts=2)
+            )
+            await session.commit()
+
+        recommender = RecommenderService(None, job_queue=JobQueue())
+        recommender.REFRESH_INTERVAL = 0.01
+        recommender.schedule_refresh([(1, False)])  # Served stale meanwhile
+        shutdown = asyncio.Event()
+        task = asyncio.create_task(recommender.run_background_refresher(shutdown))
+        await asyncio.sleep(0.3)
+        shutdown.set()
+        await task
+
+        jobs = await _jobs_by_key("recommendations")
+        assert set(jobs) == {"1:0", "2:0", "3:1"}
+        # Not re-enqueued: payload and attempt count are untouched
+        assert json.loads(jobs["1:0"].payload) == {"tmdb_id": 1}
+        assert jobs["1:0"].attempts == 2
+
+    run_db(test)
@@ -0,0 +1,58 @@
+from datetime import timedelta
+
+from sqlalchemy import update
+
+from database import get_session, save_movie
+from database.models import Movie, utc_now
+from services import MaintenanceService, PersonIndex, RecommenderService, SearchService, SuggestionIndex
+
+
+class StubTMDB:
+    """Person lookups that never reach TMDB: every name resolves locally or not at all."""
+
+    async def search_person(self, name: str) -> list[dict]:
+        return []
+
+
+async def _save(kp_id: int, title: str, director: str, tmdb_id: int) -> int:
+    async with get_session() as session:
+        movie = await save_movie(session, {
+            "kinopoisk_id": kp_id, "title": title, "year": 2001,
+            "directors": [{"tmdb_id": tmdb_id, "name": director}], "actors": [],
+        })
+        return movie.id
+
+
+def test_prune_refreshes_in_memory_indexes(run_db):
+    async def test():
+        old_id = await _save(1, "Забытый фильм", "Режиссёр Старый", 101)
+        await _save(2, "Свежий фильм", "Режиссёр Новый", 102)
+        async with get_session() as session:
+            await session.execute(
+                update(Movie).where(Movie.id == old_id)
+                .values(created_at=utc_now().replace(tzinfo=None) - timedelta(days=200), last_accessed_at=None)
+            )
+            await session.commit()
+
+        tmdb = StubTMDB()
+        person_index = PersonIndex(tmdb)
+        search = SearchService(tmdb, None, None, None, RecommenderService(tmdb), person_index=person_index)
+        suggestions = SuggestionIndex()
+        await suggestions.build()
+        assert await person_index.resolve("Режиссёр Старый") == [101]
+        assert [s.query for s in suggestions.suggest("забыт")] == ["Забытый фильм"]
+        search._result_cache.set(("забытый",), [(1, False, 7.0)])
+
+        maintenance = MaintenanceService(suggestion_index=suggestions, person_index=person_index, search_service=search)
+        report = await maintenance.run_once()
+
+        assert (report.movies, report.people) == (1, 1)
+        assert suggestions.suggest("забыт") == []
+        assert suggestions.suggest("старый") == []
+        assert [s.query for s in suggestions.suggest("свеж")] == ["Свежий фильм"]
+        assert [s.query for s in suggestions.suggest("новый")] == ["Режиссёр Новый"]
+        assert await person_index.resolve("Режиссёр Старый") == []
+        assert await person_index.resolve("Режиссёр Новый") == [102]
+        assert len(search._result_cache) == 0
+
+    run_db(test)
@@ -0,0 +1,112 @@
+"""Schema upgrades of existing database files: init_db on an older layout, run twice."""
+import asyncio
+import os
+import sqlite3
+
+import pytest
+
+from database import init_db, close_db
+from database.db import get_cache_path
+
+RECOMMENDATIONS = {"source_tmdb_id": 603, "source_is_tv": 0, "recommended_ids": "[604, 605]", "updated_at": "2026-01-01"}
+FILMOGRAPHY = {"person_tmdb_id": 1, "movies": '[{"kinopoisk_id": 603}]', "tv_shows": "[]", "updated_at": "2026-01-01"}
+JOB = {
+    "id": 1, "kind": "m2m", "key": "42:0", "payload": '{"movie_id": 1}', "status": "pending",
+    "attempts": 0, "next_run_at": "2026-01-01 00:00:00",
+}
+
+
+def _init_db(db_path: str):
+    async def init():
+        await init_db(db_path)
+        await close_db()
+    asyncio.run(init())
+
+
+def _tables(path: str) -> set[str]:
+    with sqlite3.connect(path) as conn:
+        return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def _move_table(source_path: str, target_path: str, table: str):
+    """Recreate table with the same DDL in another file (empty), dropping it from source."""
+    with sqlite3.connect(source_path) as source:
+        ddl = source.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()[0]
+        source.execute(f"DROP TABLE {table}")
+    with sqlite3.connect(target_path) as target:
+        target.execute(ddl)
+
+
+def _insert(path: str, table: str, row: dict):
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            f"INSERT INTO {table} ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})", list(row.values())
+        )
+
+
+def _drop_column(path: str, table: str, column: str):
+    """Remove a column added by a later schema version."""
+    with sqlite3.connect(path) as conn:
+        conn.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
+
+
+def _set_version(version: int, *paths: str):
+    for path in paths:
+        with sqlite3.connect(path) as conn:
+            conn.execute(f"PRAGMA user_version = {version}")
+
+
+def test_jobs_move_back_to_main_database(tmp_path):
+    db_path = str(tmp_path / "movie_picker.db")
+    cache_path = get_cache_path(db_path)
+    _init_db(db_path)
+    # Version 12 layout: the job queue in the cache database, before jobs.rerun
+    _move_table(db_path, cache_path, "jobs")
+    _drop_column(cache_path, "jobs", "rerun")
+    _insert(cache_path, "jobs", JOB)
+    _set_version(12, db_path, cache_path)
+
+    _init_db(db_path)
+    _init_db(db_path)
+
+    assert "jobs" in _tables(db_path)
+    assert "jobs" not in _tables(cache_path)
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT kind, key, payload, status, rerun FROM jobs").fetchall() == [
+            ("m2m", "42:0", '{"movie_id": 1}', "pending", 0)
+        ]
+
+
+@pytest.mark.parametrize("version", [8, 11])
+def test_single_file_layout_moves_cache_tables(tmp_path, version):
+    db_path = str(tmp_path / "movie_picker.db")
+    cache_path = get_cache_path(db_path)
+    _init_db(db_path)
+    # Single-file layout: cache tables in the main database, no cache file
+    for table, row in (("recommendation_cache", RECOMMENDATIONS), ("person_filmographies", FILMOGRAPHY)):
+        _move_table(cache_path, db_path, table)
+        _insert(db_path, table, row)
+    _drop_column(db_path, "jobs", "rerun")
+    _insert(db_path, "jobs", JOB)
+    _drop_column(db_path, "movies", "description_truncated")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(cache_path + suffix):
+            os.remove(cache_path + suffix)
+    _set_version(version, db_path)
+
+    _init_db(db_path)
+    _init_db(db_path)
+
+    assert not {"recommendation_cache", "person_filmographies"} & _tables(db_path)
+    assert {"jobs", "movies", "user_ratings"} <= _tables(db_path)
+    with sqlite3.connect(cache_path) as conn:
+        assert conn.execute("SELECT source_tmdb_id, recommended_ids FROM recommendation_cache").fetchall() == [
+            (603, "[604, 605]")
+        ]
+        assert conn.execute("SELECT person_tmdb_id, movies FROM person_filmographies").fetchall() == [
+            (1, '[{"kinopoisk_id": 603}]')
+        ]
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT key, status, rerun FROM jobs").fetchall() == [("42:0", "pending", 0)]
+        assert "description_truncated" in {row[1] for row in conn.execute("PRAGMA table_info(movies)")}
+        assert conn.execute("PRAGMA user_version").fetchone()[0] > version
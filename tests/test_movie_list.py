@@ -0,0 +1,228 @@
+"""Virtualized MovieList: spacer sizes, window placement, scroll handling cost and memory of long lists."""
+import gc
+import statistics
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import pytest
+
+ft = pytest.importorskip("flet")
+
+from sqlalchemy import insert, select
+
+from database import get_session, get_movie_views, movie_load_options
+from database.models import Actor, Director, Genre, Movie, MovieActor, MovieDirector, MovieGenre
+from database.views import MovieView
+from ui.components import movie_list as movie_list_module
+from ui.components.movie_list import MovieList
+
+VIEWPORT = 800
+SCROLL_STEP = 150
+# Median time to handle a scroll event that slides the window (bookkeeping only, cards are stubbed)
+RENDER_BUDGET_MS = 5.0
+# Loaded movies held by a long list: 10 actors and 3 genres each, as search results come
+LOADED_MOVIES = 2000
+ACTORS_PER_MOVIE = 10
+GENRES_PER_MOVIE = 3
+
+
+class StubCard(ft.Container):
+    """Stand-in for MovieCard: the list only needs its bookkeeping interface."""
+
+    def __init__(self, movie, collapsed=False, on_collapse_toggle=None, **kwargs):
+        super().__init__()
+        self.movie = movie
+        self.collapsed = collapsed
+        self.on_collapse_toggle = on_collapse_toggle
+
+    def rebind(self, movie, collapsed=False, **kwargs):
+        self.movie = movie
+        self.collapsed = collapsed
+
+    def _apply_collapse_state(self):
+        pass
+
+
+def true_height(card) -> float:
+    """Laid out height of a card: varies per movie, unlike the list's estimate."""
+    if card.collapsed:
+        return 36.0
+    return 180.0 + (card.movie.id % 7) * 25
+
+
+@pytest.fixture
+def make_list(monkeypatch):
+    monkeypatch.setattr(movie_list_module, "MovieCard", StubCard)
+
+    def make(count: int, movies: list = None) -> MovieList:
+        movie_list = MovieList()
+        movie_list.movies_column.update = lambda: None
+        movie_list.movies = movies or [
+            MovieView(i, i, False, None, f"Фильм {i}", None, 2000, None, False, None, 7.0, None, None, None, None)
+            for i in range(count)
+        ]
+        movie_list._reindex_movies()
+        movie_list.loaded_count = count
+        movie_list._render_window(0, min(count, movie_list.MAX_MOUNTED_CARDS))
+        report_sizes(movie_list)
+        return movie_list
+    return make
+
+
+def report_sizes(movie_list: MovieList):
+    for card in movie_list._mounted_cards():
+        movie_list._on_card_size_change(SimpleNamespace(control=card, height=true_height(card)))
+
+
+def scroll(movie_list: MovieList, pixels: float) -> float:
+    """Deliver a scroll event, then let mounted cards report their size; returns handling time in ms."""
+    start = time.perf_counter()
+    movie_list._on_list_scroll(SimpleNamespace(pixels=pixels, viewport_dimension=VIEWPORT))
+    elapsed = (time.perf_counter() - start) * 1000
+    report_sizes(movie_list)
+    return elapsed
+
+
+def assert_window_covers_viewport(movie_list: MovieList):
+    offsets = movie_list._get_offsets()
+    pixels = movie_list._scroll_pixels
+    assert offsets[movie_list._window_start] <= pixels
+    assert offsets[movie_list._window_end] >= min(pixels + VIEWPORT, offsets[-1])
+    assert movie_list._top_spacer.height == offsets[movie_list._window_start]
+
+
+@pytest.mark.parametrize("count", [100, 500, 2000])
+def test_scroll_through_list(make_list, count, record_property):
+    movie_list = make_list(count)
+    timings = []
+    pixels = 0.0
+    while pixels < movie_list._get_offsets()[-1] - VIEWPORT:
+        pixels += SCROLL_STEP
+        window = movie_list._window_start, movie_list._window_end
+        elapsed = scroll(movie_list, pixels)
+        if (movie_list._window_start, movie_list._window_end) != window:
+            timings.append(elapsed)
+        assert_window_covers_viewport(movie_list)
+        assert len(movie_list._mounted_cards()) <= movie_list.MAX_MOUNTED_CARDS
+
+    # Every card has been mounted once: spacers now use measured heights, not CARD_HEIGHT
+    expected_total = sum(true_height(SimpleNamespace(movie=m, collapsed=False)) for m in movie_list.movies)
+    assert movie_list._get_offsets()[-1] == expected_total
+    median = statistics.median(timings)
+    record_property("window_slide_median_ms", round(median, 3))
+    record_property("window_slide_max_ms", round(max(timings), 3))
+    assert median <= RENDER_BUDGET_MS, (
+        f"{count} items: {len(timings)} window slides, median {median:.3f} ms, max {max(timings):.3f} ms"
+    )
+
+
+def test_collapse_toggle_keeps_top_card_in_place(make_list):
+    movie_list = make_list(500)
+    for pixels in range(0, 30000, SCROLL_STEP):
+        scroll(movie_list, pixels)
+    anchor, fraction = movie_list._scroll_anchor()
+
+    movie_list.toggle_all_collapsed()
+
+    offsets = movie_list._get_offsets()
+    assert movie_list._index_at(movie_list._scroll_pixels) == anchor
+    assert movie_list._scroll_pixels == pytest.approx(
+        offsets[anchor] + fraction * (offsets[anchor + 1] - offsets[anchor])
+    )
+    assert movie_list._window_start <= anchor < movie_list._window_end
+    assert all(card.collapsed for card in movie_list._mounted_cards())
+
+
+def test_card_collapse_state_survives_recycling(make_list):
+    movie_list = make_list(500)
+    card = movie_list._cards_by_movie_id[3]
+    card.collapsed = True
+    movie_list._on_card_collapse_toggle(card)
+    assert movie_list._card_height(3) == movie_list.COLLAPSED_CARD_HEIGHT
+
+    scroll(movie_list, 40000)
+    assert 3 not in movie_list._cards_by_movie_id
+    scroll(movie_list, 0)
+    assert movie_list._cards_by_movie_id[3].collapsed
+    assert movie_list._card_height(3) == 36.0
+
+
+async def _seed_movies(count: int) -> list[int]:
+    """Store count movies with a description preview, poster, genres, a director and actors."""
+    async with get_session() as session:
+        genre_ids = list((await session.execute(select(Genre.id))).scalars())
+        for model, name in ((Director, "Режиссёр"), (Actor, "Актёр")):
+            await session.execute(insert(model), [{"id": i, "tmdb_id": i, "name": f"{name} {i}"} for i in range(1, count + 1)])
+        await session.execute(insert(Movie), [
+            {
+                "id": i, "kinopoisk_id": i, "title": f"Фильм {i}", "title_original": f"Movie {i}", "year": 2000,
+                "description": "Описание фильма. " * 17, "poster_url": f"https://image.tmdb.org/t/p/w500/{i}.jpg",
+                "tmdb_rating": 7.0, "imdb_rating": 7.2,
+            }
+            for i in range(1, count + 1)
+        ])
+        await session.execute(insert(MovieGenre), [
+            {"movie_id": i, "genre_id": genre_ids[(i + k) % len(genre_ids)]}
+            for i in range(1, count + 1) for k in range(GENRES_PER_MOVIE)
+        ])
+        await session.execute(insert(MovieDirector), [{"movie_id": i, "director_id": i} for i in range(1, count + 1)])
+        await session.execute(insert(MovieActor), [
+            {"movie_id": i, "actor_id": (i + k) % count + 1, "order": k}
+            for i in range(1, count + 1) for k in range(ACTORS_PER_MOVIE)
+        ])
+        await session.commit()
+    return list(range(1, count + 1))
+
+
+async def retained_bytes(load) -> tuple:
+    """Run load() and keep its result; returns (result, traced bytes the result still holds)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = await load()
+        gc.collect()
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def test_memory_of_loaded_movies(make_list, run_db, record_property):
+    async def test():
+        movie_ids = await _seed_movies(LOADED_MOVIES)
+
+        async def load_orm():
+            # What the list held before views: detached movies with genre/director/actor lists
+            async with get_session() as session:
+                result = await session.execute(
+                    select(Movie).options(*movie_load_options()).filter(Movie.id.in_(movie_ids))
+                )
+                return list(result.scalars().all())
+
+        async def load_views():
+            async with get_session() as session:
+                return await get_movie_views(session, movie_ids)
+
+        async def build_list():
+            return make_list(LOADED_MOVIES, await load_views())
+
+        orm_movies, orm_bytes = await retained_bytes(load_orm)
+        views, view_bytes = await retained_bytes(load_views)
+        assert len(orm_movies) == len(views) == LOADED_MOVIES
+        movie_list, list_bytes = await retained_bytes(build_list)
+        return movie_list, orm_bytes, view_bytes, list_bytes
+
+    movie_list, orm_bytes, view_bytes, list_bytes = run_db(test)
+    mounted = len(movie_list._mounted_cards())
+    assert mounted <= movie_list.MAX_MOUNTED_CARDS
+
+    mib = 1024 * 1024
+    summary = (
+        f"{LOADED_MOVIES} movies: ORM {orm_bytes / mib:.1f} MiB, views {view_bytes / mib:.1f} MiB; "
+        f"list of views with {mounted} mounted cards {list_bytes / mib:.1f} MiB"
+    )
+    record_property("orm_mib", round(orm_bytes / mib, 1))
+    record_property("views_mib", round(view_bytes / mib, 1))
+    record_property("list_mib", round(list_bytes / mib, 1))
+    assert view_bytes < orm_bytes / 3, summary
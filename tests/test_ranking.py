@@ -0,0 +1,121 @@
+"""Ranking cost on a large library: latency and peak memory of SearchService._sort_by_user_preference."""
+import os
+import statistics
+import time
+import tracemalloc
+
+from sqlalchemy import insert, select
+
+from database import (
+    get_session, get_all_user_ratings, get_movies_by_kp_ids_batch, save_cached_recommendations_batch,
+    PROFILE_FULL, PROFILE_SCORING,
+)
+from database.models import Actor, Director, Genre, Movie, MovieActor, MovieDirector, MovieGenre, MovieText, UserRating
+from services import RecommenderService, SearchService
+
+RATED = int(os.environ.get("MOVIE_PICKER_BENCH_RATINGS", 5000))
+CANDIDATES = 100
+DIRECTORS = 1000
+ACTORS = 5000
+ACTORS_PER_MOVIE = 5
+DESCRIPTION = "Длинное описание фильма. " * 40  # ~1000 characters, as TMDB overviews go
+# Median time to rank the candidates (~1.2 s locally with 5000 ratings)
+SORT_BUDGET_MS = float(os.environ.get("MOVIE_PICKER_SORT_BUDGET_MS", 2500))
+RUNS = 3
+
+
+class StubTMDB:
+    async def get_recommendations_movie(self, tmdb_id: int) -> list[dict]:
+        return []
+
+
+async def _seed_library() -> list[tuple[int, bool]]:
+    """Store RATED rated movies and CANDIDATES unrated ones with people, genres and texts; returns candidate keys."""
+    total = RATED + CANDIDATES
+    async with get_session() as session:
+        genre_ids = list((await session.execute(select(Genre.id))).scalars())
+        await session.execute(insert(Director), [
+            {"id": i, "tmdb_id": i, "name": f"Режиссёр {i}", "avg_rating": 5 + i % 5} for i in range(1, DIRECTORS + 1)
+        ])
+        await session.execute(insert(Actor), [
+            {"id": i, "tmdb_id": i, "name": f"Актёр {i}", "avg_rating": 4 + i % 6} for i in range(1, ACTORS + 1)
+        ])
+        await session.execute(insert(Movie), [
+            {
+                "id": i, "kinopoisk_id": i, "title": f"Фильм {i}", "title_original": f"Movie {i}", "year": 1950 + i % 70,
+                "description": DESCRIPTION[:300], "description_truncated": True,
+                "poster_url": f"https://image.tmdb.org/t/p/w500/poster{i}.jpg",
+                "tmdb_rating": 5 + i % 50 / 10, "imdb_rating": 5 + i % 40 / 10, "search_tokens": DESCRIPTION.lower(),
+            }
+            for i in range(1, total + 1)
+        ])
+        await session.execute(insert(MovieText), [{"movie_id": i, "description": DESCRIPTION} for i in range(1, total + 1)])
+        await session.execute(insert(MovieGenre), [
+            {"movie_id": i, "genre_id": genre_ids[(i + k) % len(genre_ids)]} for i in range(1, total + 1) for k in (0, 7)
+        ])
+        await session.execute(insert(MovieDirector), [
+            {"movie_id": i, "director_id": i % DIRECTORS + 1} for i in range(1, total + 1)
+        ])
+        await session.execute(insert(MovieActor), [
+            {"movie_id": i, "actor_id": (i * ACTORS_PER_MOVIE + k) % ACTORS + 1, "order": k}
+            for i in range(1, total + 1) for k in range(ACTORS_PER_MOVIE)
+        ])
+        await session.execute(insert(UserRating), [
+            {"movie_id": i, "rating": 1 + i % 10} for i in range(1, RATED + 1)
+        ])
+        await session.commit()
+
+        candidate_ids = list(range(RATED + 1, total + 1))
+        await save_cached_recommendations_batch(session, {
+            (i, False): candidate_ids[i % CANDIDATES:][:20] for i in range(1, RATED + 1)
+        })
+    return [(i, False) for i in candidate_ids]
+
+
+async def _peak_bytes(coro) -> int:
+    tracemalloc.start()
+    try:
+        await coro
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+async def _load_ratings(profile: str):
+    async with get_session() as session:
+        return await get_all_user_ratings(session, profile)
+
+
+def test_sort_by_user_preference_on_large_library(run_db, record_property):
+    async def test():
+        keys = await _seed_library()
+        async with get_session() as session:
+            candidates = list((await get_movies_by_kp_ids_batch(session, keys)).values())
+        tmdb = StubTMDB()
+        service = SearchService(tmdb, None, None, None, RecommenderService(tmdb))
+
+        ranked = await service._sort_by_user_preference(candidates)  # Warm-up (recommendation memory tier)
+        assert sorted(m.id for m in ranked) == sorted(m.id for m in candidates)
+
+        timings = []
+        for _ in range(RUNS):
+            start = time.perf_counter()
+            await service._sort_by_user_preference(candidates)
+            timings.append((time.perf_counter() - start) * 1000)
+        sort_peak = await _peak_bytes(service._sort_by_user_preference(candidates))
+        # Ratings as ranking loads them vs with full cards (descriptions, posters, people)
+        scoring_peak = await _peak_bytes(_load_ratings(PROFILE_SCORING))
+        full_peak = await _peak_bytes(_load_ratings(PROFILE_FULL))
+        return statistics.median(timings), sort_peak, scoring_peak, full_peak
+
+    median, sort_peak, scoring_peak, full_peak = run_db(test)
+    mib = 1024 * 1024
+    summary = (
+        f"{CANDIDATES} candidates, {RATED} ratings: median {median:.0f} ms, peak {sort_peak / mib:.1f} MiB; "
+        f"loading ratings peak {scoring_peak / mib:.1f} MiB (scoring) vs {full_peak / mib:.1f} MiB (full)"
+    )
+    record_property("sort_median_ms", round(median))
+    record_property("sort_peak_mib", round(sort_peak / mib, 1))
+    record_property("ratings_peak_mib", {"scoring": round(scoring_peak / mib, 1), "full": round(full_peak / mib, 1)})
+    assert median <= SORT_BUDGET_MS, summary
+    assert scoring_peak < full_peak / 2, summary
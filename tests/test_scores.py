@@ -0,0 +1,158 @@
+from database import (
+    get_session, save_movie, save_user_rating, update_entity_ratings_for_movies,
+    save_cached_recommendations_batch, get_personal_scores, get_movie_ids_by_kp_ids,
+)
+from services import PersonalScores, RecommenderService, SearchService
+
+# (kinopoisk_id, is_tv) -> (title, genres, director)
+LIBRARY = {
+    (1, False): ("Оценённый", "драма", "Режиссёр А"),
+    (2, False): ("Та же драма", "драма", "Режиссёр Б"),
+    (3, False): ("Тот же режиссёр", "вестерн", "Режиссёр А"),
+    (4, False): ("Ничего общего", "комедия", "Режиссёр В"),
+    (5, False): ("Оценён раньше", "мелодрама", "Режиссёр Г"),
+    (10, False): ("Рекомендация", "ужасы", "Режиссёр Д"),
+    (10, True): ("Сериал с тем же номером", "ужасы", "Режиссёр Е"),
+}
+
+
+class StubTMDB:
+    """TMDB client for the magic button: one unseen recommendation, or offline."""
+
+    def __init__(self, offline: bool = False):
+        self.offline = offline
+
+    async def get_recommendations_movie(self, tmdb_id: int) -> list[dict]:
+        if self.offline:
+            raise ConnectionError("offline")
+        return []
+
+    async def get_full_movie_info(self, movie_id: int) -> dict:
+        if self.offline:
+            raise ConnectionError("offline")
+        return {
+            "kinopoisk_id": movie_id, "is_tv": False, "title": "Новая рекомендация", "genres": "драма",
+            "tmdb_rating": 8.0, "directors": [], "actors": [],
+        }
+
+
+async def _save_library() -> dict[tuple[int, bool], int]:
+    ids = {}
+    async with get_session() as session:
+        for i, ((kp_id, is_tv), (title, genres, director)) in enumerate(LIBRARY.items()):
+            movie = await save_movie(session, {
+                "kinopoisk_id": kp_id, "is_tv": is_tv, "title": title, "genres": genres, "tmdb_rating": 6.0,
+                "directors": [{"tmdb_id": hash(director) % 10000, "name": director}], "actors": [],
+            })
+            ids[kp_id, is_tv] = movie.id
+        await save_cached_recommendations_batch(session, {(1, False): [10, 20]})
+    return ids
+
+
+async def _rate(movie_id: int, rating: int):
+    async with get_session() as session:
+        await save_user_rating(session, movie_id, rating, auto_commit=False)
+        await update_entity_ratings_for_movies(session, [movie_id])
+
+
+async def _all_scores(ids: dict) -> dict[int, float]:
+    async with get_session() as session:
+        return await get_personal_scores(session, list(ids.values()))
+
+
+def test_movie_ids_by_kp_ids_respect_media_type(run_db):
+    async def test():
+        ids = await _save_library()
+        async with get_session() as session:
+            assert await get_movie_ids_by_kp_ids(session, [(10, False)]) == {ids[10, False]}
+            assert await get_movie_ids_by_kp_ids(session, [(10, True), (1, False)]) == {ids[10, True], ids[1, False]}
+            assert await get_movie_ids_by_kp_ids(session, [(1, True)]) == set()
+
+    run_db(test)
+
+
+def test_rating_rescores_only_affected_movies(run_db):
+    async def test():
+        ids = await _save_library()
+        scores = PersonalScores(RecommenderService(StubTMDB()))
+        await _rate(ids[5, False], 7)
+        await scores.rebuild()
+        before = await _all_scores(ids)
+
+        rescored = []
+        rescore = scores._rescore
+
+        async def record_rescore(movie_ids):
+            rescored.extend(movie_ids)
+            await rescore(movie_ids)
+
+        scores._rescore = record_rescore
+        await _rate(ids[1, False], 9)
+        assert scores._rated_movie_ids == {ids[1, False]}  # Notified by update_entity_ratings_for_movies
+        await scores.update()
+
+        # The rated movie, shared genre, shared director, and the title it recommends (not the TV show)
+        assert set(rescored) == {ids[1, False], ids[2, False], ids[3, False], ids[10, False]}
+        incremental = await _all_scores(ids)
+        assert incremental[ids[10, False]] > before[ids[10, False]]
+        assert incremental[ids[4, False]] == before[ids[4, False]]
+        assert incremental[ids[10, True]] == before[ids[10, True]]
+
+        # Same table as a full rebuild
+        await PersonalScores(RecommenderService(StubTMDB())).rebuild()
+        assert await _all_scores(ids) == incremental
+
+    run_db(test)
+
+
+def test_first_rating_rebuilds_everything(run_db):
+    async def test():
+        ids = await _save_library()
+        scores = PersonalScores(RecommenderService(StubTMDB()))
+        await scores.rebuild()
+        await _rate(ids[1, False], 9)
+        assert await scores._affected_movie_ids({ids[1, False]}) is None
+
+    run_db(test)
+
+
+def test_magic_answers_from_stored_scores_and_refreshes_in_background(run_db):
+    async def test():
+        ids = await _save_library()
+        tmdb = StubTMDB(offline=True)
+        recommender = RecommenderService(tmdb)
+        scores = PersonalScores(recommender)
+        search = SearchService(tmdb, None, None, None, recommender, personal_scores=scores)
+        await _rate(ids[1, False], 9)
+        await scores.rebuild()
+
+        # Offline: the best stored movie is offered, the background load fails quietly
+        magic = await search.find_magic_recommendation()
+        assert (magic.kinopoisk_id, magic.is_tv) == (10, False)
+        await search._magic_refresh
+
+        # Online: still answered from the table; the new recommendation is stored meanwhile
+        tmdb.offline = False
+        magic = await search.find_magic_recommendation()
+        assert (magic.kinopoisk_id, magic.is_tv) == (10, False)
+        await search._magic_refresh
+        assert scores._dirty_movie_ids  # Saved candidate, scored on the next update
+
+        # Recommended by the rated movie and of its genre, so it wins the next click
+        await scores.update()
+        magic = await search.find_magic_recommendation()
+        assert (magic.kinopoisk_id, magic.title) == (20, "Новая рекомендация")
+
+    run_db(test)
+
+
+def test_magic_without_stored_scores_loads_recommendations(run_db):
+    async def test():
+        ids = await _save_library()
+        search = SearchService(StubTMDB(), None, None, None, RecommenderService(StubTMDB()))
+        await _rate(ids[1, False], 9)
+        magic = await search.find_magic_recommendation()
+        assert (magic.kinopoisk_id, magic.title) == (20, "Новая рекомендация")
+        assert search._magic_refresh is None
+
+    run_db(test)
@@ -0,0 +1,199 @@
+import asyncio
+
+import httpx
+import pytest
+
+import database.db as db
+from api import KinopoiskAPI, MDBListAPI, OMDBAPI
+from database import get_session, get_movies_by_kp_ids_batch, save_movie
+from services import RecommenderService, SearchService
+
+NETWORK_DELAY = 0.02
+
+
+class ConnectionProbe:
+    """Records how many pooled connections are checked out whenever a stub API call is in flight."""
+
+    def __init__(self):
+        self.checked_out: list[int] = []
+
+    async def network(self):
+        self.checked_out.append(db._engine.pool.checkedout())
+        await asyncio.sleep(NETWORK_DELAY)
+        self.checked_out.append(db._engine.pool.checkedout())
+
+
+class StubTMDB:
+    def __init__(self, probe: ConnectionProbe):
+        self.probe = probe
+
+    async def get_full_movie_info(self, movie_id: int) -> dict:
+        await self.probe.network()
+        return {
+            "kinopoisk_id": movie_id,
+            "is_tv": False,
+            "title": f"Фильм {movie_id}",
+            "title_original": f"Movie {movie_id}",
+            "year": 2001,
+            "genres": "драма",
+            "imdb_id": f"tt{movie_id:07d}",
+            "description": "Описание",
+            "directors": [{"tmdb_id": 1000 + movie_id, "name": f"Режиссёр {movie_id}"}],
+            "actors": [],
+        }
+
+
+class StubMDBList:
+    def __init__(self, probe: ConnectionProbe, unrated: frozenset = frozenset(), failing: frozenset = frozenset()):
+        self.probe = probe
+        self.unrated = unrated  # TMDB IDs without ratings
+        self.failing = failing  # TMDB IDs whose lookup fails
+        self.calls = 0
+
+    async def get_ratings_by_tmdb_id(self, tmdb_id: int, is_tv: bool = False) -> dict:
+        self.calls += 1
+        await self.probe.network()
+        if tmdb_id in self.failing:
+            raise httpx.ConnectError("connection refused")
+        if tmdb_id in self.unrated:
+            return {}
+        return {"imdb": 7.5, "rotten_tomatoes": 90, "metacritic": None}
+
+
+def make_service(probe: ConnectionProbe, unrated: frozenset = frozenset()) -> SearchService:
+    tmdb = StubTMDB(probe)
+    return SearchService(tmdb, None, None, StubMDBList(probe, unrated), RecommenderService(tmdb))
+
+
+def test_load_movies_parallel_holds_no_connection_during_fetch(run_db):
+    probe = ConnectionProbe()
+
+    async def test():
+        service = make_service(probe)
+        movies = await service._load_movies_parallel([{"kinopoisk_id": i, "is_tv": False} for i in range(1, 6)])
+        assert sorted(m.kinopoisk_id for m in movies) == [1, 2, 3, 4, 5]
+        assert all(m.imdb_rating == 7.5 for m in movies)
+
+    run_db(test)
+    assert len(probe.checked_out) == 20  # TMDB and MDBList call per movie, probed before and after
+    assert set(probe.checked_out) == {0}
+
+
+def test_fetch_missing_ratings_holds_no_connection_during_lookups(run_db):
+    probe = ConnectionProbe()
+
+    async def test():
+        service = make_service(probe)
+        keys = [(i, False) for i in range(1, 6)]
+        async with get_session() as session:
+            for kp_id, _ in keys:
+                await save_movie(session, {"kinopoisk_id": kp_id, "title": f"Фильм {kp_id}"})
+            movies = list((await get_movies_by_kp_ids_batch(session, keys)).values())
+
+            updated = []
+            await service.fetch_missing_ratings(session, movies, on_movie_updated=updated.append)
+
+        assert sorted(view.kinopoisk_id for view in updated) == [1, 2, 3, 4, 5]
+        async with get_session() as session:
+            stored = await get_movies_by_kp_ids_batch(session, keys)
+            assert all(m.imdb_rating == 7.5 and m.external_status == "ok" for m in stored.values())
+
+    run_db(test)
+    assert len(probe.checked_out) == 10
+    assert set(probe.checked_out) == {0}
+
+
+def test_loaded_movies_record_ratings_attempts(run_db):
+    probe = ConnectionProbe()
+
+    async def test():
+        service = make_service(probe, unrated=frozenset({2}))
+        await service._load_movies_parallel([{"kinopoisk_id": i, "is_tv": False} for i in (1, 2)])
+        assert service.mdblist_api.calls == 2
+
+        keys = [(1, False), (2, False)]
+        async with get_session() as session:
+            stored = await get_movies_by_kp_ids_batch(session, keys)
+            found, unrated = stored[1, False], stored[2, False]
+            now = found.external_checked_at
+            assert (found.external_status, found.external_attempts) == ("ok", 0)
+            assert found.external_next_retry_at == now + service.RATINGS_REFRESH_AGE
+            assert (unrated.external_status, unrated.external_attempts) == ("missing", 1)
+            assert unrated.external_next_retry_at == unrated.external_checked_at + service.RATINGS_RETRY_BASE
+            assert not service._ratings_due(found, "external", now)
+            assert not service._ratings_due(unrated, "external", now)
+
+            # The streaming fetch right after the search doesn't look them up again
+            await service.fetch_missing_ratings(session, [found, unrated])
+        assert service.mdblist_api.calls == 2
+
+    run_db(test)
+
+
+class StubKinopoisk:
+    async def search_by_keyword(self, keyword: str, page: int = 1) -> list[dict]:
+        raise httpx.ReadTimeout("timed out")
+
+
+def test_failed_lookups_are_retried_sooner_than_misses(run_db):
+    probe = ConnectionProbe()
+
+    async def test():
+        tmdb = StubTMDB(probe)
+        service = SearchService(
+            tmdb, None, StubKinopoisk(), StubMDBList(probe, unrated=frozenset({1}), failing=frozenset({2})),
+            RecommenderService(tmdb),
+        )
+        keys = [(1, False), (2, False)]
+        async with get_session() as session:
+            for kp_id, _ in keys:
+                await save_movie(session, {"kinopoisk_id": kp_id, "title": f"Фильм {kp_id}"})
+            movies = list((await get_movies_by_kp_ids_batch(session, keys)).values())
+            await service.fetch_missing_ratings(session, movies)
+
+        async with get_session() as session:
+            stored = await get_movies_by_kp_ids_batch(session, keys)
+        missing, failed = stored[1, False], stored[2, False]
+        assert (missing.external_status, failed.external_status) == ("missing", "error")
+        assert missing.external_next_retry_at == missing.external_checked_at + service.RATINGS_RETRY_BASE
+        assert failed.external_next_retry_at == failed.external_checked_at + service.RATINGS_ERROR_RETRY_BASE
+        assert {m.kp_status for m in stored.values()} == {"error"}
+
+    run_db(test)
+
+
+def _mock_client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_ratings_clients_raise_on_failed_requests():
+    def mdblist(request):
+        return httpx.Response(404 if request.url.path.endswith("/movie/1") else 500)
+
+    def omdb(request):
+        if request.url.params["i"] == "tt0000001":
+            return httpx.Response(200, json={"Response": "False", "Error": "Incorrect IMDb ID."})
+        raise httpx.ConnectError("connection refused")
+
+    def kinopoisk(request):
+        if request.url.params["keyword"] == "нет такого":
+            return httpx.Response(404)
+        return httpx.Response(503)
+
+    async def test():
+        mdblist_api, omdb_api, kp_api = MDBListAPI("key"), OMDBAPI("key"), KinopoiskAPI("key")
+        mdblist_api._client = _mock_client(mdblist)
+        omdb_api._client = _mock_client(omdb)
+        kp_api._client = _mock_client(kinopoisk)
+
+        assert await mdblist_api.get_ratings_by_tmdb_id(1) == {}
+        with pytest.raises(httpx.HTTPStatusError):
+            await mdblist_api.get_ratings_by_tmdb_id(2)
+        assert await omdb_api.get_ratings_by_imdb_id("tt0000001") == {}
+        with pytest.raises(httpx.ConnectError):
+            await omdb_api.get_ratings_by_imdb_id("tt0000002")
+        assert await kp_api.search_by_keyword("нет такого") == []
+        with pytest.raises(httpx.HTTPStatusError):
+            await kp_api.search_by_keyword("Матрица")
+
+    asyncio.run(test())
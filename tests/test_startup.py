@@ -0,0 +1,78 @@
+"""Startup budget: the window module graph must not pull in the backend (see ui.app._import_backend)."""
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("flet")
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Imported in a worker thread after the first frame, never by main/ui at import time
+BACKEND_MODULES = ("sqlalchemy", "aiosqlite", "httpx", "api", "database", "services")
+# Median cumulative import time of main (~450 ms locally, ~850 ms before the backend was deferred)
+IMPORT_BUDGET_MS = float(os.environ.get("MOVIE_PICKER_IMPORT_BUDGET_MS", 800))
+RUNS = 3
+
+
+def _import_times(module: str) -> dict[str, int]:
+    """Cumulative import time in microseconds per module, from a fresh interpreter (-X importtime)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_main_does_not_import_backend():
+    times = _import_times("main")
+    loaded = sorted(name for name in times if name.split(".")[0] in BACKEND_MODULES)
+    assert loaded == []
+
+
+def test_main_import_time_budget(record_property):
+    runs = [_import_times("main")["main"] / 1000 for _ in range(RUNS)]
+    median = statistics.median(runs)
+    record_property("import_main_ms", round(median))
+    assert median <= IMPORT_BUDGET_MS, (
+        f"import main: {median:.0f} ms (runs: {', '.join(f'{ms:.0f}' for ms in runs)}), budget {IMPORT_BUDGET_MS:.0f} ms"
+    )
+
+
+def test_handlers_report_failed_backend(tmp_path, monkeypatch):
+    import ui.app as app_module
+
+    def broken_import():
+        raise ImportError("no module named 'sqlalchemy'")
+
+    class MessageList:
+        message = None
+
+        def set_message(self, message):
+            self.message = message
+
+    monkeypatch.setattr(app_module, "_import_backend", broken_import)
+    app = app_module.MoviePickerApp("key", db_path=str(tmp_path / "movie_picker.db"))
+    app.movie_list = MessageList()
+
+    async def test():
+        await app._init_backend()
+        with pytest.raises(RuntimeError, match="sqlalchemy"):
+            await app._wait_for_backend()
+        with pytest.raises(RuntimeError, match="sqlalchemy"):
+            async with app._db_session():
+                pass
+
+    asyncio.run(test())
+    assert "sqlalchemy" in app.movie_list.message
@@ -0,0 +1,92 @@
+import asyncio
+
+from database import get_session, save_movie, get_user_rating, get_wishlist_movie_ids, create_tag, get_movie_tags
+from services import writes
+from services.writes import WriteQueue
+
+
+async def _save_movies(count: int) -> list[int]:
+    async with get_session() as session:
+        movies = [await save_movie(session, {"kinopoisk_id": i, "title": f"Фильм {i}"}) for i in range(1, count + 1)]
+        return [movie.id for movie in movies]
+
+
+def test_edits_are_coalesced(run_db):
+    async def test():
+        movie_id, other_id = await _save_movies(2)
+        async with get_session() as session:
+            tag = await create_tag(session, "вечер")
+        queue = WriteQueue()
+        queue.set_rating(movie_id, 5, "отзыв")
+        queue.set_rating(movie_id, 7)  # Keeps the queued review
+        queue.set_rating(movie_id, 8)
+        queue.set_wishlist(other_id, True)
+        queue.set_wishlist(other_id, False)
+        queue.set_tags(other_id, [tag.id])
+        assert queue.pending_count == 3
+
+        await queue.flush()
+
+        assert queue.pending_count == 0
+        assert queue.stats.as_dict() == {"queued": 6, "coalesced": 3, "written": 3, "failed": 0, "batches": 1}
+        async with get_session() as session:
+            rating = await get_user_rating(session, movie_id)
+            assert (rating.rating, rating.review) == (8, "отзыв")
+            assert await get_wishlist_movie_ids(session) == set()
+            assert [t.name for t in await get_movie_tags(session, other_id)] == ["вечер"]
+
+    run_db(test)
+
+
+def test_run_writes_after_debounce_and_flush_writes_now(run_db):
+    async def test():
+        movie_id, other_id = await _save_movies(2)
+        queue = WriteQueue()
+        queue.DEBOUNCE = 0.05
+        shutdown = asyncio.Event()
+        runner = asyncio.create_task(queue.run(shutdown))
+        try:
+            queue.set_rating(movie_id, 6)
+            await asyncio.sleep(0)
+            async with get_session() as session:
+                assert await get_user_rating(session, movie_id) is None  # Still debounced
+
+            await asyncio.sleep(0.2)
+            async with get_session() as session:
+                assert (await get_user_rating(session, movie_id)).rating == 6
+
+            # A read that flushes first sees the edit before the debounce delay
+            queue.DEBOUNCE = 10
+            queue.set_wishlist(other_id, True)
+            await queue.flush()
+            async with get_session() as session:
+                assert await get_wishlist_movie_ids(session) == {other_id}
+            assert queue.stats.batches == 2
+        finally:
+            shutdown.set()
+            await runner
+
+    run_db(test)
+
+
+def test_failed_batch_calls_on_error(run_db, monkeypatch):
+    async def failing_apply(session, edits):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(writes, "apply_user_edits", failing_apply)
+    reverted = []
+
+    async def test():
+        queue = WriteQueue()
+        queue.set_rating(1, 5, on_error=lambda: reverted.append("rating 5"))
+        queue.set_rating(1, 9, on_error=lambda: reverted.append("rating 9"))
+        queue.set_wishlist(2, True, on_error=lambda: reverted.append("wishlist"))
+        queue.set_tags(3, [1])  # No callback
+        await queue.flush()
+        assert queue.pending_count == 0
+        assert queue.stats.failed == 3
+        assert queue.stats.written == 0
+
+    run_db(test)
+    # The replaced edit's callback is not called: the UI shows the newest edit
+    assert reverted == ["rating 9", "wishlist"]
@@ -1,22 +1,20 @@
+from __future__ import annotations
+
 import os
 import sys
 import asyncio
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Optional
 
 import flet as ft
 
-from api import TMDBAPI, OMDBAPI, KinopoiskAPI, MDBListAPI
-from database import (
-    init_db, close_db, get_session, save_user_rating, delete_user_rating,
-    update_entity_ratings_for_movie, get_all_user_ratings_filtered, get_user_rating,
-    get_user_ratings_batch,
-    is_in_wishlist, add_to_wishlist, remove_from_wishlist, get_wishlist, get_wishlist_movie_ids,
-    get_all_tags, create_tag, rename_tag, delete_tag, set_movie_tags, get_movie_tags,
-)
-from database.models import Movie, UserRating
-from services import SearchService, RecommenderService
 from ui.theme import COLORS, get_dark_theme
-from ui.components import SearchBar, MovieList
+from ui.components import SearchBar, MovieList, MovieCard
 from ui.components.rating_dialog import show_rating_dialog
+from ui.tasks import TaskSupervisor
+
+if TYPE_CHECKING:
+    from database.views import MovieView, RatingView
 
 # Global flag to signal background tasks to stop
 _shutdown_event = asyncio.Event()
@@ -27,6 +25,13 @@ def is_shutting_down() -> bool:
     return _shutdown_event.is_set()
 
 
+def _import_backend():
+    """Import SQLAlchemy, httpx, API clients and services (slow, runs in a worker thread)."""
+    import api  # noqa: F401
+    import database  # noqa: F401
+    import services  # noqa: F401
+
+
 class MoviePickerApp:
     """Main application class."""
 
@@ -40,11 +45,16 @@ class MoviePickerApp:
         ("date_asc", ft.Icons.SCHEDULE, ft.Icons.ARROW_UPWARD),
     ]
 
+    # Task supervisor views: new work for a view cancels its in-flight tasks
+    VIEW_RESULTS = "results"  # Everything that fills the movie list
+    VIEW_DIALOG = "dialog"  # Data loading for a dialog about to open
+
     def __init__(self, tmdb_api_key: str, omdb_api_key: str = None, kp_api_key: str = None, mdblist_api_key: str = None, db_path: str = "movie_picker.db"):
         self.db_path = db_path
         self.page: ft.Page = None
         self.search_bar: SearchBar = None
         self.movie_list: MovieList = None
+        self.tasks: TaskSupervisor = None
         self.is_ratings_mode = False
         self.is_wishlist_mode = False
         self.is_stats_mode = False
@@ -58,16 +68,31 @@ class MoviePickerApp:
         self._search_genres: list[int] = []
         self._search_next_page: int = 4  # first search loads pages 1-3
 
-        self.tmdb_api = TMDBAPI(tmdb_api_key)
-        self.mdblist_api = MDBListAPI(mdblist_api_key) if mdblist_api_key else None
-        self.omdb_api = OMDBAPI(omdb_api_key) if omdb_api_key else None
-        self.kp_api = KinopoiskAPI(kp_api_key) if kp_api_key else None
-        self.recommender = RecommenderService(self.tmdb_api)
-        self.search_service = SearchService(self.tmdb_api, self.omdb_api, self.kp_api, self.mdblist_api, self.recommender)
+        # API clients and services are created in _init_backend after the first frame
+        self._api_keys = {
+            "tmdb": tmdb_api_key,
+            "omdb": omdb_api_key,
+            "kp": kp_api_key,
+            "mdblist": mdblist_api_key,
+        }
+        self.tmdb_api = None
+        self.mdblist_api = None
+        self.omdb_api = None
+        self.kp_api = None
+        self.recommender = None
+        self.search_service = None
+        self.job_queue = None
+        self.writes = None
+        self.suggestion_index = None
+        self.maintenance = None
+        self.personal_scores = None
+        self._backend_ready = asyncio.Event()
+        self._backend_error: Optional[Exception] = None  # Set when _init_backend failed
 
     async def build(self, page: ft.Page):
         """Build the application UI."""
         self.page = page
+        self.tasks = TaskSupervisor(page)
         page.title = "Movie Picker"
         page.theme = get_dark_theme()
         page.theme_mode = ft.ThemeMode.DARK
@@ -75,36 +100,43 @@ class MoviePickerApp:
         page.padding = 20
         page.window.width = 900
         page.window.height = 700
-        
-        # Initialize database
-        await init_db(self.db_path)
 
-        # Load tags cache
-        await self._refresh_tags_cache()
 
         # Handle window close gracefully
         async def on_window_event(e):
             if e.data == "close":
                 _shutdown_event.set()  # Signal background tasks to stop
+                self.tasks.cancel_all()
                 
                 # Give background tasks a moment to see the shutdown flag
                 await asyncio.sleep(0.2)
+
+                # Write edits still waiting in the write queue
+                if self.writes:
+                    await self.writes.flush()
+
+                # Let job workers finish their current batch (queued jobs stay in the DB)
+                if self.job_queue:
+                    await self.job_queue.drain()
                 
                 # Close API clients
                 try:
-                    await self.tmdb_api.close()
+                    if self.tmdb_api:
+                        await self.tmdb_api.close()
                     if self.omdb_api:
                         await self.omdb_api.close()
                     if self.kp_api:
                         await self.kp_api.close()
                     if self.mdblist_api:
                         await self.mdblist_api.close()
-                    await self.search_service.close()
+                    if self.search_service:
+                        await self.search_service.close()
                 except Exception:
                     pass
                 
                 # Close database connections
                 try:
+                    from database import close_db
                     await close_db()
                 except Exception:
                     pass
@@ -125,6 +157,7 @@ class MoviePickerApp:
             on_manage_tags=self._handle_manage_tags,
             on_rating_filter=self._handle_rating_filter,
             on_stats=self._handle_stats,
+            on_suggest=self._handle_suggest,
         )
 
         self.movie_list = MovieList(
@@ -135,6 +168,7 @@ class MoviePickerApp:
             on_wishlist_toggle=self._handle_wishlist_toggle,
             on_person_click=self._handle_person_click,
             on_tags_click=self._handle_tags_click,
+            on_description_expand=self._handle_description_expand,
             on_fetch_more=self._handle_fetch_more,
         )
 
@@ -149,6 +183,104 @@ class MoviePickerApp:
             )
         )
 
+        # Window is painted; import and initialize the backend in background
+        page.run_task(self._init_backend)
+
+    async def _init_backend(self):
+        """Import backend modules, create API clients and open the database."""
+        try:
+            await asyncio.to_thread(_import_backend)
+
+            from api import TMDBAPI, OMDBAPI, KinopoiskAPI, MDBListAPI
+            from database import init_db
+            from services import (
+                SearchService, RecommenderService, JobQueue, PersonIndex, SuggestionIndex, MaintenanceService,
+                WriteQueue, PersonalScores,
+            )
+
+            keys = self._api_keys
+            self.tmdb_api = TMDBAPI(keys["tmdb"])
+            self.mdblist_api = MDBListAPI(keys["mdblist"]) if keys["mdblist"] else None
+            self.omdb_api = OMDBAPI(keys["omdb"]) if keys["omdb"] else None
+            self.kp_api = KinopoiskAPI(keys["kp"]) if keys["kp"] else None
+            self.job_queue = JobQueue()
+            self.writes = WriteQueue()
+            self.recommender = RecommenderService(self.tmdb_api, job_queue=self.job_queue)
+            self.personal_scores = PersonalScores(self.recommender)
+            person_index = PersonIndex(self.tmdb_api)
+            self.search_service = SearchService(
+                self.tmdb_api, self.omdb_api, self.kp_api, self.mdblist_api, self.recommender,
+                job_queue=self.job_queue,
+                person_index=person_index,
+                personal_scores=self.personal_scores,
+            )
+            self.suggestion_index = SuggestionIndex()
+            self.maintenance = MaintenanceService(
+                suggestion_index=self.suggestion_index,
+                person_index=person_index,
+                search_service=self.search_service,
+            )
+
+            await init_db(self.db_path)
+        except Exception as e:
+            self._backend_error = e
+            if not is_shutting_down():
+                self.movie_list.set_message(f"Ошибка при инициализации: {str(e)}")
+            return
+        finally:
+            # Unblock waiting handlers even on failure (_wait_for_backend raises the error)
+            self._backend_ready.set()
+
+        # Load tags cache
+        await self._refresh_tags_cache()
+
+        # Type-ahead index of local titles and people
+        self.page.run_task(self._build_suggestion_index)
+
+        # Warm recommendation memory cache, then renew expiring entries in background
+        self.page.run_task(self._warm_recommendation_cache)
+        self.page.run_task(self.recommender.run_background_refresher, _shutdown_event)
+        # Process queued background jobs (M2M saves, ratings, recommendation refresh)
+        self.page.run_task(self.job_queue.run, _shutdown_event)
+        # Write rating/wishlist/tag edits in debounced batches
+        self.page.run_task(self.writes.run, _shutdown_event)
+        # Prune movies not shown for a long time, compact the DB (delayed, then daily)
+        self.page.run_task(self.maintenance.run, _shutdown_event)
+        # Keep personal scores of stored movies fresh (ranked browsing, magic button)
+        self.page.run_task(self.personal_scores.run, _shutdown_event)
+
+    async def _build_suggestion_index(self):
+        try:
+            await self.suggestion_index.build()
+        except Exception:
+            pass
+
+    def _handle_suggest(self, query: str) -> list:
+        """Type-ahead suggestions (empty until the index is built)."""
+        if self.suggestion_index is None or not self.suggestion_index.is_ready:
+            return []
+        return self.suggestion_index.suggest(query)
+
+    async def _wait_for_backend(self):
+        """Wait for background backend initialization; raise if it failed."""
+        await self._backend_ready.wait()
+        if self._backend_error is not None:
+            raise RuntimeError(f"не удалось запустить приложение ({self._backend_error})") from self._backend_error
+
+    async def _wait_for_data(self):
+        """Wait for the backend and write queued user edits, so reads see them."""
+        await self._wait_for_backend()
+        if self.writes:
+            await self.writes.flush()
+
+    @asynccontextmanager
+    async def _db_session(self):
+        """Database session that waits for the backend and for queued user edits (see _wait_for_data)."""
+        await self._wait_for_data()
+        from database import get_session
+        async with get_session() as session:
+            yield session
+
     def _handle_search(self, query: str, genres: list[int] = None):
         """Handle search button click."""
         self._exit_ratings_mode()
@@ -165,32 +297,36 @@ class MoviePickerApp:
             if is_shutting_down():
                 return
             try:
-                async with get_session() as session:
-                    if is_shutting_down():
-                        return
-                    # Load movies quickly without external ratings
-                    movies = await self.search_service.search_movies(session, query, genres=genres or [], skip_ratings=True)
+                await self._wait_for_data()
+                if is_shutting_down():
+                    return
+                # Load movies quickly without external ratings
+                movies = await self.search_service.search_movies(query, genres=genres or [], skip_ratings=True)
+                if not movies and genres and not query.strip():
+                    # Genre browsing without TMDB (offline): best scored movies of the local library
+                    movies = await self.search_service.browse_library(genres)
+                    self.movie_list.on_fetch_more = None
 
-                    if is_shutting_down():
-                        return
-                    if movies:
-                        ratings = await self._get_ratings_for_movies(movies)
-                        wishlist_ids = await get_wishlist_movie_ids(session)
-                        # Show movies with loading indicators for ratings
-                        self.movie_list.set_movies(movies, ratings, wishlist_ids, ratings_loading=True)
-
-                        # Load missing ratings in background
-                        movies_to_load = movies  # Capture for closure
-                        async def load_ratings():
-                            await self._load_ratings_background(movies_to_load)
-                        self.page.run_task(load_ratings)
-                    else:
-                        self.movie_list.set_message("По вашему запросу ничего не найдено")
+                if is_shutting_down():
+                    return
+                if movies:
+                    ratings = await self._get_ratings_for_movies(movies)
+                    wishlist_ids = await self._get_wishlist_ids()
+                    # Show movies with loading indicators for ratings
+                    self.movie_list.set_movies(movies, ratings, wishlist_ids, ratings_loading=True)
+
+                    # Load missing ratings in background
+                    movies_to_load = movies  # Capture for closure
+                    async def load_ratings():
+                        await self._load_ratings_background(movies_to_load)
+                    self.tasks.spawn(self.VIEW_RESULTS, load_ratings)
+                else:
+                    self.movie_list.set_message("По вашему запросу ничего не найдено")
             except Exception as e:
                 if not is_shutting_down():
                     self.movie_list.set_message(f"Ошибка при поиске: {str(e)}")
 
-        self.page.run_task(do_search)
+        self.tasks.start(self.VIEW_RESULTS, do_search)
 
     def _handle_fetch_more(self):
         """Handle 'load more' when all local results are shown — fetch next API pages."""
@@ -198,37 +334,36 @@ class MoviePickerApp:
             if is_shutting_down():
                 return
             try:
-                async with get_session() as session:
-                    movies = await self.search_service.search_movies(
-                        session,
-                        self._search_query,
-                        genres=self._search_genres,
-                        skip_ratings=True,
-                        start_page=self._search_next_page,
-                        num_pages=3,
-                    )
-                    self._search_next_page += 3
+                await self._wait_for_data()
+                movies = await self.search_service.search_movies(
+                    self._search_query,
+                    genres=self._search_genres,
+                    skip_ratings=True,
+                    start_page=self._search_next_page,
+                    num_pages=3,
+                )
+                self._search_next_page += 3
 
-                    if is_shutting_down():
-                        return
+                if is_shutting_down():
+                    return
 
-                    if movies:
-                        ratings = await self._get_ratings_for_movies(movies)
-                        wishlist_ids = await get_wishlist_movie_ids(session)
-                        self.movie_list.append_movies(movies, ratings, wishlist_ids)
-                    else:
-                        # No more results — disable further fetching
-                        self.movie_list.on_fetch_more = None
-                        self.movie_list._fetching_more = False
-                        self.movie_list._remove_load_more_row()
-                        self.movie_list.movies_column.update()
+                if movies:
+                    ratings = await self._get_ratings_for_movies(movies)
+                    wishlist_ids = await self._get_wishlist_ids()
+                    self.movie_list.append_movies(movies, ratings, wishlist_ids)
+                else:
+                    # No more results — disable further fetching
+                    self.movie_list.on_fetch_more = None
+                    self.movie_list._fetching_more = False
+                    self.movie_list._remove_load_more_row()
+                    self.movie_list.movies_column.update()
             except Exception:
                 self.movie_list._fetching_more = False
                 self.movie_list._remove_load_more_row()
                 self.movie_list._append_load_more_if_needed()
                 self.movie_list.movies_column.update()
 
-        self.page.run_task(do_fetch)
+        self.tasks.spawn(self.VIEW_RESULTS, do_fetch)
 
     def _handle_my_ratings(self):
         """Handle my ratings button click - toggle sort or enter ratings mode."""
@@ -239,13 +374,13 @@ class MoviePickerApp:
             # Cycle through sort states
             self.sort_state_index = (self.sort_state_index + 1) % len(self.SORT_STATES)
             self._update_sort_button()
-            self.page.run_task(self._load_filtered_ratings)
+            self.tasks.start(self.VIEW_RESULTS, self._load_filtered_ratings)
         else:
             # Enter ratings mode
             self.is_ratings_mode = True
             self.sort_state_index = 0
             self._update_sort_button()
-            self.page.run_task(self._load_filtered_ratings)
+            self.tasks.start(self.VIEW_RESULTS, self._load_filtered_ratings)
 
     def _handle_wishlist(self):
         """Handle wishlist button click."""
@@ -259,7 +394,7 @@ class MoviePickerApp:
             # Enter wishlist mode
             self.is_wishlist_mode = True
             self.search_bar.set_wishlist_active(True)
-            self.page.run_task(self._load_wishlist)
+            self.tasks.start(self.VIEW_RESULTS, self._load_wishlist)
 
     def _handle_collapse_all(self):
         """Handle collapse/expand all button click."""
@@ -268,14 +403,14 @@ class MoviePickerApp:
     def _handle_genre_change(self):
         """Handle genre filter change."""
         if self.is_stats_mode:
-            self.page.run_task(self._load_stats)
+            self.tasks.start(self.VIEW_RESULTS, self._load_stats)
             return
         if not self.is_ratings_mode:
             self.is_ratings_mode = True
             self._exit_wishlist_mode()
             self.sort_state_index = 0
             self._update_sort_button()
-        self.page.run_task(self._load_filtered_ratings)
+        self.tasks.start(self.VIEW_RESULTS, self._load_filtered_ratings)
 
     def _update_sort_button(self):
         """Update the sort button icon based on current state."""
@@ -301,8 +436,9 @@ class MoviePickerApp:
 
     async def _load_filtered_ratings(self):
         """Load user ratings with current sort, genre and tag filter applied."""
+        from database import get_all_user_ratings_filtered, get_wishlist_movie_ids, get_all_tags, get_movie_views, RatingView
         try:
-            async with get_session() as session:
+            async with self._db_session() as session:
                 sort_key = self.SORT_STATES[self.sort_state_index][0]
                 genres = self.search_bar.get_selected_genre_names()
 
@@ -331,8 +467,8 @@ class MoviePickerApp:
                     else:
                         self.movie_list.set_message("Вы ещё не оценили ни одного фильма")
                 else:
-                    movies = [ur.movie for ur in user_ratings]
-                    ratings = {ur.movie_id: ur for ur in user_ratings}
+                    movies = await get_movie_views(session, [ur.movie_id for ur in user_ratings])
+                    ratings = {ur.movie_id: RatingView.from_rating(ur) for ur in user_ratings}
                     wishlist_ids = await get_wishlist_movie_ids(session)
                     # Build movie tags map
                     movie_tags = {}
@@ -348,14 +484,15 @@ class MoviePickerApp:
 
     async def _load_wishlist(self):
         """Load wishlist movies."""
+        from database import get_wishlist, get_movie_views
         try:
-            async with get_session() as session:
+            async with self._db_session() as session:
                 wishlist_items = await get_wishlist(session)
 
                 if not wishlist_items:
                     self.movie_list.set_message("Список «Хочу посмотреть» пуст")
                 else:
-                    movies = [item.movie for item in wishlist_items]
+                    movies = await get_movie_views(session, [item.movie_id for item in wishlist_items])
                     ratings = await self._get_ratings_for_movies(movies)
                     wishlist_ids = {item.movie_id for item in wishlist_items}
                     self.movie_list.set_movies(movies, ratings, wishlist_ids)
@@ -376,84 +513,64 @@ class MoviePickerApp:
             if is_shutting_down():
                 return
             try:
-                async with get_session() as session:
-                    if is_shutting_down():
-                        return
-                    movie = await self.search_service.find_magic_recommendation(session)
+                await self._wait_for_data()
+                if is_shutting_down():
+                    return
+                movie = await self.search_service.find_magic_recommendation()
 
-                    if is_shutting_down():
-                        return
-                    if movie:
-                        ratings = await self._get_ratings_for_movies([movie])
-                        wishlist_ids = await get_wishlist_movie_ids(session)
-                        self.movie_list.set_movies([movie], ratings, wishlist_ids, ratings_loading=True)
-
-                        # Load missing ratings in background
-                        movie_to_load = movie  # Capture for closure
-                        async def load_ratings():
-                            await self._load_ratings_background([movie_to_load])
-                        self.page.run_task(load_ratings)
-                    else:
-                        self.movie_list.set_message("Оцените несколько фильмов, чтобы получить рекомендации")
+                if is_shutting_down():
+                    return
+                if movie:
+                    ratings = await self._get_ratings_for_movies([movie])
+                    wishlist_ids = await self._get_wishlist_ids()
+                    self.movie_list.set_movies([movie], ratings, wishlist_ids, ratings_loading=True)
+
+                    # Load missing ratings in background
+                    movie_to_load = movie  # Capture for closure
+                    async def load_ratings():
+                        await self._load_ratings_background([movie_to_load])
+                    self.tasks.spawn(self.VIEW_RESULTS, load_ratings)
+                else:
+                    self.movie_list.set_message("Оцените несколько фильмов, чтобы получить рекомендации")
             except Exception as e:
                 if not is_shutting_down():
                     self.movie_list.set_message(f"Ошибка: {str(e)}")
 
-        self.page.run_task(do_magic)
+        self.tasks.start(self.VIEW_RESULTS, do_magic)
 
-    def _handle_rating_change(self, movie: Movie, rating: int):
+    def _handle_rating_change(self, movie: MovieView, rating: int):
         """Handle rating change for a movie."""
-        # Optimistic UI update - instant feedback
-        from database.models import UserRating
-        fake_rating = UserRating(movie_id=movie.id, rating=rating)
+        from database import RatingView
+
+        # Optimistic UI update - instant feedback (the stored review is kept)
+        current = self.movie_list.ratings.get(movie.id)
+        fake_rating = RatingView(movie.id, rating, current.review if current else None)
         self.movie_list.update_rating(movie.id, fake_rating)
         self.movie_list.update_wishlist(movie.id, False)
         self.page.update()
 
-        # Save to DB in background
-        async def do_save():
+        def revert():
+            if is_shutting_down():
+                return
             try:
-                async with get_session() as session:
-                    await save_user_rating(session, movie.id, rating)
-                # Update entity ratings in background
-                async with get_session() as session:
-                    await update_entity_ratings_for_movie(session, movie.id)
-            except Exception as e:
-                if is_shutting_down():
-                    return
-                # Revert on error
-                try:
-                    self.movie_list.update_rating(movie.id, None)
-                    self.page.update()
-                except Exception:
-                    pass  # Ignore if UI is destroyed
+                self.movie_list.update_rating(movie.id, None)
+                self.page.update()
+            except Exception:
+                pass  # Ignore if UI is destroyed
 
-        self.page.run_task(do_save)
+        # Save to DB in background (rapid clicks are coalesced into the last one)
+        self.writes.set_rating(movie.id, rating, on_error=revert)
 
-    def _handle_rating_delete(self, movie: Movie):
+    def _handle_rating_delete(self, movie: MovieView):
         """Handle rating deletion for a movie."""
         # Optimistic UI update
         self.movie_list.remove_rating(movie.id, remove_from_list=self.is_ratings_mode)
         self.page.update()
 
         # Delete from DB in background
-        async def do_delete():
-            try:
-                async with get_session() as session:
-                    deleted = await delete_user_rating(session, movie.id)
-                    if not deleted:
-                        return
-                # Update entity ratings in background
-                async with get_session() as session:
-                    await update_entity_ratings_for_movie(session, movie.id)
-            except Exception as e:
-                if is_shutting_down():
-                    return
-                pass
+        self.writes.delete_rating(movie.id)
 
-        self.page.run_task(do_delete)
-
-    def _handle_wishlist_toggle(self, movie: Movie, add: bool):
+    def _handle_wishlist_toggle(self, movie: MovieView, add: bool):
         """Handle wishlist toggle for a movie."""
         # Optimistic UI update
         if add:
@@ -465,28 +582,36 @@ class MoviePickerApp:
                 self.movie_list.update_wishlist(movie.id, False)
         self.page.update()
 
+        def revert():
+            if is_shutting_down():
+                return
+            try:
+                self.movie_list.update_wishlist(movie.id, not add)
+                self.page.update()
+            except Exception:
+                pass
+
         # Save to DB in background
-        async def do_toggle():
+        self.writes.set_wishlist(movie.id, add, on_error=revert)
+
+    def _handle_description_expand(self, card: MovieCard):
+        """Load the full description of an expanded card (list queries carry only a preview)."""
+        from database import get_movie_description
+        movie_id = card.movie.id
+
+        async def do_load():
             try:
-                async with get_session() as session:
-                    if add:
-                        await add_to_wishlist(session, movie.id)
-                    else:
-                        await remove_from_wishlist(session, movie.id)
-            except Exception as e:
-                if is_shutting_down():
+                async with self._db_session() as session:
+                    description = await get_movie_description(session, movie_id)
+                # The card may have been recycled for another movie meanwhile
+                if card.movie.id != movie_id or is_shutting_down():
                     return
-                # Revert on error
-                try:
-                    if add:
-                        self.movie_list.update_wishlist(movie.id, False)
-                    else:
-                        self.movie_list.update_wishlist(movie.id, True)
-                    self.page.update()
-                except Exception:
-                    pass
+                card.set_full_description(description)
+                card.update()
+            except Exception:
+                pass
 
-        self.page.run_task(do_toggle)
+        self.page.run_task(do_load)
 
     def _handle_person_click(self, name: str, person_type: str):
         """Handle click on director or actor name - search for their movies."""
@@ -499,36 +624,37 @@ class MoviePickerApp:
             if is_shutting_down():
                 return
             try:
-                async with get_session() as session:
-                    if is_shutting_down():
-                        return
-                    movies = await self.search_service.search_movies(session, name, skip_ratings=True)
+                await self._wait_for_data()
+                if is_shutting_down():
+                    return
+                movies = await self.search_service.search_movies(name, skip_ratings=True)
 
-                    if is_shutting_down():
-                        return
-                    if movies:
-                        ratings = await self._get_ratings_for_movies(movies)
-                        wishlist_ids = await get_wishlist_movie_ids(session)
-                        self.movie_list.set_movies(movies, ratings, wishlist_ids, ratings_loading=True)
-
-                        # Load missing ratings in background
-                        movies_to_load = movies  # Capture for closure
-                        async def load_ratings():
-                            await self._load_ratings_background(movies_to_load)
-                        self.page.run_task(load_ratings)
-                    else:
-                        self.movie_list.set_message(f"Фильмы с {name} не найдены")
+                if is_shutting_down():
+                    return
+                if movies:
+                    ratings = await self._get_ratings_for_movies(movies)
+                    wishlist_ids = await self._get_wishlist_ids()
+                    self.movie_list.set_movies(movies, ratings, wishlist_ids, ratings_loading=True)
+
+                    # Load missing ratings in background
+                    movies_to_load = movies  # Capture for closure
+                    async def load_ratings():
+                        await self._load_ratings_background(movies_to_load)
+                    self.tasks.spawn(self.VIEW_RESULTS, load_ratings)
+                else:
+                    self.movie_list.set_message(f"Фильмы с {name} не найдены")
             except Exception as e:
                 if not is_shutting_down():
                     self.movie_list.set_message(f"Ошибка при поиске: {str(e)}")
 
-        self.page.run_task(do_search)
+        self.tasks.start(self.VIEW_RESULTS, do_search)
 
-    def _handle_review_click(self, movie: Movie):
+    def _handle_review_click(self, movie: MovieView):
         """Handle review button click."""
+        from database import get_user_rating
         async def do_show():
             try:
-                async with get_session() as session:
+                async with self._db_session() as session:
                     user_rating = await get_user_rating(session, movie.id)
                     current_review = user_rating.review if user_rating else None
 
@@ -541,16 +667,25 @@ class MoviePickerApp:
             except Exception:
                 pass
 
-        self.page.run_task(do_show)
+        self.tasks.start(self.VIEW_DIALOG, do_show)
 
     async def _refresh_tags_cache(self):
         """Refresh the tags cache from database."""
+        from database import get_all_tags
         try:
-            async with get_session() as session:
+            async with self._db_session() as session:
                 self._tags_cache = await get_all_tags(session)
         except Exception:
             self._tags_cache = []
 
+    async def _warm_recommendation_cache(self):
+        """Load recommendations of rated movies into memory so the first search is fast."""
+        try:
+            async with self._db_session() as session:
+                await self.recommender.warm_cache(session)
+        except Exception:
+            pass
+
     def _handle_manage_tags(self):
         """Handle global tag management button click."""
         # Use cached tags for instant dialog opening
@@ -558,6 +693,7 @@ class MoviePickerApp:
 
     def _show_manage_tags_dialog(self, all_tags):
         """Show dialog for filtering, creating, renaming and deleting tags."""
+        from database import create_tag, rename_tag, delete_tag
         tags_column = ft.Column(spacing=0, scroll=ft.ScrollMode.AUTO)
 
         # Tri-state icons: 0=unchecked, 1=include (check), 2=exclude (cross)
@@ -656,7 +792,7 @@ class MoviePickerApp:
         def _delete_tag(row, tag_id):
             async def do_delete():
                 try:
-                    async with get_session() as session:
+                    async with self._db_session() as session:
                         await delete_tag(session, tag_id)
                         if row in tags_column.controls:
                             tags_column.controls.remove(row)
@@ -674,7 +810,7 @@ class MoviePickerApp:
 
             async def do_create():
                 try:
-                    async with get_session() as session:
+                    async with self._db_session() as session:
                         tag = await create_tag(session, name)
                         self._tags_cache.append(tag)
                         row = build_tag_row(tag.id, tag.name, 0)
@@ -733,7 +869,7 @@ class MoviePickerApp:
             async def do_save():
                 try:
                     if rename_tasks:
-                        async with get_session() as session:
+                        async with self._db_session() as session:
                             for tag_id, new_name in rename_tasks:
                                 await rename_tag(session, tag_id, new_name)
                                 # Update cache
@@ -868,14 +1004,14 @@ class MoviePickerApp:
             self.search_bar.rating_filter_button.update()
 
             if self.is_stats_mode:
-                self.page.run_task(self._load_stats)
+                self.tasks.start(self.VIEW_RESULTS, self._load_stats)
             else:
                 if not self.is_ratings_mode:
                     self.is_ratings_mode = True
                     self._exit_wishlist_mode()
                     self.sort_state_index = 0
                     self._update_sort_button()
-                self.page.run_task(self._load_filtered_ratings)
+                self.tasks.start(self.VIEW_RESULTS, self._load_filtered_ratings)
             close_dialog()
 
         dialog = ft.AlertDialog(
@@ -897,11 +1033,12 @@ class MoviePickerApp:
 
         self.page.show_dialog(dialog)
 
-    def _handle_tags_click(self, movie: Movie):
+    def _handle_tags_click(self, movie: MovieView):
         """Handle per-movie tags button click - assign/unassign existing tags."""
+        from database import get_movie_tags
         async def do_show():
             try:
-                async with get_session() as session:
+                async with self._db_session() as session:
                     movie_tag_list = await get_movie_tags(session, movie.id)
                     movie_tag_ids = {t.id for t in movie_tag_list}
                     # Use cached tags list
@@ -909,9 +1046,9 @@ class MoviePickerApp:
             except Exception:
                 pass
 
-        self.page.run_task(do_show)
+        self.tasks.start(self.VIEW_DIALOG, do_show)
 
-    def _show_movie_tags_dialog(self, movie: Movie, all_tags, movie_tag_ids: set):
+    def _show_movie_tags_dialog(self, movie: MovieView, all_tags, movie_tag_ids: set):
         """Show simple dialog for assigning existing tags to a movie."""
         if not all_tags:
             # No tags exist — prompt user to create them via global button
@@ -951,20 +1088,20 @@ class MoviePickerApp:
             self.page.pop_dialog()
 
         def save_tags(e):
-            selected_ids = [cb.data for cb in checkboxes if cb.value]
+            selected_ids = {cb.data for cb in checkboxes if cb.value}
+            previous_names = [tag.name for tag in all_tags if tag.id in movie_tag_ids]
 
-            async def do_save():
+            def revert():
+                if is_shutting_down():
+                    return
                 try:
-                    async with get_session() as session:
-                        await set_movie_tags(session, movie.id, selected_ids)
-                        updated_tags = await get_movie_tags(session, movie.id)
-                        tag_names = [t.name for t in updated_tags]
-                        if not is_shutting_down():
-                            self.movie_list.update_movie_tags(movie.id, tag_names)
+                    self.movie_list.update_movie_tags(movie.id, previous_names)
                 except Exception:
                     pass
 
-            self.page.run_task(do_save)
+            # Optimistic UI update (all_tags is sorted by name, like get_movie_tags)
+            self.movie_list.update_movie_tags(movie.id, [tag.name for tag in all_tags if tag.id in selected_ids])
+            self.writes.set_tags(movie.id, list(selected_ids), on_error=revert)
             close_dialog()
 
         dialog = ft.AlertDialog(
@@ -984,7 +1121,7 @@ class MoviePickerApp:
 
         self.page.show_dialog(dialog)
 
-    def _handle_similar_click(self, movie: Movie):
+    def _handle_similar_click(self, movie: MovieView):
         """Handle find similar button click."""
         self._exit_ratings_mode()
         self._exit_wishlist_mode()
@@ -995,71 +1132,73 @@ class MoviePickerApp:
             if is_shutting_down():
                 return
             try:
-                async with get_session() as session:
-                    if is_shutting_down():
-                        return
-                    movies = await self.search_service.find_similar_movies(session, movie)
+                await self._wait_for_data()
+                if is_shutting_down():
+                    return
+                movies = await self.search_service.find_similar_movies(movie)
 
-                    if is_shutting_down():
-                        return
-                    if movies:
-                        ratings = await self._get_ratings_for_movies(movies)
-                        wishlist_ids = await get_wishlist_movie_ids(session)
-                        self.movie_list.set_movies(movies, ratings, wishlist_ids, ratings_loading=True)
-
-                        # Load missing ratings in background
-                        movies_to_load = movies  # Capture for closure
-                        async def load_ratings():
-                            await self._load_ratings_background(movies_to_load)
-                        self.page.run_task(load_ratings)
-                    else:
-                        self.movie_list.set_message("Похожие фильмы не найдены")
+                if is_shutting_down():
+                    return
+                if movies:
+                    ratings = await self._get_ratings_for_movies(movies)
+                    wishlist_ids = await self._get_wishlist_ids()
+                    self.movie_list.set_movies(movies, ratings, wishlist_ids, ratings_loading=True)
+
+                    # Load missing ratings in background
+                    movies_to_load = movies  # Capture for closure
+                    async def load_ratings():
+                        await self._load_ratings_background(movies_to_load)
+                    self.tasks.spawn(self.VIEW_RESULTS, load_ratings)
+                else:
+                    self.movie_list.set_message("Похожие фильмы не найдены")
             except Exception as e:
                 if not is_shutting_down():
                     self.movie_list.set_message(f"Ошибка: {str(e)}")
 
-        self.page.run_task(do_similar)
+        self.tasks.start(self.VIEW_RESULTS, do_similar)
 
-    def _handle_review_save(self, movie: Movie, review: str):
+    def _handle_review_save(self, movie: MovieView, review: str):
         """Handle review save."""
-        async def do_save():
-            try:
-                async with get_session() as session:
-                    existing_rating = await get_user_rating(session, movie.id)
-                    rating = existing_rating.rating if existing_rating else 5
+        from database import RatingView
+        current = self.movie_list.ratings.get(movie.id)
+        rating = current.rating if current else 5
 
-                    user_rating = await save_user_rating(session, movie.id, rating, review)
+        self.movie_list.update_rating(movie.id, RatingView(movie.id, rating, review))
+        self.page.update()
 
-                    if not is_shutting_down():
-                        try:
-                            self.movie_list.update_rating(movie.id, user_rating)
-                        except Exception:
-                            pass
+        def revert():
+            if is_shutting_down():
+                return
+            try:
+                self.movie_list.update_rating(movie.id, current)
+                self.page.update()
             except Exception:
                 pass
 
-            if not is_shutting_down():
-                try:
-                    self.page.update()
-                except Exception:
-                    pass  # Ignore if UI is destroyed
-
-        self.page.run_task(do_save)
+        self.writes.set_rating(movie.id, rating, review, on_error=revert)
 
-    async def _get_ratings_for_movies(self, movies: list[Movie]) -> dict[int, UserRating]:
+    async def _get_ratings_for_movies(self, movies: list[MovieView]) -> dict[int, RatingView]:
         """Get user ratings for a list of movies (single batch query)."""
+        from database import get_user_ratings_batch, RatingView
         if not movies:
             return {}
-        async with get_session() as session:
+        async with self._db_session() as session:
             movie_ids = [m.id for m in movies]
-            return await get_user_ratings_batch(session, movie_ids)
+            ratings = await get_user_ratings_batch(session, movie_ids)
+        return {movie_id: RatingView.from_rating(ur) for movie_id, ur in ratings.items()}
+
+    async def _get_wishlist_ids(self) -> set:
+        """Get wishlisted movie IDs in a short session of their own."""
+        from database import get_wishlist_movie_ids
+        async with self._db_session() as session:
+            return await get_wishlist_movie_ids(session)
 
     async def _load_ratings_background(self, movies: list):
         """Load missing ratings in background and update UI."""
         if is_shutting_down():
             return
         try:
-            async with get_session() as session:
+            async with self._db_session() as session:
                 def on_movie_updated(movie):
                     if is_shutting_down():
                         return
@@ -1069,16 +1208,20 @@ class MoviePickerApp:
                     except Exception:
                         pass  # Ignore if UI is being destroyed
 
-                await self.search_service.fetch_missing_ratings(session, movies, on_movie_updated)
+                await self.search_service.fetch_missing_ratings(
+                    session, movies, on_movie_updated,
+                    priority_ids=self.movie_list.visible_movie_ids(),
+                )
+        except asyncio.CancelledError:
+            raise  # Superseded: the list now belongs to the new view
         except Exception:
             pass  # Silently ignore rating fetch errors
-        finally:
-            if not is_shutting_down():
-                try:
-                    # Turn off loading indicators when done
-                    self.movie_list.set_ratings_loading(False)
-                except Exception:
-                    pass  # Ignore if UI is already destroyed
+        if not is_shutting_down():
+            try:
+                # Turn off loading indicators when done
+                self.movie_list.set_ratings_loading(False)
+            except Exception:
+                pass  # Ignore if UI is already destroyed
 
     def _handle_stats(self):
         """Handle statistics button click."""
@@ -1086,12 +1229,13 @@ class MoviePickerApp:
         self._exit_wishlist_mode()
         self.is_stats_mode = True
         self.movie_list.on_fetch_more = None
-        self.page.run_task(self._load_stats)
+        self.tasks.start(self.VIEW_RESULTS, self._load_stats)
 
     async def _load_stats(self):
         """Load statistics data with current filters and display histogram."""
+        from database import get_all_user_ratings_filtered, get_all_tags
         try:
-            async with get_session() as session:
+            async with self._db_session() as session:
                 genres = self.search_bar.get_selected_genre_names()
 
                 tag_names = None
@@ -1272,7 +1416,7 @@ class MoviePickerApp:
                 label.opacity = 1
             self.page.update()
 
-        self.page.run_task(animate)
+        self.tasks.spawn(self.VIEW_RESULTS, animate)
 
     def _show_loading(self):
         """Show loading indicator."""
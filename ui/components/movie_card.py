@@ -1,31 +1,36 @@
+from __future__ import annotations
+
 import math
-from typing import Callable, Optional
+from typing import TYPE_CHECKING, Callable, Optional
 import flet as ft
 
-from database.models import Movie
 from ui.theme import COLORS
 
+if TYPE_CHECKING:
+    from database.views import MovieView
+
 
 class MovieCard(ft.Container):
     """A card component displaying movie information."""
 
     def __init__(
         self,
-        movie: Movie,
+        movie: MovieView,
         user_rating: Optional[int] = None,
         user_review: Optional[str] = None,
         user_tags: Optional[list[str]] = None,
         in_wishlist: bool = False,
         ratings_loading: bool = False,
         collapsed: bool = False,
-        on_rating_change: Optional[Callable[[Movie, int], None]] = None,
-        on_review_click: Optional[Callable[[Movie], None]] = None,
-        on_similar_click: Optional[Callable[[Movie], None]] = None,
-        on_rating_delete: Optional[Callable[[Movie], None]] = None,
-        on_wishlist_toggle: Optional[Callable[[Movie, bool], None]] = None,
+        on_rating_change: Optional[Callable[[MovieView, int], None]] = None,
+        on_review_click: Optional[Callable[[MovieView], None]] = None,
+        on_similar_click: Optional[Callable[[MovieView], None]] = None,
+        on_rating_delete: Optional[Callable[[MovieView], None]] = None,
+        on_wishlist_toggle: Optional[Callable[[MovieView, bool], None]] = None,
         on_person_click: Optional[Callable[[str, str], None]] = None,  # (name, type: 'director'|'actor')
         on_collapse_toggle: Optional[Callable[["MovieCard"], None]] = None,
-        on_tags_click: Optional[Callable[[Movie], None]] = None,
+        on_tags_click: Optional[Callable[[MovieView], None]] = None,
+        on_description_expand: Optional[Callable[["MovieCard"], None]] = None,
     ):
         self.movie = movie
         self.user_rating = user_rating
@@ -42,8 +47,17 @@ class MovieCard(ft.Container):
         self.on_person_click = on_person_click
         self.on_collapse_toggle = on_collapse_toggle
         self.on_tags_click = on_tags_click
+        self.on_description_expand = on_description_expand
         self.description_expanded = False
+        self.full_description: Optional[str] = None  # Loaded on first expand (see set_full_description)
         self.actors_expanded = False
+        # References to patchable controls of the built views (see set_* methods)
+        self._details_column: Optional[ft.Column] = None
+        self._external_ratings_row: Optional[ft.Row] = None
+        self._user_rating_row: Optional[ft.Row] = None
+        self._actions_row: Optional[ft.Row] = None
+        self._star_buttons: list[ft.IconButton] = []
+        self._collapsed_star_buttons: list[ft.IconButton] = []
 
         # Lazy-cached views: only build the current one, cache the other on first toggle
         if collapsed:
@@ -66,15 +80,12 @@ class MovieCard(ft.Container):
 
     def _build_collapsed_content(self) -> ft.Control:
         """Build collapsed view: single row with title (left), stars (right), expand button (far right)."""
-        title_text = self.movie.title or "Без названия"
-        year_text = f" ({self.movie.year})" if self.movie.year else ""
-
         rating_controls = list(self._build_collapsed_star_rating())
 
         return ft.Row(
             controls=[
                 ft.Text(
-                    f"{title_text}{year_text}",
+                    self._collapsed_title(),
                     size=14,
                     color=COLORS["text_primary"],
                     expand=True,
@@ -102,6 +113,11 @@ class MovieCard(ft.Container):
             vertical_alignment=ft.CrossAxisAlignment.CENTER,
         )
 
+    def _collapsed_title(self) -> str:
+        title_text = self.movie.title or "Без названия"
+        year_text = f" ({self.movie.year})" if self.movie.year else ""
+        return f"{title_text}{year_text}"
+
     def _toggle_collapse(self):
         """Toggle between collapsed and expanded views."""
         self.collapsed = not self.collapsed
@@ -130,25 +146,104 @@ class MovieCard(ft.Container):
         self._cached_expanded = None
         self._cached_collapsed = None
 
+    def rebind(
+        self,
+        movie: MovieView,
+        user_rating: Optional[int] = None,
+        user_review: Optional[str] = None,
+        user_tags: Optional[list[str]] = None,
+        in_wishlist: bool = False,
+        ratings_loading: bool = False,
+        collapsed: bool = False,
+    ):
+        """Reuse this card for another movie (recycled by a virtualized list)."""
+        self.movie = movie
+        self.user_rating = user_rating
+        self.user_review = user_review
+        self.user_tags = user_tags or []
+        self.in_wishlist = in_wishlist
+        self.ratings_loading = ratings_loading
+        self.collapsed = collapsed
+        self.description_expanded = False
+        self.full_description = None
+        self.actors_expanded = False
+        self.invalidate_view_cache()
+        self._apply_collapse_state()
+
+    # =========================================================================
+    # In-place patching (no view rebuild; caller is responsible for update())
+    # =========================================================================
+
+    def set_user_rating(self, user_rating: Optional[int], user_review: Optional[str] = None):
+        """Patch stars, rating label and action buttons for a new user rating."""
+        self.user_rating = user_rating
+        self.user_review = user_review
+        if self._cached_collapsed is not None:
+            self._patch_stars(self._collapsed_star_buttons)
+        if self._cached_expanded is not None:
+            self._patch_stars(self._star_buttons)
+            self._user_rating_row.controls = [
+                *self._user_rating_row.controls[:len(self._star_buttons) + 1],
+                *self._build_user_rating_tail(),
+            ]
+            self._actions_row.controls = self._build_action_buttons()
+
+    def set_in_wishlist(self, in_wishlist: bool):
+        """Patch the wishlist button."""
+        self.in_wishlist = in_wishlist
+        if self._cached_expanded is not None:
+            self._actions_row.controls = self._build_action_buttons()
+
+    def set_user_tags(self, user_tags: list[str]):
+        """Patch tag chips and the tags button."""
+        self.user_tags = user_tags or []
+        if self._cached_expanded is not None:
+            self._details_column.controls[1] = self._build_genres_and_tags()
+            self._actions_row.controls = self._build_action_buttons()
+
+    def set_external_ratings(self, movie: MovieView, ratings_loading: bool):
+        """Patch the aggregator ratings row (KP/IMDB/TMDB/RT/MC) after a ratings fetch."""
+        self.movie = movie
+        self.ratings_loading = ratings_loading
+        if self._cached_expanded is not None:
+            self._external_ratings_row.controls = self._build_external_ratings()
+        if self._cached_collapsed is not None:
+            # Title/year live in the collapsed row; keep them in sync with the new movie object
+            self._cached_collapsed.controls[0].value = self._collapsed_title()
+
+    def set_full_description(self, description: Optional[str]):
+        """Show the full description loaded for an expanded card."""
+        self.full_description = description
+        if self._cached_expanded is not None and self.description_expanded:
+            self._details_column.controls[4] = self._build_description()
+
+    def _patch_stars(self, stars: list[ft.IconButton]):
+        star_color = self._get_star_color(self.user_rating) if self.user_rating else COLORS["star_empty"]
+        for i, star in enumerate(stars, start=1):
+            is_filled = self.user_rating is not None and i <= self.user_rating
+            star.icon = ft.Icons.STAR if is_filled else ft.Icons.STAR_BORDER
+            star.icon_color = star_color if is_filled else COLORS["star_empty"]
+
     def _build_content(self) -> ft.Control:
+        self._details_column = ft.Column(
+            controls=[
+                self._build_title_row(),
+                self._build_genres_and_tags(),
+                self._build_clickable_person("Режиссёр: ", self.movie.directors_display, "director"),
+                self._build_clickable_person("Актёры: ", self.movie.actors_display, "actor"),
+                self._build_description(),
+                ft.Divider(height=1, color=COLORS["divider"]),
+                self._build_ratings_row(),
+                self._build_actions_row(),
+            ],
+            spacing=6,
+            expand=True,
+        )
         return ft.Row(
             controls=[
                 self._build_poster(),
                 ft.Container(width=16),
-                ft.Column(
-                    controls=[
-                        self._build_title_row(),
-                        self._build_genres_and_tags(),
-                        self._build_clickable_person("Режиссёр: ", self.movie.directors_display, "director"),
-                        self._build_clickable_person("Актёры: ", self.movie.actors_display, "actor"),
-                        self._build_description(),
-                        ft.Divider(height=1, color=COLORS["divider"]),
-                        self._build_ratings_row(),
-                        self._build_actions_row(),
-                    ],
-                    spacing=6,
-                    expand=True,
-                ),
+                self._details_column,
             ],
             alignment=ft.MainAxisAlignment.START,
             vertical_alignment=ft.CrossAxisAlignment.START,
@@ -288,6 +383,8 @@ class MovieCard(ft.Container):
 
         description = self.movie.description
         is_long = len(description) > 150
+        if self.description_expanded and self.full_description:
+            description = self.full_description
 
         if not is_long:
             return ft.Text(description, size=12, color=COLORS["text_secondary"])
@@ -321,6 +418,9 @@ class MovieCard(ft.Container):
 
     def _toggle_description(self, e):
         self.description_expanded = not self.description_expanded
+        if self.description_expanded and self.full_description is None and self.movie.description_truncated \
+                and self.on_description_expand:
+            self.on_description_expand(self)
         self._cached_expanded = self._build_content()
         self.content = self._cached_expanded
         self.update()
@@ -343,7 +443,24 @@ class MovieCard(ft.Container):
         )
 
     def _build_ratings_row(self) -> ft.Control:
-        """Build row with ratings from multiple sources."""
+        """Build aggregator ratings row and user rating row."""
+        self._external_ratings_row = ft.Row(controls=self._build_external_ratings(), spacing=0)
+        self._user_rating_row = ft.Row(
+            controls=[
+                ft.Text("Моя оценка:", size=13, color=COLORS["text_secondary"]),
+                *self._build_star_rating(),
+                *self._build_user_rating_tail(),
+            ],
+            spacing=4,
+        )
+
+        return ft.Column(
+            controls=[self._external_ratings_row, self._user_rating_row],
+            spacing=6,
+        )
+
+    def _build_external_ratings(self) -> list[ft.Control]:
+        """Build controls with ratings from multiple sources."""
         ratings_parts = []
 
         # Kinopoisk rating (most relevant for Russian users)
@@ -426,28 +543,31 @@ class MovieCard(ft.Container):
                 )
             )
 
-        # Build user rating row with optional label
-        user_rating_controls = [
-            ft.Text("Моя оценка:", size=13, color=COLORS["text_secondary"]),
-            *self._build_star_rating(),
-        ]
-        if self.user_rating is not None:
-            user_rating_controls.append(
-                ft.Text(
-                    self._get_rating_label(self.user_rating),
-                    size=13,
-                    weight=ft.FontWeight.BOLD,
-                    color=self._get_star_color(self.user_rating),
-                )
-            )
+        return ratings_parts
 
-        return ft.Column(
-            controls=[
-                ft.Row(controls=ratings_parts, spacing=0),
-                ft.Row(controls=user_rating_controls, spacing=4),
-            ],
-            spacing=6,
-        )
+    def _build_user_rating_tail(self) -> list[ft.Control]:
+        """Build delete button and rating label shown after the stars when rated."""
+        if self.user_rating is None:
+            return []
+
+        return [
+            ft.IconButton(
+                icon=ft.Icons.DELETE_OUTLINE,
+                icon_size=18,
+                icon_color=COLORS["text_secondary"],
+                on_click=lambda e: self._handle_rating_delete(),
+                tooltip="Удалить оценку",
+                padding=0,
+                width=24,
+                height=24,
+            ),
+            ft.Text(
+                self._get_rating_label(self.user_rating),
+                size=13,
+                weight=ft.FontWeight.BOLD,
+                color=self._get_star_color(self.user_rating),
+            ),
+        ]
 
     def _get_rating_color(self, rating: float, max_value: float = 10.0) -> str:
         """Get color based on rating value - gradient from red to blue.
@@ -529,6 +649,7 @@ class MovieCard(ft.Container):
             )
             stars.append(star)
 
+        self._collapsed_star_buttons = stars
         return stars
 
     def _build_star_rating(self) -> list[ft.Control]:
@@ -562,20 +683,7 @@ class MovieCard(ft.Container):
             )
             stars.append(star)
 
-        # Add delete button if there's a rating
-        if self.user_rating is not None:
-            delete_button = ft.IconButton(
-                icon=ft.Icons.DELETE_OUTLINE,
-                icon_size=18,
-                icon_color=COLORS["text_secondary"],
-                on_click=lambda e: self._handle_rating_delete(),
-                tooltip="Удалить оценку",
-                padding=0,
-                width=24,
-                height=24,
-            )
-            stars.append(delete_button)
-
+        self._star_buttons = stars
         return stars
 
     def _build_genres_and_tags(self) -> ft.Control:
@@ -614,6 +722,10 @@ class MovieCard(ft.Container):
         return ft.Row(controls=controls, spacing=4, wrap=True, vertical_alignment=ft.CrossAxisAlignment.CENTER)
 
     def _build_actions_row(self) -> ft.Control:
+        self._actions_row = ft.Row(controls=self._build_action_buttons(), wrap=True)
+        return self._actions_row
+
+    def _build_action_buttons(self) -> list[ft.Control]:
         has_review = bool(self.user_review)
         review_button_text = "Редактировать рецензию" if has_review else "Написать рецензию"
 
@@ -657,7 +769,7 @@ class MovieCard(ft.Container):
                 )
             )
 
-        return ft.Row(controls=controls, wrap=True)
+        return controls
 
     def _handle_rating_click(self, rating: int):
         if self.on_rating_change:
@@ -1,17 +1,42 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import itertools
 import threading
-from typing import Callable, Optional
+from typing import TYPE_CHECKING, Callable, Optional
 import flet as ft
 
-from database.models import Movie, UserRating
 from ui.theme import COLORS
 from .movie_card import MovieCard
 
+if TYPE_CHECKING:
+    from database.views import MovieView, RatingView
+
 
 class MovieList(ft.Container):
-    """List of movie cards with infinite scroll."""
+    """List of movie cards with infinite scroll.
+
+    Long lists are virtualized: only cards around the viewport stay mounted,
+    the rest are replaced by spacers as tall as the cards they stand in for
+    (keeping the scroll extent and position), and unmounted cards are
+    recycled for new movies. Card heights are measured while mounted
+    (on_size_change) and estimated from the card's collapse state until then.
+    """
 
     ITEMS_PER_PAGE = 20  # Items to load per batch for infinite scroll
 
+    # Virtualization
+    MAX_MOUNTED_CARDS = 60  # Lists up to this size are rendered in full
+    WINDOW_BUFFER = 10  # Cards kept mounted above and below the viewport
+    CARD_HEIGHT = 260  # Expanded card height until measured (incl. margin)
+    COLLAPSED_CARD_HEIGHT = 40  # Collapsed card height until measured (incl. margin)
+    SIZE_CHANGE_INTERVAL = 100  # Milliseconds between card size reports
+    VIEWPORT_HEIGHT = 800  # Assumed until the first scroll event reports it
+    CARD_POOL_SIZE = 30  # Max unmounted cards kept for reuse
+
+    FLUSH_INTERVAL = 1 / 60  # Coalesce streamed card patches into one update per frame
+
     def is_isolated(self):
         """Isolate this control to prevent updates from affecting siblings.
 
@@ -22,20 +47,33 @@ class MovieList(ft.Container):
 
     def __init__(
         self,
-        on_rating_change: Optional[Callable[[Movie, int], None]] = None,
-        on_review_click: Optional[Callable[[Movie], None]] = None,
-        on_similar_click: Optional[Callable[[Movie], None]] = None,
-        on_rating_delete: Optional[Callable[[Movie], None]] = None,
-        on_wishlist_toggle: Optional[Callable[[Movie, bool], None]] = None,
+        on_rating_change: Optional[Callable[[MovieView, int], None]] = None,
+        on_review_click: Optional[Callable[[MovieView], None]] = None,
+        on_similar_click: Optional[Callable[[MovieView], None]] = None,
+        on_rating_delete: Optional[Callable[[MovieView], None]] = None,
+        on_wishlist_toggle: Optional[Callable[[MovieView, bool], None]] = None,
         on_person_click: Optional[Callable[[str, str], None]] = None,
-        on_tags_click: Optional[Callable[[Movie], None]] = None,
+        on_tags_click: Optional[Callable[[MovieView], None]] = None,
+        on_description_expand: Optional[Callable[[MovieCard], None]] = None,
         on_fetch_more: Optional[Callable[[], None]] = None,
     ):
-        self.movies: list[Movie] = []
-        self.ratings: dict[int, UserRating] = {}
+        self.movies: list[MovieView] = []
+        self.ratings: dict[int, RatingView] = {}
         self.wishlist_ids: set[int] = set()
         self.movie_tags: dict[int, list[str]] = {}  # movie_id -> list of tag names
-        self.loaded_count = 0  # How many items are currently rendered
+        self.loaded_count = 0  # How many items are currently rendered (mounted or behind spacers)
+        # Mounted cards are movies[_window_start:_window_end], between the two spacers
+        self._window_start = 0
+        self._window_end = 0
+        self._card_pool: list[MovieCard] = []
+        self._cards_by_movie_id: dict[int, MovieCard] = {}  # Mounted cards only
+        self._movie_positions: dict[int, int] = {}  # movie_id -> index in self.movies
+        self._card_heights: dict[int, float] = {}  # movie_id -> measured card height (current state)
+        self._collapsed_overrides: dict[int, bool] = {}  # movie_id -> state toggled on the card itself
+        self._offsets: Optional[list[float]] = None  # Top of each rendered card, plus the end (lazy)
+        self._scroll_pixels = 0.0
+        self._viewport_height = float(self.VIEWPORT_HEIGHT)
+        self._flush_scheduled = False
         self._scroll_sem = threading.Semaphore()  # Prevent concurrent loads (official Flet pattern)
         self.on_rating_change = on_rating_change
         self.on_review_click = on_review_click
@@ -44,6 +82,7 @@ class MovieList(ft.Container):
         self.on_wishlist_toggle = on_wishlist_toggle
         self.on_person_click = on_person_click
         self.on_tags_click = on_tags_click
+        self.on_description_expand = on_description_expand
         self.on_fetch_more = on_fetch_more  # Called when all local results shown, needs more from API
         self.message: Optional[str] = None
         self._custom_content: Optional[ft.Control] = None
@@ -56,7 +95,12 @@ class MovieList(ft.Container):
             spacing=0,
             expand=True,
             auto_scroll=False,
+            scroll_interval=50,
+            on_scroll=self._on_list_scroll,
         )
+        self._top_spacer = ft.Container(height=0, data="spacer")
+        self._bottom_spacer = ft.Container(height=0, data="spacer")
+        self._spacers_mounted = False
         self.message_text = ft.Text(
             "",
             size=16,
@@ -121,14 +165,48 @@ class MovieList(ft.Container):
             self.movies_column.controls.append(self._build_load_more_row())
 
     def toggle_all_collapsed(self):
-        """Toggle collapse state for all cards."""
+        """Toggle collapse state for all cards, keeping the card at the top of the viewport in place."""
+        anchor, fraction = self._scroll_anchor()
         self.all_collapsed = not self.all_collapsed
+        self._collapsed_overrides.clear()
+        self._card_heights.clear()  # Every card changes height; mounted ones report the new one
+        self._offsets = None
+
+        for control in self._mounted_cards():
+            control.collapsed = self.all_collapsed
+            control._apply_collapse_state()
 
-        for control in self.movies_column.controls:
-            if isinstance(control, MovieCard):
-                control.collapsed = self.all_collapsed
-                control._apply_collapse_state()
-                control.update()
+        if not self._spacers_mounted or anchor is None:
+            self.movies_column.update()
+            return
+
+        offsets = self._get_offsets()
+        pixels = offsets[anchor] + fraction * (offsets[anchor + 1] - offsets[anchor])
+        if self.loaded_count > self.MAX_MOUNTED_CARDS or self._window_start > 0:
+            # The viewport now covers a different number of cards: mount the window around the anchor
+            start, end = self._window_around(pixels)
+            self._render_window(start, end)
+        self.movies_column.update()
+        self._scroll_to(pixels)
+
+    def _scroll_anchor(self) -> tuple[Optional[int], float]:
+        """Index of the card at the top of the viewport and how far (0..1) into it the viewport starts."""
+        if not self.loaded_count:
+            return None, 0.0
+        offsets = self._get_offsets()
+        idx = self._index_at(self._scroll_pixels)
+        height = offsets[idx + 1] - offsets[idx]
+        fraction = (self._scroll_pixels - offsets[idx]) / height if height else 0.0
+        return idx, min(1.0, max(0.0, fraction))
+
+    def _scroll_to(self, pixels: float):
+        self._scroll_pixels = pixels
+        try:
+            page = self.page
+        except Exception:
+            page = None
+        if page is not None:
+            page.run_task(self.movies_column.scroll_to, offset=pixels)
 
     def _on_scroll(self, e: ft.OnScrollEvent):
         """Handle scroll event — official Flet pattern with Semaphore."""
@@ -143,6 +221,33 @@ class MovieList(ft.Container):
                 finally:
                     self._scroll_sem.release()
 
+    def _on_list_scroll(self, e: ft.OnScrollEvent):
+        """Slide the window of mounted cards to follow the viewport."""
+        self._scroll_pixels = max(0.0, e.pixels)
+        if e.viewport_dimension:
+            self._viewport_height = e.viewport_dimension
+        if self.loaded_count <= self.MAX_MOUNTED_CARDS and self._window_start == 0:
+            return  # Whole list is mounted, nothing to virtualize
+
+        first_visible = self._index_at(self._scroll_pixels)
+        last_visible = self._index_at(self._scroll_pixels + self._viewport_height) + 1
+
+        # Re-render only when the viewport gets close to an edge of the window
+        near_top = self._window_start > 0 and first_visible - self.WINDOW_BUFFER // 2 < self._window_start
+        near_bottom = (
+            self._window_end < self.loaded_count
+            and last_visible + self.WINDOW_BUFFER // 2 > self._window_end
+        )
+        if not (near_top or near_bottom):
+            return
+
+        if self._scroll_sem.acquire(blocking=False):
+            try:
+                self._render_window(*self._window_around(self._scroll_pixels))
+                self.movies_column.update()
+            finally:
+                self._scroll_sem.release()
+
     def _load_more_click(self):
         """Handle 'Load more' button click."""
         if self._fetching_more:
@@ -180,7 +285,7 @@ class MovieList(ft.Container):
             data="load_more_row",
         )
 
-    def append_movies(self, new_movies: list[Movie], ratings: dict[int, UserRating] = None,
+    def append_movies(self, new_movies: list[MovieView], ratings: dict[int, RatingView] = None,
                       wishlist_ids: set[int] = None):
         """Append more movies from API fetch (keeps existing cards)."""
         self._fetching_more = False
@@ -189,9 +294,9 @@ class MovieList(ft.Container):
         if wishlist_ids is not None:
             self.wishlist_ids.update(wishlist_ids)
 
-        existing_ids = {m.id for m in self.movies}
-        added = [m for m in new_movies if m.id not in existing_ids]
+        added = [m for m in new_movies if m.id not in self._movie_positions]
         self.movies.extend(added)
+        self._reindex_movies()
 
         # Remove fetching indicator
         self._remove_load_more_row()
@@ -206,41 +311,155 @@ class MovieList(ft.Container):
     def _do_load_batch(self):
         """Add next batch of cards to the column (no update call)."""
         end_idx = min(self.loaded_count + self.ITEMS_PER_PAGE, len(self.movies))
-        for movie in self.movies[self.loaded_count:end_idx]:
-            card = self._create_card(movie)
-            self.movies_column.controls.append(card)
         self.loaded_count = end_idx
-
-    def _create_card(self, movie: Movie) -> MovieCard:
-        """Create a MovieCard for the given movie."""
+        # The user is at the bottom: keep the newest cards mounted
+        self._render_window(max(0, end_idx - self.MAX_MOUNTED_CARDS), end_idx)
+
+    def _is_collapsed(self, movie_id: int) -> bool:
+        return self._collapsed_overrides.get(movie_id, self.all_collapsed)
+
+    def _card_height(self, movie_id: int) -> float:
+        """Measured height of the movie's card, or the estimate for its collapse state."""
+        height = self._card_heights.get(movie_id)
+        if height is not None:
+            return height
+        return self.COLLAPSED_CARD_HEIGHT if self._is_collapsed(movie_id) else self.CARD_HEIGHT
+
+    def _get_offsets(self) -> list[float]:
+        """Top of every rendered card (movies[:loaded_count]), followed by the total height."""
+        if self._offsets is None:
+            heights = (self._card_height(m.id) for m in self.movies[:self.loaded_count])
+            self._offsets = [0.0, *itertools.accumulate(heights)]
+        return self._offsets
+
+    def _index_at(self, pixels: float) -> int:
+        """Index of the rendered card at the given scroll offset."""
+        offsets = self._get_offsets()
+        return max(0, min(self.loaded_count - 1, bisect.bisect_right(offsets, pixels) - 1))
+
+    def _window_around(self, pixels: float) -> tuple[int, int]:
+        """Window of cards covering the viewport at the given scroll offset, plus buffers."""
+        first_visible = self._index_at(pixels)
+        last_visible = self._index_at(pixels + self._viewport_height) + 1
+        start = max(0, first_visible - self.WINDOW_BUFFER)
+        end = min(self.loaded_count, last_visible + self.WINDOW_BUFFER)
+        return start, end
+
+    def _on_card_size_change(self, e: ft.LayoutSizeChangeEvent):
+        """Remember the laid out height of a mounted card for the spacer that replaces it later."""
+        card = e.control
+        if self._cards_by_movie_id.get(card.movie.id) is not card:
+            return  # Report from before the card was recycled
+        if abs(self._card_heights.get(card.movie.id, -1.0) - e.height) >= 1:
+            self._card_heights[card.movie.id] = e.height
+            self._offsets = None
+
+    def _on_card_collapse_toggle(self, card: MovieCard):
+        """Keep a card's own collapse state when it is unmounted and mounted again."""
+        self._collapsed_overrides[card.movie.id] = card.collapsed
+        self._card_heights.pop(card.movie.id, None)
+        self._offsets = None
+
+    def _mounted_cards(self) -> list[MovieCard]:
+        return [c for c in self.movies_column.controls if isinstance(c, MovieCard)]
+
+    def _render_window(self, start: int, end: int):
+        """Mount cards for movies[start:end] between spacers (no update call).
+
+        Cards already mounted for movies inside the new window are kept, the
+        others are returned to the pool and reused for newly mounted movies.
+        """
+        reused = {}
+        for offset, card in enumerate(self._mounted_cards()):
+            idx = self._window_start + offset
+            if start <= idx < end:
+                reused[idx] = card
+            else:
+                self._release_card(card)
+
+        cards = []
+        for idx in range(start, end):
+            if idx in reused:
+                cards.append(reused[idx])
+            else:
+                cards.append(self._create_card(self.movies[idx]))
+
+        load_more_rows = [
+            c for c in self.movies_column.controls
+            if isinstance(c, ft.Container) and getattr(c, 'data', None) == "load_more_row"
+        ]
+        self.movies_column.controls = [self._top_spacer, *cards, self._bottom_spacer, *load_more_rows]
+        self._cards_by_movie_id = {card.movie.id: card for card in cards}
+        self._spacers_mounted = True
+        self._window_start = start
+        self._window_end = end
+        self._offsets = None
+        self._update_spacers()
+
+    def _update_spacers(self):
+        """Size spacers to stand in for unmounted cards above and below the window."""
+        offsets = self._get_offsets()
+        self._top_spacer.height = offsets[self._window_start]
+        self._bottom_spacer.height = max(0.0, offsets[self.loaded_count] - offsets[self._window_end])
+
+    def _unmount_all(self):
+        """Clear the column, returning mounted cards to the pool (no update call)."""
+        for card in self._mounted_cards():
+            self._release_card(card)
+        self.movies_column.controls.clear()
+        self._cards_by_movie_id.clear()
+        self._spacers_mounted = False
+        self._window_start = 0
+        self._window_end = 0
+        self._offsets = None
+
+    def _release_card(self, card: MovieCard):
+        if len(self._card_pool) < self.CARD_POOL_SIZE:
+            self._card_pool.append(card)
+
+    def _create_card(self, movie: MovieView) -> MovieCard:
+        """Create a MovieCard for the given movie, recycling a pooled card if possible."""
         rating_obj = self.ratings.get(movie.id)
         user_rating = rating_obj.rating if rating_obj else None
         user_review = rating_obj.review if rating_obj else None
         in_wishlist = movie.id in self.wishlist_ids
         tags = self.movie_tags.get(movie.id, [])
-        movie_ratings_loading = self.ratings_loading and (
-            movie.imdb_rating is None or
-            movie.kp_rating is None or
-            movie.rotten_tomatoes is None or
-            movie.metacritic is None
-        )
-
-        return MovieCard(
+        movie_ratings_loading = self._is_ratings_loading(movie)
+
+        if self._card_pool:
+            card = self._card_pool.pop()
+            card.rebind(
+                movie=movie,
+                user_rating=user_rating,
+                user_review=user_review,
+                user_tags=tags,
+                in_wishlist=in_wishlist,
+                ratings_loading=movie_ratings_loading,
+                collapsed=self._is_collapsed(movie.id),
+            )
+            return card
+
+        card = MovieCard(
             movie=movie,
             user_rating=user_rating,
             user_review=user_review,
             user_tags=tags,
             in_wishlist=in_wishlist,
             ratings_loading=movie_ratings_loading,
-            collapsed=self.all_collapsed,
+            collapsed=self._is_collapsed(movie.id),
             on_rating_change=self.on_rating_change,
             on_review_click=self.on_review_click,
             on_similar_click=self.on_similar_click,
             on_rating_delete=self.on_rating_delete,
             on_wishlist_toggle=self.on_wishlist_toggle,
             on_person_click=self.on_person_click,
+            on_collapse_toggle=self._on_card_collapse_toggle,
             on_tags_click=self.on_tags_click,
+            on_description_expand=self.on_description_expand,
         )
+        card.size_change_interval = self.SIZE_CHANGE_INTERVAL
+        card.on_size_change = self._on_card_size_change
+        return card
 
     def show_loading(self):
         """Show loading indicator."""
@@ -250,14 +469,14 @@ class MovieList(ft.Container):
         self.movies_column.visible = False
         self.custom_content_container.visible = False
         self._custom_content = None
-        self.movies_column.controls.clear()
+        self._unmount_all()
         self.loaded_count = 0
         self.update()
 
     def set_movies(
         self,
-        movies: list[Movie],
-        ratings: Optional[dict[int, UserRating]] = None,
+        movies: list[MovieView],
+        ratings: Optional[dict[int, RatingView]] = None,
         wishlist_ids: Optional[set[int]] = None,
         ratings_loading: bool = False
     ):
@@ -268,6 +487,9 @@ class MovieList(ft.Container):
         self.wishlist_ids = wishlist_ids or set()
         self.ratings_loading = ratings_loading
         self.loaded_count = 0
+        self._card_heights.clear()
+        self._collapsed_overrides.clear()
+        self._scroll_pixels = 0.0
         self.message = None
         self._custom_content = None
         self._refresh()
@@ -290,10 +512,13 @@ class MovieList(ft.Container):
         self._custom_content = control
         self._refresh()
 
-    def update_rating(self, movie_id: int, rating: UserRating):
+    def update_rating(self, movie_id: int, rating: RatingView):
         """Update rating for a specific movie (without full refresh)."""
         self.ratings[movie_id] = rating
-        self._update_single_card(movie_id)
+        card = self._cards_by_movie_id.get(movie_id)
+        if card:
+            card.set_user_rating(rating.rating if rating else None, rating.review if rating else None)
+            card.update()
 
     def remove_rating(self, movie_id: int, remove_from_list: bool = False):
         """Remove rating for a specific movie."""
@@ -301,19 +526,16 @@ class MovieList(ft.Container):
             del self.ratings[movie_id]
 
         if remove_from_list:
-            self.movies = [m for m in self.movies if m.id != movie_id]
-            to_remove = [c for c in self.movies_column.controls if isinstance(c, MovieCard) and c.movie.id == movie_id]
-            for c in to_remove:
-                self.movies_column.controls.remove(c)
-            self.loaded_count = len([c for c in self.movies_column.controls if isinstance(c, MovieCard)])
+            self._remove_movie(movie_id)
             self.update()
         else:
-            self._update_single_card(movie_id)
+            self.update_rating(movie_id, None)
 
     def _refresh(self):
         """Refresh the displayed content."""
         self.loading_indicator.visible = False
-        self.movies_column.controls.clear()
+        self._unmount_all()
+        self._reindex_movies()
         self.loaded_count = 0
 
         if self._custom_content:
@@ -333,35 +555,21 @@ class MovieList(ft.Container):
             self.message_text.visible = False
 
             # Load first batch
-            end_idx = min(self.ITEMS_PER_PAGE, len(self.movies))
-            for movie in self.movies[:end_idx]:
-                card = self._create_card(movie)
-                self.movies_column.controls.append(card)
-            self.loaded_count = end_idx
+            self.loaded_count = min(self.ITEMS_PER_PAGE, len(self.movies))
+            self._render_window(0, self.loaded_count)
 
             # Add load-more row if needed
             self._append_load_more_if_needed()
 
         self.update()
 
-    def _update_single_card(self, movie_id: int):
-        """Update a single card without rebuilding everything."""
-        for card in self.movies_column.controls:
-            if isinstance(card, MovieCard) and card.movie.id == movie_id:
-                rating_obj = self.ratings.get(movie_id)
-                card.user_rating = rating_obj.rating if rating_obj else None
-                card.user_review = rating_obj.review if rating_obj else None
-                card.in_wishlist = movie_id in self.wishlist_ids
-                card.user_tags = self.movie_tags.get(movie_id, [])
-                card.invalidate_view_cache()
-                card._apply_collapse_state()
-                card.update()
-                break
-
     def update_movie_tags(self, movie_id: int, tags: list[str]):
         """Update tags for a movie."""
         self.movie_tags[movie_id] = tags
-        self._update_single_card(movie_id)
+        card = self._cards_by_movie_id.get(movie_id)
+        if card:
+            card.set_user_tags(tags)
+            card.update()
 
     def update_wishlist(self, movie_id: int, in_wishlist: bool):
         """Update wishlist status for a movie (without full refresh)."""
@@ -369,38 +577,68 @@ class MovieList(ft.Container):
             self.wishlist_ids.add(movie_id)
         else:
             self.wishlist_ids.discard(movie_id)
-        self._update_single_card(movie_id)
+        card = self._cards_by_movie_id.get(movie_id)
+        if card:
+            card.set_in_wishlist(in_wishlist)
+            card.update()
 
     def remove_from_wishlist_view(self, movie_id: int):
         """Remove movie from wishlist view (when in wishlist mode)."""
         self.wishlist_ids.discard(movie_id)
-        self.movies = [m for m in self.movies if m.id != movie_id]
-        to_remove = [c for c in self.movies_column.controls if isinstance(c, MovieCard) and c.movie.id == movie_id]
-        for c in to_remove:
-            self.movies_column.controls.remove(c)
-        self.loaded_count = len([c for c in self.movies_column.controls if isinstance(c, MovieCard)])
+        self._remove_movie(movie_id)
         self.update()
 
-    def update_movie_data(self, movie: Movie):
-        """Update movie data (e.g., ratings) without full refresh."""
-        for i, m in enumerate(self.movies):
-            if m.id == movie.id:
-                self.movies[i] = movie
-                break
-
-        for card in self.movies_column.controls:
-            if isinstance(card, MovieCard) and card.movie.id == movie.id:
-                card.movie = movie
-                card.ratings_loading = self.ratings_loading and (
-                    movie.imdb_rating is None or
-                    movie.kp_rating is None or
-                    movie.rotten_tomatoes is None or
-                    movie.metacritic is None
-                )
-                card.invalidate_view_cache()
-                card._apply_collapse_state()
-                card.update()
-                break
+    def visible_movie_ids(self) -> set[int]:
+        """IDs of movies whose cards are currently mounted (on or near the screen)."""
+        return set(self._cards_by_movie_id)
+
+    def _reindex_movies(self):
+        self._movie_positions = {m.id: i for i, m in enumerate(self.movies)}
+
+    def _remove_movie(self, movie_id: int):
+        """Remove a movie from the list, keeping the mounted window consistent (no update call)."""
+        idx = self._movie_positions.get(movie_id)
+        if idx is None:
+            return
+        del self.movies[idx]
+        self._reindex_movies()
+
+        if idx < self.loaded_count:
+            self.loaded_count -= 1
+        if self._window_start <= idx < self._window_end:
+            card = self._cards_by_movie_id.pop(movie_id)
+            self.movies_column.controls.remove(card)
+            self._release_card(card)
+            self._window_end -= 1
+        elif idx < self._window_start:
+            self._window_start -= 1
+            self._window_end -= 1
+        self._offsets = None
+        self._update_spacers()
+
+    def _is_ratings_loading(self, movie: MovieView) -> bool:
+        """Whether a card should show loading indicators for missing external ratings."""
+        return self.ratings_loading and (
+            movie.imdb_rating is None or
+            movie.kp_rating is None or
+            movie.rotten_tomatoes is None or
+            movie.metacritic is None
+        )
+
+    def update_movie_data(self, movie: MovieView):
+        """Update movie data (e.g., ratings) without full refresh.
+
+        Only the card's ratings row is patched; the UI update is coalesced
+        with other streamed updates (see _schedule_flush).
+        """
+        idx = self._movie_positions.get(movie.id)
+        if idx is not None:
+            self.movies[idx] = movie
+
+        card = self._cards_by_movie_id.get(movie.id)
+        if card:
+            card.set_external_ratings(movie, self._is_ratings_loading(movie))
+            self._schedule_flush()
 
     def set_ratings_loading(self, loading: bool):
         """Set whether external ratings are being loaded."""
@@ -408,17 +646,32 @@ class MovieList(ft.Container):
             return
         self.ratings_loading = loading
 
-        for card in self.movies_column.controls:
-            if isinstance(card, MovieCard):
-                movie = card.movie
-                movie_ratings_loading = loading and (
-                    movie.imdb_rating is None or
-                    movie.kp_rating is None or
-                    movie.rotten_tomatoes is None or
-                    movie.metacritic is None
-                )
-                if card.ratings_loading != movie_ratings_loading:
-                    card.ratings_loading = movie_ratings_loading
-                    card.invalidate_view_cache()
-                    card._apply_collapse_state()
-                    card.update()
+        changed = False
+        for card in self._cards_by_movie_id.values():
+            movie_ratings_loading = self._is_ratings_loading(card.movie)
+            if card.ratings_loading != movie_ratings_loading:
+                card.set_external_ratings(card.movie, movie_ratings_loading)
+                changed = True
+        if changed:
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        """Request a single UI update for all card patches made during this frame."""
+        if self._flush_scheduled:
+            return
+        try:
+            page = self.page
+        except Exception:
+            page = None
+        if page is None:
+            return  # Not mounted: patched state is picked up on the next update
+        self._flush_scheduled = True
+        page.run_task(self._flush)
+
+    async def _flush(self):
+        await asyncio.sleep(self.FLUSH_INTERVAL)
+        self._flush_scheduled = False
+        try:
+            self.update()  # Isolated control: diffs only the list, not the whole page
+        except Exception:
+            pass  # Ignore if UI is being destroyed
@@ -1,15 +1,19 @@
-from typing import Callable, Optional
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Optional
 import flet as ft
 
-from database.models import Movie
 from ui.theme import COLORS
 
+if TYPE_CHECKING:
+    from database.views import MovieView
+
 
 def show_rating_dialog(
     page: ft.Page,
-    movie: Movie,
+    movie: MovieView,
     current_review: Optional[str] = None,
-    on_save: Optional[Callable[[Movie, str], None]] = None,
+    on_save: Optional[Callable[[MovieView, str], None]] = None,
 ):
     """Show a dialog for editing movie review."""
 
@@ -1,3 +1,4 @@
+import asyncio
 from typing import Callable, Optional
 import flet as ft
 
@@ -31,6 +32,15 @@ GENRES = [
 class SearchBar(ft.Container):
     """Search bar component with action buttons, genre and tag filters."""
 
+    SUGGEST_DEBOUNCE = 0.15  # Seconds after the last keystroke before suggestions are looked up
+
+    # Suggestion kind -> icon
+    SUGGESTION_ICONS = {
+        "movie": ft.Icons.MOVIE_OUTLINED,
+        "tv": ft.Icons.TV,
+        "person": ft.Icons.PERSON_OUTLINE,
+    }
+
     def __init__(
         self,
         on_search: Optional[Callable[[str, list[int]], None]] = None,
@@ -42,6 +52,7 @@ class SearchBar(ft.Container):
         on_manage_tags: Optional[Callable[[], None]] = None,
         on_rating_filter: Optional[Callable[[], None]] = None,
         on_stats: Optional[Callable[[], None]] = None,
+        on_suggest: Optional[Callable[[str], list]] = None,
     ):
         self.on_search = on_search
         self.on_my_ratings = on_my_ratings
@@ -52,6 +63,8 @@ class SearchBar(ft.Container):
         self.on_manage_tags = on_manage_tags
         self.on_rating_filter = on_rating_filter
         self.on_stats = on_stats
+        self.on_suggest = on_suggest
+        self._suggest_future = None
         self._all_collapsed = False
         self.selected_genres: list[int] = []
 
@@ -82,6 +95,16 @@ class SearchBar(ft.Container):
             suffix=self.clear_icon,
         )
 
+        # Type-ahead suggestions under the search row
+        self.suggestions_column = ft.Column(spacing=0, tight=True)
+        self.suggestions_box = ft.Container(
+            content=self.suggestions_column,
+            bgcolor=COLORS["surface"],
+            border_radius=8,
+            padding=ft.padding.symmetric(vertical=4),
+            visible=False,
+        )
+
         self.genre_button = ft.IconButton(
             icon=ft.Icons.FILTER_LIST,
             icon_size=20,
@@ -183,6 +206,7 @@ class SearchBar(ft.Container):
                     spacing=8,
                     vertical_alignment=ft.CrossAxisAlignment.CENTER,
                 ),
+                self.suggestions_box,
                 self.selected_genres_text,
             ],
             spacing=2,
@@ -270,19 +294,70 @@ class SearchBar(ft.Container):
             self.selected_genres_text.value = ""
 
     def _on_text_change(self, e):
-        """Show/hide clear button based on text content."""
+        """Show/hide clear button based on text content, schedule suggestions."""
         has_text = bool(self.search_field.value)
         if self.clear_icon.visible != has_text:
             self.clear_icon.visible = has_text
             self.search_field.update()
 
+        if self.on_suggest and self.page:
+            # Debounce: every keystroke restarts the wait
+            if self._suggest_future is not None:
+                self._suggest_future.cancel()
+            self._suggest_future = self.page.run_task(self._update_suggestions, self.search_field.value or "")
+
+    async def _update_suggestions(self, query: str):
+        await asyncio.sleep(self.SUGGEST_DEBOUNCE)
+        try:
+            suggestions = self.on_suggest(query) if query.strip() else []
+        except Exception:
+            suggestions = []
+        self._show_suggestions(suggestions)
+
+    def _show_suggestions(self, suggestions: list):
+        """Replace the suggestion list (empty list hides it)."""
+        self.suggestions_column.controls = [
+            ft.ListTile(
+                leading=ft.Icon(
+                    self.SUGGESTION_ICONS.get(item.kind, ft.Icons.SEARCH), size=16, color=COLORS["text_secondary"]
+                ),
+                title=ft.Text(item.label, size=13, color=COLORS["text_primary"], max_lines=1,
+                              overflow=ft.TextOverflow.ELLIPSIS),
+                dense=True,
+                min_leading_width=20,
+                content_padding=ft.padding.symmetric(horizontal=12),
+                on_click=lambda e, query=item.query: self._choose_suggestion(query),
+            )
+            for item in suggestions
+        ]
+        visible = bool(suggestions)
+        if self.suggestions_box.visible or visible:
+            self.suggestions_box.visible = visible
+            self.suggestions_box.update()
+
+    def _hide_suggestions(self):
+        if self._suggest_future is not None:
+            self._suggest_future.cancel()
+            self._suggest_future = None
+        if self.suggestions_box.visible:
+            self._show_suggestions([])
+
+    def _choose_suggestion(self, query: str):
+        """Put the chosen title/name into the field and search for it."""
+        self.search_field.value = query
+        self.clear_icon.visible = True
+        self.search_field.update()
+        self._handle_search()
+
     def _clear_search_text(self, e):
         """Clear the search text."""
         self.search_field.value = ""
         self.clear_icon.visible = False
         self.search_field.update()
+        self._hide_suggestions()
 
     def _handle_search(self):
+        self._hide_suggestions()
         query = self.search_field.value or ""
         if self.on_search and (query or self.selected_genres):
             self.on_search(query, self.selected_genres)
@@ -395,6 +470,7 @@ class SearchBar(ft.Container):
     def clear(self):
         self.search_field.value = ""
         self.clear_icon.visible = False
+        self._hide_suggestions()
         self.selected_genres = []
         self._update_selected_genres_text()
         self.genre_button.icon_color = COLORS["text_primary"]
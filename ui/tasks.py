@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from concurrent.futures import Future
+from typing import Awaitable, Callable
+
+import flet as ft
+
+
+class TaskSupervisor:
+    """Tracks in-flight background tasks per view.
+
+    Starting new work for a view cancels everything still running for it:
+    the superseded task and the fan-outs it spawned (pagination, ratings
+    loading). Cancellation reaches the pending HTTP requests, so stale
+    results can't overwrite the new list or use up API quota.
+    """
+
+    def __init__(self, page: ft.Page):
+        self.page = page
+        self._tasks: dict[str, set[Future]] = {}
+
+    def start(self, view: str, handler: Callable[..., Awaitable], *args) -> Future:
+        """Cancel the view's in-flight tasks and run handler as its new work."""
+        self.cancel(view)
+        return self.spawn(view, handler, *args)
+
+    def spawn(self, view: str, handler: Callable[..., Awaitable], *args) -> Future:
+        """Run handler as part of the view's current work (cancelled together with it)."""
+        future = self.page.run_task(handler, *args)
+        tasks = self._tasks.setdefault(view, set())
+        tasks.add(future)
+        future.add_done_callback(tasks.discard)
+        return future
+
+    def cancel(self, view: str):
+        """Cancel all in-flight tasks of a view."""
+        for future in list(self._tasks.pop(view, ())):
+            future.cancel()
+
+    def cancel_all(self):
+        """Cancel in-flight tasks of every view (on shutdown)."""
+        for view in list(self._tasks):
+            self.cancel(view)
+
+    def active_count(self, view: str) -> int:
+        """Number of unfinished tasks of a view."""
+        return sum(1 for future in list(self._tasks.get(view, ())) if not future.done())